@@ -0,0 +1,228 @@
+"""Local content-addressed storage for large payloads.
+
+Large tool results are written here once and only referenced from graph state.
+Blobs are stored under their SHA-256 digest, so identical payloads are stored once,
+and are memory-mapped on read so slices can be served without loading the file.
+
+Storage is bounded: blobs older than `max_age_seconds` are deleted, and once the
+store grows past `max_bytes` the least recently used blobs are deleted until it is
+back under 90% of the cap (AIOS_BLOB_MAX_BYTES, AIOS_BLOB_MAX_AGE_SECONDS).
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+logger = logging.getLogger('blob_store')
+
+# Fraction of `max_bytes` the store is pruned down to once it exceeds the cap
+_PRUNE_LOW_WATERMARK = 0.9
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """Reference to a stored blob."""
+
+    digest: str
+    """Hex SHA-256 digest of the blob content."""
+    size: int
+    """Size of the blob in bytes."""
+
+    @property
+    def uri(self) -> str:
+        """Return a stable textual reference to the blob."""
+        return f"blob:sha256:{self.digest}"
+
+
+class BlobStore:
+    """Content-addressed blob store on the local filesystem."""
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        prune_interval_seconds: float = 300.0,
+    ):
+        """Create a store under `root`; without `max_bytes` and `max_age_seconds` it is never pruned."""
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.prune_interval_seconds = prune_interval_seconds
+        self._stored_bytes: Optional[int] = None  # Unknown until the first prune scans the store
+        self._last_prune = time.monotonic()
+        self._lock = threading.Lock()
+
+    def path(self, digest: str) -> Path:
+        """Return the file path of a blob, sharded by the first two digest characters."""
+        return self.root / digest[:2] / digest
+
+    def put(self, data: Union[bytes, str]) -> BlobRef:
+        """Store data and return its reference. Storing existing content is a no-op."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see partial blobs
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    tmp_file.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            logger.info(f"Stored blob {digest} ({len(data)} bytes)")
+            self._after_write(len(data))
+        else:
+            _touch(path)
+        return BlobRef(digest=digest, size=len(data))
+
+    def open(self, digest: str) -> mmap.mmap:
+        """Memory-map a blob read-only. The caller must close the returned map."""
+        path = self.path(digest)
+        _touch(path)
+        with open(path, "rb") as blob_file:
+            if os.fstat(blob_file.fileno()).st_size == 0:
+                raise ValueError(f"Blob {digest} is empty and cannot be memory-mapped.")
+            return mmap.mmap(blob_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, digest: str, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """Read a byte range of a blob through a memory map."""
+        if self.path(digest).stat().st_size == 0:
+            return b""
+        with self.open(digest) as mapped:
+            end = len(mapped) if length is None else min(len(mapped), offset + length)
+            return mapped[offset:end]
+
+    def exists(self, digest: str) -> bool:
+        """Return whether a blob is stored."""
+        return self.path(digest).exists()
+
+    def writer(self) -> "BlobWriter":
+        """Start writing a blob incrementally, for content that arrives in pieces."""
+        return BlobWriter(self)
+
+    def prune(self) -> int:
+        """Delete expired blobs, then the least recently used ones while over `max_bytes`.
+
+        Returns the number of blobs deleted.
+        """
+        blobs: List[Tuple[float, int, Path]] = []
+        for path in self.root.glob("*/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            blobs.append((stat.st_mtime, stat.st_size, path))
+        blobs.sort()
+
+        expired_before = time.time() - self.max_age_seconds if self.max_age_seconds is not None else None
+        total = sum(size for _, size, _ in blobs)
+        target = int(self.max_bytes * _PRUNE_LOW_WATERMARK) if self.max_bytes is not None and total > self.max_bytes else None
+        removed = 0
+        for index, (mtime, size, path) in enumerate(blobs):
+            expired = expired_before is not None and mtime < expired_before
+            # The newest blob is never evicted for size; it was most likely just written
+            over_target = target is not None and total > target and index < len(blobs) - 1
+            if not (expired or over_target):
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        with self._lock:
+            self._stored_bytes = total
+            self._last_prune = time.monotonic()
+        if removed:
+            logger.info(f"Pruned {removed} blobs, {total} bytes remain")
+        return removed
+
+    def _after_write(self, size: int) -> None:
+        """Prune when a new blob pushes the store over its cap, or when a prune is due."""
+        if self.max_bytes is None and self.max_age_seconds is None:
+            return
+        with self._lock:
+            if self._stored_bytes is not None:
+                self._stored_bytes += size
+            over_cap = self.max_bytes is not None and (self._stored_bytes is None or self._stored_bytes > self.max_bytes)
+            due = (self.max_age_seconds is not None
+                   and time.monotonic() - self._last_prune >= self.prune_interval_seconds)
+        if over_cap or due:
+            self.prune()
+
+
+def _touch(path: Path) -> None:
+    """Mark a blob as recently used, so pruning by size keeps it."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+class BlobWriter:
+    """Incremental blob writer; the digest is computed as data is written."""
+
+    def __init__(self, store: BlobStore):
+        """Open a temporary file in the store's root for the new blob."""
+        self._store = store
+        self._hash = hashlib.sha256()
+        self.size = 0
+        store.root.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.root, prefix=".tmp-")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data: Union[bytes, str]) -> None:
+        """Append data to the blob."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._hash.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+    def commit(self) -> BlobRef:
+        """Finish the blob and move it into place under its digest."""
+        self._file.close()
+        digest = self._hash.hexdigest()
+        path = self._store.path(digest)
+        if path.exists():
+            os.unlink(self._tmp_path)
+            _touch(path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._tmp_path, path)
+            logger.info(f"Stored blob {digest} ({self.size} bytes)")
+            self._store._after_write(self.size)
+        return BlobRef(digest=digest, size=self.size)
+
+    def abort(self) -> None:
+        """Discard the partially written blob."""
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+
+# --- Dependency Injection ---
+_blob_store_instance = BlobStore(
+    os.getenv("AIOS_BLOB_DIR") or Path(tempfile.gettempdir()) / "aios-blobs",
+    max_bytes=int(os.getenv("AIOS_BLOB_MAX_BYTES", str(1024 ** 3))),
+    max_age_seconds=float(os.getenv("AIOS_BLOB_MAX_AGE_SECONDS", str(7 * 24 * 3600))),
+)
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide BlobStore singleton."""
+    return _blob_store_instance
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field, fields
-from typing import Annotated, Optional, Sequence, Any, Dict, List
+from typing import Annotated, Optional, Sequence, Any, Dict, List, Tuple
 
 from langchain_core.runnables import RunnableConfig, ensure_config
 from langchain_core.tools import StructuredTool
 from react_agent import prompts
+from react_agent.tool_cache import cache_ttl_from_tool_dict
 
 
 def add_tools(obj: Any) -> Any:
@@ -43,6 +48,128 @@ class Configuration:
         },
     )
 
+    stream_tokens: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether to stream model output token by token. Tokens are emitted through LangGraph's "
+            "'messages' and 'custom' stream modes; the final message is assembled as before."
+        },
+    )
+
+    prompt_caching: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether to keep the system prompt and tool block in a stable order and mark them "
+            "for provider prompt caching (cache_control for Anthropic, prompt_cache_key for OpenAI)."
+        },
+    )
+
+    context_policy: str = field(
+        default="trim",
+        metadata={
+            "description": "How to fit the message history into the model's context budget: "
+            "'none' (send everything), 'trim' (drop the oldest messages) or 'summarize' "
+            "(replace the oldest messages with a running summary)."
+        },
+    )
+
+    context_max_tokens: int = field(
+        default=100_000,
+        metadata={
+            "description": "Default token budget for the system prompt and messages sent to the model."
+        },
+    )
+
+    context_model_budgets: Dict[str, int] = field(
+        default_factory=dict,
+        metadata={
+            "description": "Per-model token budgets, keyed by fully specified model name. "
+            "Overrides context_max_tokens for the listed models."
+        },
+    )
+
+    tool_result_max_chars: int = field(
+        default=20_000,
+        metadata={
+            "description": "Maximum number of characters of a tool result kept in the conversation. "
+            "Larger results are stored in the local blob store and only a shortened version is kept."
+        },
+    )
+
+    tool_result_limits: Dict[str, int] = field(
+        default_factory=dict,
+        metadata={
+            "description": "Per-tool result size limits in characters, keyed by tool name. "
+            "Overrides tool_result_max_chars for the listed tools."
+        },
+    )
+
+    tool_result_truncation: str = field(
+        default="head_tail",
+        metadata={
+            "description": "How oversized tool results are shortened: 'head' (keep the beginning), 'tail' "
+            "(keep the end), 'head_tail' (keep both ends) or 'summarize' (summarize with the model)."
+        },
+    )
+
+    hedge_fallback: bool = field(
+        default=False,
+        metadata={
+            "description": "Whether to start the fallback model alongside a slow primary model and use whichever "
+            "answers first. The slower call is cancelled."
+        },
+    )
+
+    hedge_percentile: float = field(
+        default=0.95,
+        metadata={
+            "description": "Latency percentile (0-1) of recent primary model calls after which the fallback is hedged."
+        },
+    )
+
+    hedge_delay_seconds: float = field(
+        default=10.0,
+        metadata={
+            "description": "Hedge delay in seconds used until enough primary model latencies have been observed."
+        },
+    )
+
+    circuit_breaker_enabled: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether to track failures per model and route straight to the fallback model "
+            "while the primary model's circuit is open."
+        },
+    )
+
+    circuit_breaker_window: int = field(
+        default=20,
+        metadata={
+            "description": "Number of most recent calls per model used to compute the failure rate."
+        },
+    )
+
+    circuit_breaker_min_calls: int = field(
+        default=5,
+        metadata={
+            "description": "Minimum number of calls in the window before a model's circuit may open."
+        },
+    )
+
+    circuit_breaker_failure_rate: float = field(
+        default=0.5,
+        metadata={
+            "description": "Failure rate (0-1) within the window at which a model's circuit opens."
+        },
+    )
+
+    circuit_breaker_open_seconds: float = field(
+        default=30.0,
+        metadata={
+            "description": "Seconds a model's circuit stays open before a single probe call is allowed through."
+        },
+    )
+
     recursion_limit: int = field(
         default=100,
         metadata={
@@ -71,6 +198,45 @@ class Configuration:
         },
     )
 
+    tool_timeout: float = field(
+        default=30.0,
+        metadata={
+            "description": "Maximum time in seconds to wait for the client to return a single tool result."
+        },
+    )
+
+    parallel_tool_calls: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether to dispatch all tool calls of a model turn to the client concurrently. "
+            "When disabled, tool calls are executed one after another."
+        },
+    )
+
+    speculative_tool_dispatch: bool = field(
+        default=False,
+        metadata={
+            "description": "Whether to send each tool call to the client as soon as its arguments have streamed, "
+            "while the model is still generating. Requires stream_tokens. Calls from a primary model response "
+            "that fails mid-stream may already have run on the client."
+        },
+    )
+
+    max_concurrent_tool_calls: int = field(
+        default=8,
+        metadata={
+            "description": "The maximum number of tool calls that may be in flight at once on a single client connection."
+        },
+    )
+
+    tool_result_cache: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether to reuse cached results of tools the client declared cacheable "
+            "(\"cache\": {\"ttl\": seconds} in the tool definition) instead of calling the client again."
+        },
+    )
+
     @classmethod
     def from_runnable_config(
         cls, config: Optional[RunnableConfig] = None
@@ -86,16 +252,48 @@ class Configuration:
         """
         run_config = ensure_config(config)  # Get a working copy, or default if None
         configurable = run_config.get("configurable") or {}
-        
-        # Convert tool dictionaries to StructuredTool objects if present
-        if "tools" in configurable and isinstance(configurable["tools"], list):
-            configurable["tools"] = convert_tool_dicts_to_structured_tools(configurable["tools"])
-        
+
         _fields = {f.name for f in fields(cls) if f.init}
-        # Create the Configuration instance using only relevant fields from configurable
-        config_instance = cls(**{k: v for k, v in configurable.items() if k in _fields})
-        
-        return config_instance
+        # Collect only relevant fields; `configurable` itself is never mutated so the
+        # same config can be shared safely across concurrent runs.
+        values = {k: v for k, v in configurable.items() if k in _fields}
+
+        # Convert tool dictionaries to StructuredTool objects if present
+        tools = values.get("tools")
+        if isinstance(tools, list) and all(isinstance(tool, dict) for tool in tools):
+            values["tools"] = get_structured_tools(tools)
+
+        return cls(**values)
+
+
+# Converted toolsets keyed by a hash of their serialized tool dicts, most recently used last.
+_STRUCTURED_TOOL_CACHE: OrderedDict[str, Tuple[StructuredTool, ...]] = OrderedDict()
+_STRUCTURED_TOOL_CACHE_SIZE = 32
+_structured_tool_cache_lock = threading.Lock()
+
+
+def get_structured_tools(tool_dicts: List[Dict[str, Any]]) -> Tuple[StructuredTool, ...]:
+    """Return StructuredTools for serialized tool dicts, converting each toolset at most once.
+
+    Results are cached by the content of the tool list, so every step of a run (and
+    every run sharing the same client toolset) reuses the same converted tools. The
+    returned tuple is shared between callers and must not be modified.
+    """
+    key = hashlib.sha256(
+        json.dumps(tool_dicts, sort_keys=True, default=repr).encode("utf-8")
+    ).hexdigest()
+    with _structured_tool_cache_lock:
+        cached = _STRUCTURED_TOOL_CACHE.get(key)
+        if cached is not None:
+            _STRUCTURED_TOOL_CACHE.move_to_end(key)
+            return cached
+
+    converted = tuple(convert_tool_dicts_to_structured_tools(tool_dicts))
+    with _structured_tool_cache_lock:
+        _STRUCTURED_TOOL_CACHE[key] = converted
+        while len(_STRUCTURED_TOOL_CACHE) > _STRUCTURED_TOOL_CACHE_SIZE:
+            _STRUCTURED_TOOL_CACHE.popitem(last=False)
+    return converted
 
 
 def convert_tool_dicts_to_structured_tools(tool_dicts: List[Dict[str, Any]]) -> List[StructuredTool]:
@@ -110,6 +308,10 @@ def convert_tool_dicts_to_structured_tools(tool_dicts: List[Dict[str, Any]]) ->
             func=lambda _tool_name=tool_name, **kwargs: call_remote_tool(_tool_name, kwargs),
             args_schema=tool_dict.get("schema", {}),
         )
+        # Idempotent tools may declare a result cache TTL, e.g. "cache": {"ttl": 30}
+        cache_ttl = cache_ttl_from_tool_dict(tool_dict)
+        if cache_ttl is not None:
+            tool.metadata = {"cache_ttl": cache_ttl}
         tools.append(tool)
     return tools
 
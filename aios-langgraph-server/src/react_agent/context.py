@@ -0,0 +1,336 @@
+"""Context-window management for the messages sent to the model.
+
+`State.messages` only ever grows, so before each model call the history is fitted
+into a per-model token budget, after reserving the tokens of the system prompt and
+the bound tool schemas. Token counts are computed once per message (and per toolset)
+and cached, and the fitting itself is delegated to a pluggable `ContextPolicy`.
+
+Messages are never split apart from their tool results: an AIMessage with tool
+calls and the ToolMessages answering it are kept or dropped together.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+)
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from react_agent.model_registry import tool_schema_fingerprint
+
+logger = logging.getLogger('context')
+
+Summarizer = Callable[[str, Sequence[BaseMessage]], Awaitable[str]]
+"""Async callable receiving the previous summary and newly dropped messages, returning a new summary."""
+
+SUMMARY_PREFIX = "[Summary of the earlier conversation]\n"
+
+
+class TokenCounter:
+    """Per-message token counts, computed once and cached.
+
+    Counts are cached by message id and content size (LangGraph assigns every message
+    in state an id), so only messages new to the history are counted on each step.
+    """
+
+    def __init__(
+        self,
+        count_fn: Callable[[Sequence[BaseMessage]], int] = count_tokens_approximately,
+        max_entries: int = 50_000,
+    ):
+        """Create a counter using `count_fn`, caching at most `max_entries` counts."""
+        self._count_fn = count_fn
+        self.max_entries = max_entries
+        self._counts: OrderedDict[Tuple[str, str, int], int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count(self, message: BaseMessage) -> int:
+        """Return the token count of a single message."""
+        if not message.id:
+            return self._count_fn([message])
+        key = (message.type, message.id, _content_size(message))
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None:
+                self._counts.move_to_end(key)
+                return cached
+        tokens = self._count_fn([message])
+        with self._lock:
+            self._counts[key] = tokens
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def count_text(self, text: str) -> int:
+        """Return the token count of a plain text block, e.g. a system prompt."""
+        return self._count_fn([HumanMessage(content=text)])
+
+    def count_tools(self, tools: Sequence[Any]) -> int:
+        """Return the approximate token count of tool schemas bound to the model, cached per toolset."""
+        if not tools:
+            return 0
+        key = ("tools", tool_schema_fingerprint(tools), 0)
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None:
+                self._counts.move_to_end(key)
+                return cached
+        tokens = self.count_text(json.dumps([_tool_schema(tool) for tool in tools], default=repr))
+        with self._lock:
+            self._counts[key] = tokens
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return tokens
+
+
+def _tool_schema(tool: Any) -> Any:
+    try:
+        return convert_to_openai_tool(tool)
+    except Exception:
+        # Counting only needs an estimate; unconvertible tools are counted by their description
+        return repr(tool)
+
+
+def _content_size(message: BaseMessage) -> int:
+    content = message.content
+    size = len(content) if isinstance(content, str) else sum(len(str(block)) for block in content)
+    if isinstance(message, AIMessage):
+        size += sum(len(str(tool_call.get("args"))) for tool_call in message.tool_calls)
+    return size
+
+
+def group_into_units(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into units that must be kept or dropped together.
+
+    An AIMessage with tool calls forms one unit with the ToolMessages that directly
+    follow it and answer one of its calls. Every other message is its own unit.
+    """
+    units: List[List[BaseMessage]] = []
+    open_tool_call_ids: set = set()
+    for message in messages:
+        if isinstance(message, ToolMessage) and units and message.tool_call_id in open_tool_call_ids:
+            units[-1].append(message)
+            continue
+        units.append([message])
+        open_tool_call_ids = (
+            {tool_call["id"] for tool_call in message.tool_calls} if isinstance(message, AIMessage) else set()
+        )
+    return units
+
+
+@dataclass
+class ContextWindow:
+    """The result of fitting the history into the token budget."""
+
+    messages: List[BaseMessage]
+    """Messages to send to the model, after the system prompt."""
+    tokens: int
+    """Estimated tokens of `messages` plus the reserved system prompt tokens."""
+    dropped: int = 0
+    """Number of history messages not sent as-is."""
+    summary: Optional[str] = None
+    """Updated running summary to store in state, if the policy produced one."""
+    summary_through_id: Optional[str] = None
+    """Id of the last message covered by `summary`."""
+    trimmed_through_id: Optional[str] = None
+    """Updated cut point to store in state: id of the last message trimmed away."""
+
+
+class ContextPolicy(Protocol):
+    """Strategy that fits the message history into a token budget."""
+
+    async def fit(
+        self,
+        messages: Sequence[BaseMessage],
+        budget: int,
+        reserved_tokens: int,
+        counter: TokenCounter,
+        summary: str,
+        summary_through_id: str,
+        trimmed_through_id: str = "",
+    ) -> ContextWindow:
+        """Return the messages to send for the given budget."""
+        ...
+
+
+class NoopPolicy:
+    """Send the whole history unchanged."""
+
+    async def fit(
+        self, messages, budget, reserved_tokens, counter, summary, summary_through_id, trimmed_through_id=""
+    ) -> ContextWindow:
+        """Return every message."""
+        tokens = reserved_tokens + sum(counter.count(m) for m in messages)
+        return ContextWindow(messages=list(messages), tokens=tokens)
+
+
+class TrimPolicy:
+    """Drop the oldest units once the budget is exceeded.
+
+    The first human message is pinned, since it usually states the task. When trimming
+    is needed the window is cut down to `low_watermark` of the budget, and the id of
+    the last dropped message is returned for storage in state. Later steps start from
+    that cut and only move it when the trimmed window exceeds the budget again, so the
+    start of the prompt stays stable (and cacheable) between cuts.
+    """
+
+    def __init__(self, low_watermark: float = 0.8):
+        """Create a policy trimming to `low_watermark` of the budget."""
+        self.low_watermark = low_watermark
+
+    async def fit(
+        self, messages, budget, reserved_tokens, counter, summary, summary_through_id, trimmed_through_id=""
+    ) -> ContextWindow:
+        """Return the pinned first human message followed by the units after the cut."""
+        pinned = list(messages[:1]) if messages and isinstance(messages[0], HumanMessage) else []
+        start = max(len(pinned), _index_after(messages, trimmed_through_id) if trimmed_through_id else 0)
+        remaining = list(messages[start:])
+        pinned_tokens = reserved_tokens + sum(counter.count(m) for m in pinned)
+        total = pinned_tokens + sum(counter.count(m) for m in remaining)
+        if total <= budget:
+            return ContextWindow(messages=pinned + remaining, tokens=total, dropped=start - len(pinned))
+
+        units = group_into_units(remaining)
+        kept, tokens = _fit_recent_units(units, counter, pinned_tokens, int(budget * self.low_watermark))
+        newly_dropped = [m for unit in units[:len(units) - len(kept)] for m in unit]
+        if not newly_dropped:
+            return ContextWindow(messages=pinned + remaining, tokens=total, dropped=start - len(pinned))
+
+        window = pinned + [m for unit in kept for m in unit]
+        logger.info(f"Trimmed context from {total} to {tokens} tokens ({len(messages) - len(window)} messages dropped)")
+        return ContextWindow(
+            messages=window,
+            tokens=tokens,
+            dropped=len(messages) - len(window),
+            trimmed_through_id=newly_dropped[-1].id,
+        )
+
+
+class SummarizePolicy:
+    """Replace the oldest units by a running summary once the budget is exceeded.
+
+    The summary is returned for storage in state together with the id of the last
+    message it covers, so later steps reuse it and only re-summarize when the budget
+    is exceeded again. Each re-summarization only feeds the newly dropped messages
+    (plus the previous summary) to the summarizer.
+    """
+
+    def __init__(self, summarizer: Summarizer, low_watermark: float = 0.6):
+        """Create a policy summarizing with `summarizer` down to `low_watermark` of the budget."""
+        self.summarizer = summarizer
+        self.low_watermark = low_watermark
+
+    async def fit(
+        self, messages, budget, reserved_tokens, counter, summary, summary_through_id, trimmed_through_id=""
+    ) -> ContextWindow:
+        """Return the summary message followed by the messages it does not cover."""
+        covered = _index_after(messages, summary_through_id) if summary else 0
+        if covered == 0:
+            summary = ""
+        remaining = list(messages[covered:])
+        summary_tokens = counter.count_text(SUMMARY_PREFIX + summary) if summary else 0
+        total = reserved_tokens + summary_tokens + sum(counter.count(m) for m in remaining)
+        if total <= budget:
+            return ContextWindow(messages=_with_summary(summary, remaining), tokens=total, dropped=covered)
+
+        units = group_into_units(remaining)
+        # Reserve room for the summary itself when choosing what to keep
+        kept, _ = _fit_recent_units(units, counter, reserved_tokens + summary_tokens, int(budget * self.low_watermark))
+        newly_dropped = [m for unit in units[:len(units) - len(kept)] for m in unit]
+        if not newly_dropped:
+            return ContextWindow(messages=_with_summary(summary, remaining), tokens=total, dropped=covered)
+
+        logger.info(f"Summarizing {len(newly_dropped)} messages to fit the context budget")
+        summary = await self.summarizer(summary, newly_dropped)
+        window_messages = [m for unit in kept for m in unit]
+        tokens = reserved_tokens + counter.count_text(SUMMARY_PREFIX + summary) + sum(counter.count(m) for m in window_messages)
+        return ContextWindow(
+            messages=_with_summary(summary, window_messages),
+            tokens=tokens,
+            dropped=covered + len(newly_dropped),
+            summary=summary,
+            summary_through_id=newly_dropped[-1].id,
+        )
+
+
+def _fit_recent_units(
+    units: List[List[BaseMessage]], counter: TokenCounter, used_tokens: int, target: int
+) -> Tuple[List[List[BaseMessage]], int]:
+    """Select the most recent units fitting in `target`; the latest unit is always kept."""
+    kept: List[List[BaseMessage]] = []
+    for unit in reversed(units):
+        unit_tokens = sum(counter.count(m) for m in unit)
+        if kept and used_tokens + unit_tokens > target:
+            break
+        kept.append(unit)
+        used_tokens += unit_tokens
+    kept.reverse()
+    return kept, used_tokens
+
+
+def _index_after(messages: Sequence[BaseMessage], message_id: str) -> int:
+    """Return the index following the message with `message_id`, or 0 if absent."""
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index].id == message_id:
+            return index + 1
+    return 0
+
+
+def _with_summary(summary: str, messages: List[BaseMessage]) -> List[BaseMessage]:
+    if not summary:
+        return messages
+    return [HumanMessage(content=SUMMARY_PREFIX + summary), *messages]
+
+
+# --- Policy Registry ---
+
+PolicyFactory = Callable[[Optional[Summarizer]], ContextPolicy]
+
+_POLICY_FACTORIES: Dict[str, PolicyFactory] = {
+    "none": lambda summarizer: NoopPolicy(),
+    "trim": lambda summarizer: TrimPolicy(),
+}
+
+
+def _summarize_policy_factory(summarizer: Optional[Summarizer]) -> ContextPolicy:
+    if summarizer is None:
+        raise ValueError("The 'summarize' context policy requires a summarizer.")
+    return SummarizePolicy(summarizer)
+
+
+_POLICY_FACTORIES["summarize"] = _summarize_policy_factory
+
+
+def register_context_policy(name: str, factory: PolicyFactory) -> None:
+    """Register a context policy factory under a name usable in `Configuration.context_policy`."""
+    _POLICY_FACTORIES[name] = factory
+
+
+def get_context_policy(name: str, summarizer: Optional[Summarizer] = None) -> ContextPolicy:
+    """Create the context policy registered under `name`."""
+    factory = _POLICY_FACTORIES.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown context policy '{name}'. Available: {sorted(_POLICY_FACTORIES)}")
+    return factory(summarizer)
+
+
+# --- Dependency Injection ---
+_token_counter_instance = TokenCounter()
+
+def get_token_counter() -> TokenCounter:
+    """Return the process-wide TokenCounter singleton."""
+    return _token_counter_instance
@@ -1,15 +1,20 @@
 """Defines interfaces and implementations for executing tools remotely."""
 
 import asyncio
+import json
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
 from react_agent.web.connection import (
     ConnectionManager,
     ConnectionNotFoundError,
     get_connection_manager
 )
+from react_agent.web.result_stream import ToolResultStream
+from react_agent.tool_results import ResultAssembler
+from react_agent.tool_cache import ToolResultCache, get_tool_result_cache
 
 logger = logging.getLogger('executors')
 
@@ -53,7 +58,8 @@ class RemoteToolExecutor(ABC):
         tool_call_id: str,
         tool_name: str,
         tool_args: Dict[str, Any],
-        timeout: float = 30.0  # Default timeout
+        timeout: float = 30.0,  # Default timeout
+        cache_ttl: Optional[float] = None
     ) -> Any:
         """Executes a tool remotely via the specified connection.
 
@@ -63,6 +69,8 @@ class RemoteToolExecutor(ABC):
             tool_name: The name of the tool to execute.
             tool_args: The arguments for the tool.
             timeout: Maximum time in seconds to wait for a response.
+            cache_ttl: If set, the tool is cacheable and its result may be served from
+                or stored in the result cache for this many seconds.
 
         Returns:
             The result returned by the client for the tool execution.
@@ -81,13 +89,24 @@ class RemoteToolExecutor(ABC):
 class WebSocketToolExecutor(RemoteToolExecutor):
     """Executes tools remotely over a WebSocket connection using ConnectionManager."""
 
-    def __init__(self, connection_manager: ConnectionManager):
+    def __init__(
+        self,
+        connection_manager: ConnectionManager,
+        speculative_dispatcher: Optional["SpeculativeToolDispatcher"] = None,
+        result_cache: Optional[ToolResultCache] = None
+    ):
+        """Create an executor sending calls through `connection_manager`.
+
+        The speculative dispatcher and result cache default to the process-wide instances.
+        """
         if connection_manager is None:
              # Fallback if not provided - though dependency injection is preferred
              logger.warning("WebSocketToolExecutor created without explicit ConnectionManager, using global instance.")
              self._manager = get_connection_manager()
         else:
              self._manager = connection_manager
+        self._speculative = speculative_dispatcher or get_speculative_dispatcher()
+        self._cache = result_cache or get_tool_result_cache()
 
     async def execute(
         self,
@@ -95,31 +114,94 @@ class WebSocketToolExecutor(RemoteToolExecutor):
         tool_call_id: str,
         tool_name: str,
         tool_args: Dict[str, Any],
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        cache_ttl: Optional[float] = None
+    ) -> Any:
+        """Executes the tool via WebSocket.
+
+        If the call was already dispatched speculatively while the model was streaming,
+        the running call is collected instead of sending it again. With a `cache_ttl`,
+        a cached result for the same tool and args is returned without a round-trip,
+        and a fresh result is cached for that many seconds.
+        """
+        cache_ttl = self._cacheable_ttl(connection_id, cache_ttl)
+        hit, cached = self._cached_result(connection_id, tool_call_id, tool_name, tool_args, cache_ttl)
+        if hit:
+            return cached
+        result = await self._execute_remote(connection_id, tool_call_id, tool_name, tool_args, timeout)
+        if cache_ttl:
+            self._cache.put(connection_id, tool_name, tool_args, result, cache_ttl)
+        return result
+
+    def _cacheable_ttl(self, connection_id: str, cache_ttl: Optional[float]) -> Optional[float]:
+        # Invalidations only reach the node holding the client's WebSocket, so results of
+        # connections routed to another node are not cached here
+        if cache_ttl and not self._manager.is_local(connection_id):
+            return None
+        return cache_ttl
+
+    def _cached_result(
+        self,
+        connection_id: str,
+        tool_call_id: str,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        cache_ttl: Optional[float]
+    ) -> Tuple[bool, Any]:
+        if not cache_ttl:
+            return False, None
+        hit, cached = self._cache.get(connection_id, tool_name, tool_args)
+        if hit:
+            logger.info(f"Executor serving tool '{tool_name}' (ID: {tool_call_id}) from cache")
+            # A speculative dispatch of the same call is no longer needed
+            self._speculative.discard(connection_id, [tool_call_id])
+        return hit, cached
+
+    async def _execute_remote(
+        self,
+        connection_id: str,
+        tool_call_id: str,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        timeout: float,
+        response_timeout: Optional[float] = None
     ) -> Any:
-        """Executes the tool via WebSocket."""
-        logger.info(f"Executor requesting tool '{tool_name}' (ID: {tool_call_id}) via connection {connection_id}")
+        """Send (or collect) a tool call and wait for its result.
+
+        `response_timeout` bounds the wait for the first response and defaults to
+        `timeout`; for chunked results `timeout` also bounds the gaps between frames.
+        """
         try:
-            # Request the tool call via ConnectionManager, get the Future
-            response_future = await self._manager.call_tool(
-                connection_id=connection_id,
-                tool_call_id=tool_call_id,
-                tool_name=tool_name,
-                tool_args=tool_args
-            )
+            speculative_call = self._speculative.take(connection_id, tool_call_id)
+            if speculative_call is not None:
+                logger.info(f"Executor collecting speculatively dispatched tool '{tool_name}' (ID: {tool_call_id})")
+                response_future: asyncio.Future = speculative_call
+            else:
+                logger.info(f"Executor requesting tool '{tool_name}' (ID: {tool_call_id}) via connection {connection_id}")
+                # Request the tool call via ConnectionManager, get the Future
+                response_future = await self._manager.call_tool(
+                    connection_id=connection_id,
+                    tool_call_id=tool_call_id,
+                    tool_name=tool_name,
+                    tool_args=tool_args
+                )
 
             # Wait for the Future to complete with a timeout
-            result = await asyncio.wait_for(response_future, timeout=timeout)
+            result = await asyncio.wait_for(
+                response_future, timeout=timeout if response_timeout is None else response_timeout
+            )
+            if isinstance(result, ToolResultStream):
+                # Chunked result: the timeout now applies to the gaps between frames
+                result = await self._collect_stream(result, timeout)
             logger.info(f"Executor received result for tool call {tool_call_id}")
             return result
 
         except ConnectionNotFoundError as e:
             logger.error(f"Executor error: Connection {connection_id} not found.")
             raise ClientUnavailableError(connection_id=connection_id) from e
-        except asyncio.TimeoutError as e:
+        except TimeoutError as e:
             logger.error(f"Executor error: Tool call {tool_call_id} timed out after {timeout}s.")
-            # Note: The future might still be in response_callbacks; ConnectionManager.disconnect handles cleanup.
-            # Consider if ConnectionManager should have a specific cancel method too.
+            # wait_for cancelled the future, which removes it from the connection's pending calls
             raise ToolTimeoutError(tool_call_id=tool_call_id, timeout=timeout) from e
         except Exception as e:
             # Catch potential send errors re-raised by call_tool or other unexpected issues
@@ -128,4 +210,235 @@ class WebSocketToolExecutor(RemoteToolExecutor):
             logger.error(f"Executor error during tool call {tool_call_id} for {connection_id}: {e}", exc_info=True)
             # If we had a more specific SendError from call_tool:
             # raise ToolSendError(tool_call_id, connection_id, e) from e
-            raise ToolExecutionError(f"An unexpected error occurred during tool call {tool_call_id}: {e}") from e 
\ No newline at end of file
+            raise ToolExecutionError(f"An unexpected error occurred during tool call {tool_call_id}: {e}") from e
+
+    async def _collect_stream(self, stream: ToolResultStream, idle_timeout: float) -> Any:
+        """Assemble a chunked tool result. Each chunk or progress frame restarts the timeout."""
+        assembler = ResultAssembler()
+        try:
+            async for chunk in stream.chunks(idle_timeout=idle_timeout):
+                await assembler.add_async(chunk)
+            return await assembler.result_async()
+        except BaseException:
+            assembler.discard()
+            raise
+        finally:
+            stream.close()
+
+    async def execute_many(
+        self,
+        connection_id: str,
+        tool_calls: Sequence[Dict[str, Any]],
+        timeout: float = 30.0,
+        max_concurrency: int = 8,
+        cache_ttls: Optional[Mapping[str, float]] = None
+    ) -> List[Any]:
+        """Execute several tool calls concurrently over one connection.
+
+        All calls are sent at once, bounded by the connection's in-flight cap, and
+        each one gets its own timeout, which includes any wait for a free slot.
+        Failures do not cancel sibling calls.
+
+        Args:
+            connection_id: The unique identifier for the client connection.
+            tool_calls: Tool call dicts with 'id', 'name' and 'args' keys.
+            timeout: Maximum time in seconds to wait for each individual response.
+            max_concurrency: Maximum number of calls in flight on the connection.
+            cache_ttls: Result cache TTLs by tool name, for tools declared cacheable.
+
+        Returns:
+            One entry per tool call, in the same order as `tool_calls`. Each entry is
+            either the client's result or the exception raised for that call.
+        """
+        try:
+            call_slots = self._manager.get_call_slots(connection_id, max_concurrency)
+        except ConnectionNotFoundError:
+            logger.error(f"Executor error: Connection {connection_id} not found.")
+            return [ClientUnavailableError(connection_id=connection_id) for _ in tool_calls]
+
+        cache_ttls = cache_ttls or {}
+
+        async def _execute_one(tool_call: Dict[str, Any]) -> Any:
+            cache_ttl = self._cacheable_ttl(connection_id, cache_ttls.get(tool_call['name']))
+            # Cache hits never take a call slot
+            hit, cached = self._cached_result(connection_id, tool_call['id'], tool_call['name'], tool_call['args'], cache_ttl)
+            if hit:
+                return cached
+            if self._speculative.has(connection_id, tool_call['id']):
+                # Already in flight; holding a slot while collecting it would only block other calls
+                result = await self._execute_remote(connection_id, tool_call['id'], tool_call['name'], tool_call['args'], timeout)
+            else:
+                started = time.monotonic()
+                try:
+                    if call_slots.locked():
+                        await asyncio.wait_for(call_slots.acquire(), timeout=timeout)
+                    else:
+                        await call_slots.acquire()  # Free slot: no timer needed
+                except TimeoutError as e:
+                    logger.error(f"Executor error: Tool call {tool_call['id']} found no free call slot within {timeout}s.")
+                    raise ToolTimeoutError(tool_call_id=tool_call['id'], timeout=timeout) from e
+                try:
+                    result = await self._execute_remote(
+                        connection_id, tool_call['id'], tool_call['name'], tool_call['args'], timeout,
+                        response_timeout=max(0.0, timeout - (time.monotonic() - started))
+                    )
+                finally:
+                    call_slots.release()
+            if cache_ttl:
+                self._cache.put(connection_id, tool_call['name'], tool_call['args'], result, cache_ttl)
+            return result
+
+        logger.info(f"Executor dispatching {len(tool_calls)} tool calls concurrently via connection {connection_id}")
+        # gather preserves input order, so results line up with tool_calls
+        return await asyncio.gather(
+            *(_execute_one(tool_call) for tool_call in tool_calls),
+            return_exceptions=True
+        )
+
+
+# --- Speculative Dispatch ---
+
+class SpeculativeToolDispatcher:
+    """Sends tool calls to the client while the model is still streaming its response.
+
+    A tool call is dispatched as soon as its arguments have fully streamed. The
+    running call is later collected by `WebSocketToolExecutor.execute` under the same
+    tool call ID, so client-side execution overlaps with the rest of the generation.
+    """
+
+    def __init__(self, connection_manager: Optional[ConnectionManager] = None, max_age_seconds: float = 600.0):
+        """Create the dispatcher; uncollected finished calls are dropped after `max_age_seconds`."""
+        self._manager = connection_manager
+        self.max_age_seconds = max_age_seconds
+        self._calls: Dict[Tuple[str, str], Tuple[float, asyncio.Task[Any]]] = {}
+
+    def dispatch(self, connection_id: str, tool_call: Dict[str, Any], max_concurrency: int = 8) -> None:
+        """Start executing a tool call on the client, unless it was already dispatched.
+
+        The call waits for one of the connection's call slots (see
+        `ConnectionManager.get_call_slots`), created with `max_concurrency` if needed.
+        """
+        key = (connection_id, tool_call['id'])
+        if key in self._calls:
+            return
+        self._prune()
+        logger.info(f"Speculatively dispatching tool '{tool_call['name']}' (ID: {tool_call['id']}) via connection {connection_id}")
+        task = asyncio.ensure_future(self._call(connection_id, tool_call, max_concurrency))
+        # Mark exceptions as retrieved so discarded calls don't log "never retrieved" warnings
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._calls[key] = (time.monotonic(), task)
+
+    def has(self, connection_id: str, tool_call_id: str) -> bool:
+        """Return whether a speculative call is waiting to be collected."""
+        return (connection_id, tool_call_id) in self._calls
+
+    def take(self, connection_id: str, tool_call_id: str) -> Optional[asyncio.Task[Any]]:
+        """Remove and return the running speculative call, if any."""
+        entry = self._calls.pop((connection_id, tool_call_id), None)
+        return entry[1] if entry else None
+
+    def discard(self, connection_id: str, tool_call_ids: Iterable[str]) -> None:
+        """Cancel and forget speculative calls that will never be collected.
+
+        A call that already resolved to a chunked result has its stream closed, so
+        frames still arriving for it are dropped instead of filling its buffer.
+        """
+        for tool_call_id in tool_call_ids:
+            task = self.take(connection_id, tool_call_id)
+            if task is None:
+                continue
+            if task.done():
+                _close_stream_result(task)
+            else:
+                logger.info(f"Cancelling unused speculative tool call {tool_call_id} for connection {connection_id}")
+                task.cancel()
+
+    def drop_connection(self, connection_id: str) -> None:
+        """Cancel and forget all speculative calls of a connection, e.g. when it disconnects."""
+        self.discard(connection_id, [tool_call_id for cid, tool_call_id in list(self._calls) if cid == connection_id])
+
+    def stream_listener(self, connection_id: str, max_concurrency: int = 8) -> "SpeculativeStreamListener":
+        """Create a chunk listener for one streamed model response on a connection."""
+        return SpeculativeStreamListener(self, connection_id, max_concurrency)
+
+    async def _call(self, connection_id: str, tool_call: Dict[str, Any], max_concurrency: int) -> Any:
+        manager = self._manager or get_connection_manager()
+        # The slot covers the request until the client's response (or the first frame
+        # of a chunked result) arrives
+        async with manager.get_call_slots(connection_id, max_concurrency):
+            response_future = await manager.call_tool(
+                connection_id=connection_id,
+                tool_call_id=tool_call['id'],
+                tool_name=tool_call['name'],
+                tool_args=tool_call['args']
+            )
+            try:
+                return await response_future
+            except asyncio.CancelledError:
+                # Cancelled just as the response arrived: nobody will read it
+                _close_stream_result(response_future)
+                raise
+
+    def _prune(self) -> None:
+        # Drop finished calls nobody collected, e.g. because the run was aborted
+        cutoff = time.monotonic() - self.max_age_seconds
+        for key, (dispatched_at, task) in list(self._calls.items()):
+            if dispatched_at < cutoff and task.done():
+                del self._calls[key]
+                _close_stream_result(task)
+
+
+def _close_stream_result(future: asyncio.Future[Any]) -> None:
+    """Close the chunked result a finished call resolved to, if any."""
+    if future.done() and not future.cancelled() and future.exception() is None:
+        result = future.result()
+        if isinstance(result, ToolResultStream):
+            result.close()
+
+
+class SpeculativeStreamListener:
+    """Chunk listener that dispatches each tool call once its arguments are complete.
+
+    Pass it as `on_chunk` to `make_streaming_invoke`, then call `retain` with the final
+    tool calls so calls that did not make it into the final response are cancelled.
+    """
+
+    def __init__(self, dispatcher: SpeculativeToolDispatcher, connection_id: str, max_concurrency: int = 8):
+        """Create a listener dispatching through `dispatcher` on `connection_id`."""
+        self._dispatcher = dispatcher
+        self._connection_id = connection_id
+        self._max_concurrency = max_concurrency
+        self.dispatched_ids: Set[str] = set()
+
+    def __call__(self, chunk: Any, aggregate: Any) -> None:
+        """Inspect the aggregated tool call chunks and dispatch completed calls."""
+        if not getattr(chunk, "tool_call_chunks", None):
+            return
+        for tool_call_chunk in aggregate.tool_call_chunks:
+            tool_call_id = tool_call_chunk.get("id")
+            name = tool_call_chunk.get("name")
+            raw_args = (tool_call_chunk.get("args") or "").rstrip()
+            if not tool_call_id or not name or tool_call_id in self.dispatched_ids or not raw_args.endswith("}"):
+                continue
+            try:
+                args = json.loads(raw_args)
+            except ValueError:
+                continue  # Arguments still streaming
+            if isinstance(args, dict):
+                self.dispatched_ids.add(tool_call_id)
+                self._dispatcher.dispatch(
+                    self._connection_id, {"id": tool_call_id, "name": name, "args": args}, self._max_concurrency
+                )
+
+    def retain(self, tool_calls: Sequence[Dict[str, Any]]) -> None:
+        """Cancel dispatched calls that are not part of the final response."""
+        final_ids = {tool_call['id'] for tool_call in tool_calls}
+        self._dispatcher.discard(self._connection_id, self.dispatched_ids - final_ids)
+
+
+# --- Dependency Injection ---
+_speculative_dispatcher_instance = SpeculativeToolDispatcher()
+
+def get_speculative_dispatcher() -> SpeculativeToolDispatcher:
+    """Return the process-wide SpeculativeToolDispatcher singleton."""
+    return _speculative_dispatcher_instance
@@ -2,11 +2,13 @@
 
 Works with a chat model with tool calling support.
 """
+import asyncio
 import logging
+import time
 from typing import Dict, List, Literal, cast, Any, Callable, Awaitable, Optional 
 
 
-from langchain_core.messages import AIMessage, ToolMessage # Added ToolMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph
 # ToolNode is not used directly anymore
@@ -20,59 +22,285 @@ from react_agent.state import InputState, State
 from react_agent.web.connection import get_connection_manager
 # Import the executor and its exceptions
 from react_agent.executors import (
+    SpeculativeStreamListener,
     WebSocketToolExecutor,
+    get_speculative_dispatcher,
     ToolTimeoutError,
     ClientUnavailableError,
     ToolExecutionError
 )
-from react_agent.utils import load_chat_model, normalize_message_for_openai
-
-from react_agent.prompts import SYSTEM_PROMPT
+from react_agent.utils import get_message_text, load_chat_model, load_chat_model_with_tools, normalize_message_for_openai, normalize_messages_for_openai
+
+from react_agent.prompts import SUMMARY_PROMPT, TOOL_RESULT_SUMMARY_PROMPT
+from react_agent.tool_results import ResultSummarizer, shape_tool_result
+from react_agent.log_utils import clip_for_log
+from react_agent.tool_cache import cache_ttls_for_tools
+from react_agent.prompt_cache import (
+    build_system_prompt,
+    cache_bind_kwargs,
+    cached_token_usage,
+    get_prompt_cache_stats,
+    stable_tool_order,
+    system_message as build_system_message,
+)
+from react_agent.model_registry import tool_schema_fingerprint
+from react_agent.context import get_context_policy, get_token_counter
+from react_agent.streaming import ModelInvokeFunc, make_streaming_invoke, start_reporting_first_output
+from react_agent.resilience import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitBreakerSettings,
+    CircuitOpenError,
+    get_circuit_breakers,
+    get_hedge_stats,
+    get_latency_tracker,
+)
 
 # Initialize logger for this module
 logger = logging.getLogger('graph')
 
 
+def _start_model_call(
+    invoke_func: ModelInvokeFunc,
+    breaker: Optional[CircuitBreaker],
+    messages_arg: List[Any],
+    config_arg: Any,
+    on_first_output: Optional[Callable[[], None]] = None,
+) -> "asyncio.Task[Any]":
+    """Start a model call as a task whose outcome is reported to its circuit breaker.
+
+    If `on_first_output` is given, a streaming call reports its first chunk to it.
+    """
+    if on_first_output is not None:
+        task = start_reporting_first_output(invoke_func(messages_arg, config_arg), on_first_output)
+    else:
+        task = asyncio.ensure_future(invoke_func(messages_arg, config_arg))
+    if breaker is not None:
+        def _record_outcome(done: "asyncio.Future[Any]") -> None:
+            if done.cancelled():
+                breaker.release()
+            elif done.exception() is None:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        task.add_done_callback(_record_outcome)
+    return task
+
+
 async def _invoke_llm_with_retry_and_fallback(
-    primary_model_invoke_func: Callable[[List[Any], Any], Awaitable[Any]],
-    fallback_model_invoke_func: Optional[Callable[[List[Any], Any], Awaitable[Any]]],
+    primary_model_invoke_func: ModelInvokeFunc,
+    fallback_model_loader: Optional[Callable[[], Optional[ModelInvokeFunc]]],
     primary_model_identifier: str,
     fallback_model_identifier: Optional[str],
     messages_arg: List[Any],
     config_arg: Any,
+    hedge_delay: Optional[float] = None,
+    circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+    circuit_breaker_settings: Optional[CircuitBreakerSettings] = None,
 ) -> Any:
     """
     Invokes an LLM: attempts primary model once.
-    If the primary model fails for ANY reason, it attempts the fallback model once (if provided).
+    If the primary model fails for ANY reason, it loads the fallback model on demand through
+    `fallback_model_loader` and attempts it once (if provided). The happy path never builds
+    the fallback.
+    If `hedge_delay` is set and the primary has neither returned nor started streaming
+    within that many seconds, the fallback is started alongside it; the first call to
+    stream output (or to succeed) wins and the other call is cancelled.
+    If `circuit_breakers` are given, every call outcome is recorded per model, and while the
+    primary's circuit is open the call is routed straight to the fallback. A fallback whose
+    own circuit is open is never called (nor used for hedging); the primary error is raised.
     If both fail, the exception from the fallback attempt (or primary, if no fallback) is raised.
-    The max_retries and base_delay_seconds parameters are currently not used in this logic.
     """
     primary_exception: Optional[Exception] = None
-    logger.info(f"Attempting to invoke primary model: '{primary_model_identifier}'")
-    try:
-        return await primary_model_invoke_func(messages_arg, config_arg)
-    except Exception as e_primary:
-        primary_exception = e_primary
-        logger.warning(f"Primary model '{primary_model_identifier}' failed with error: {e_primary}. Attempting fallback.")
+    fallback_model_invoke_func: Optional[ModelInvokeFunc] = None
+    fallback_loaded = False
+
+    def _load_fallback() -> Optional[ModelInvokeFunc]:
+        nonlocal fallback_model_invoke_func, fallback_loaded
+        if not fallback_loaded and fallback_model_loader and fallback_model_identifier:
+            fallback_loaded = True
+            try:
+                fallback_model_invoke_func = fallback_model_loader()
+            except Exception as e_load:
+                logger.warning(f"Fallback model '{fallback_model_identifier}' could not be loaded: {e_load}")
+        return fallback_model_invoke_func
+
+    primary_breaker: Optional[CircuitBreaker] = None
+    fallback_breaker: Optional[CircuitBreaker] = None
+    if circuit_breakers is not None:
+        primary_breaker = circuit_breakers.get(primary_model_identifier, circuit_breaker_settings)
+        if fallback_model_identifier:
+            fallback_breaker = circuit_breakers.get(fallback_model_identifier, circuit_breaker_settings)
+
+    def _fallback_allowed() -> bool:
+        # Reserves a half-open probe slot, so only ask right before calling the fallback
+        if fallback_breaker is None or fallback_breaker.allow_request():
+            return True
+        logger.warning(f"Circuit for fallback model '{fallback_model_identifier}' is open; not calling it.")
+        return False
+
+    if primary_breaker is not None and not primary_breaker.allow_request() and _load_fallback():
+        # Primary has been failing; don't pay its failure latency again
+        primary_exception = CircuitOpenError(primary_model_identifier)
+        logger.warning(f"Circuit for primary model '{primary_model_identifier}' is open. Routing to fallback.")
+    else:
+        logger.info(f"Attempting to invoke primary model: '{primary_model_identifier}'")
+        started = time.monotonic()
+        primary_output = asyncio.Event()
+
+        def _on_primary_output() -> None:
+            primary_output.set()
+            get_latency_tracker().observe(_first_output_latency_key(primary_model_identifier), time.monotonic() - started)
 
-    # If we reach here, primary model failed. Attempt fallback if available.
-    if fallback_model_invoke_func and fallback_model_identifier:
+        primary_task = _start_model_call(
+            primary_model_invoke_func, primary_breaker, messages_arg, config_arg, on_first_output=_on_primary_output
+        )
+        try:
+            if hedge_delay is not None and fallback_model_loader and fallback_model_identifier:
+                output_waiter = asyncio.ensure_future(primary_output.wait())
+                try:
+                    done, _ = await asyncio.wait(
+                        {primary_task, output_waiter}, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    output_waiter.cancel()
+                if not done and _load_fallback() and _fallback_allowed():
+                    fallback_output = asyncio.Event()
+                    fallback_task = _start_model_call(
+                        cast(ModelInvokeFunc, fallback_model_invoke_func), fallback_breaker, messages_arg, config_arg,
+                        on_first_output=fallback_output.set,
+                    )
+                    winner = await _race_hedged_calls(
+                        primary_task=primary_task,
+                        primary_output=primary_output,
+                        fallback_task=fallback_task,
+                        fallback_output=fallback_output,
+                        primary_model_identifier=primary_model_identifier,
+                        fallback_model_identifier=cast(str, fallback_model_identifier),
+                    )
+                    if winner is fallback_task:
+                        try:
+                            return await fallback_task
+                        except Exception as e_fallback:
+                            logger.error(f"Fallback model '{fallback_model_identifier}' failed after winning the hedge: {e_fallback}")
+                            raise
+            try:
+                result = await primary_task
+            except Exception as e_primary:
+                primary_exception = e_primary
+                logger.warning(f"Primary model '{primary_model_identifier}' failed with error: {e_primary}. Attempting fallback.")
+            else:
+                get_latency_tracker().observe(primary_model_identifier, time.monotonic() - started)
+                return result
+        finally:
+            if not primary_task.done():
+                primary_task.cancel()
+
+    # If we reach here, primary model failed. Load and attempt fallback if available.
+    if _load_fallback() and _fallback_allowed():
         logger.info(f"Attempting to invoke fallback model: '{fallback_model_identifier}'")
         try:
-            return await fallback_model_invoke_func(messages_arg, config_arg)
+            return await _start_model_call(
+                cast(ModelInvokeFunc, fallback_model_invoke_func), fallback_breaker, messages_arg, config_arg
+            )
         except Exception as e_fallback:
             logger.error(f"Fallback model '{fallback_model_identifier}' also failed: {e_fallback}")
-            if primary_exception: 
-                raise e_fallback from primary_exception
-    elif primary_exception:
-        # Fallback not available or not attempted, but primary had an error.
-        logger.error(f"Primary model '{primary_model_identifier}' failed, and no fallback was available or attempted successfully. Re-raising primary error.")
-        raise primary_exception
+            raise e_fallback from primary_exception
+
+    # Fallback not available or not attempted, but primary had an error.
+    logger.error(f"Primary model '{primary_model_identifier}' failed, and no fallback was available or attempted successfully. Re-raising primary error.")
+    raise cast(Exception, primary_exception)
+
+
+async def _race_hedged_calls(
+    primary_task: "asyncio.Future[Any]",
+    primary_output: asyncio.Event,
+    fallback_task: "asyncio.Future[Any]",
+    fallback_output: asyncio.Event,
+    primary_model_identifier: str,
+    fallback_model_identifier: str,
+) -> "asyncio.Future[Any]":
+    """Race a slow, still-running primary call against a freshly started fallback call.
+
+    The first call to stream output (its `*_output` event is set) or to succeed wins,
+    and the other call is cancelled, so clients only ever receive the winner's tokens.
+    Returns the winning task, which may still be running. If both fail before either
+    produced output, the fallback's exception is raised, chained from the primary's.
+    """
+    hedge_stats = get_hedge_stats()
+    hedge_stats.record_hedge()
+    logger.warning(f"Primary model '{primary_model_identifier}' is slow; hedging with fallback model '{fallback_model_identifier}'")
+
+    owners = {primary_task: primary_model_identifier, fallback_task: fallback_model_identifier}
+    outputs = {primary_task: primary_output, fallback_task: fallback_output}
+    output_waiters = {task: asyncio.ensure_future(outputs[task].wait()) for task in owners}
+    errors: Dict[Any, BaseException] = {}
+    pending = set(owners)
+    try:
+        while pending:
+            await asyncio.wait(
+                pending | {output_waiters[task] for task in pending}, return_when=asyncio.FIRST_COMPLETED
+            )
+            # Prefer the primary when both are ready in the same iteration
+            for task in sorted(pending, key=lambda t: t is not primary_task):
+                if task.done():
+                    error = asyncio.CancelledError() if task.cancelled() else task.exception()
+                    if error is not None:
+                        pending.discard(task)
+                        errors[task] = error
+                        logger.warning(f"Hedged model '{owners[task]}' failed with error: {error}")
+                        continue
+                elif not outputs[task].is_set():
+                    continue
+                pending.discard(task)
+                hedge_stats.record_win(owners[task])
+                logger.info(f"Hedged model call won by '{owners[task]}'")
+                return task
+    finally:
+        for waiter in output_waiters.values():
+            waiter.cancel()
+        for task in pending:
+            task.cancel()
+
+    raise errors[fallback_task] from errors[primary_task]
+
+
+def _first_output_latency_key(model_identifier: str) -> str:
+    """Return the latency tracker key for a model's time to first streamed output."""
+    return f"{model_identifier}#first_output"
+
+
+def _make_summarizer(model_identifier: str) -> Callable[[str, List[BaseMessage]], Awaitable[str]]:
+    """Build a summarizer for the 'summarize' context policy using the given model."""
+    async def _summarize(previous_summary: str, messages: List[BaseMessage]) -> str:
+        transcript = "\n".join(
+            f"{message.type}: {get_message_text(message)[:4000]}" for message in messages
+        )
+        summary_model = load_chat_model(model_identifier)
+        response = await summary_model.ainvoke([
+            SystemMessage(content=SUMMARY_PROMPT),
+            HumanMessage(content=f"Previous summary:\n{previous_summary or '(none)'}\n\nMessages being removed:\n{transcript}"),
+        ])
+        return get_message_text(response)
+    return _summarize
+
+
+def _make_tool_result_summarizer(model_identifier: str) -> ResultSummarizer:
+    """Build a summarizer for oversized tool results using the given model."""
+    async def _summarize(tool_name: str, text: str, max_chars: int) -> str:
+        summary_model = load_chat_model(model_identifier)
+        response = await summary_model.ainvoke([
+            SystemMessage(content=TOOL_RESULT_SUMMARY_PROMPT.format(max_chars=max_chars)),
+            HumanMessage(content=f"Tool: {tool_name}\n\nOutput:\n{text}"),
+        ])
+        return get_message_text(response)
+    return _summarize
+
 
 # Define the function that calls the model
 async def call_model(
     state: State, config: RunnableConfig
-) -> Dict[str, List[AIMessage]]: # Return only messages
+) -> Dict[str, Any]: # Return only messages (and the context summary, if updated)
     """Call the LLM powering our "agent".
 
     Retrieves necessary configuration (tools, connection ID) from the RunnableConfig.
@@ -95,6 +323,9 @@ async def call_model(
 
     websocket_connection_id = configuration.websocket_connection_id
     user_tools = configuration.tools or [] # Ensure tools is a list
+    if configuration.prompt_caching:
+        # A stable tool order keeps the cacheable prompt prefix identical across steps and runs
+        user_tools = stable_tool_order(user_tools)
 
     if not websocket_connection_id:
          logger.error("Missing websocket_connection_id in configuration for call_model.")
@@ -107,57 +338,172 @@ async def call_model(
     # --- Get run-specific config --- END
     primary_model_identifier = configuration.model
     # Initialize the model with tool binding.
-    
-    model = load_chat_model(primary_model_identifier)
-    if user_tools: # Only bind tools if they exist
-        model = model.bind_tools(user_tools)
-    
-    
+    # Bindings are cached per model and toolset, so repeated steps skip schema conversion.
+    model = load_chat_model_with_tools(primary_model_identifier, user_tools)
 
-    # Format the system prompt.
-    system_message = SYSTEM_PROMPT + "\n\n" +configuration.system_prompt;
+    # Format the system prompt (static agent prompt first, so the prefix is stable).
+    system_message = build_system_prompt(configuration.system_prompt)
 
     # Normalize all messages to prevent OpenAI API errors
     # when both tool_calls and function_call attributes exist
-    processed_state_messages = [normalize_message_for_openai(msg) for msg in state.messages]
+    # (cached per message object, so only newly appended messages are processed)
+    processed_state_messages = normalize_messages_for_openai(state.messages)
     
-    _messages = [{"role": "system", "content": system_message}, *processed_state_messages]
+    # Fit the history into the model's token budget before sending it
+    token_counter = get_token_counter()
+    context_policy = get_context_policy(
+        configuration.context_policy, _make_summarizer(primary_model_identifier)
+    )
+    context_window = await context_policy.fit(
+        processed_state_messages,
+        configuration.context_model_budgets.get(primary_model_identifier, configuration.context_max_tokens),
+        # The tool schemas are sent with every call too and often take thousands of tokens
+        token_counter.count_text(system_message) + token_counter.count_tools(user_tools),
+        token_counter,
+        state.context_summary,
+        state.context_summary_through_id,
+        trimmed_through_id=state.context_trimmed_through_id,
+    )
+    logger.info(f"Context for {websocket_connection_id}: ~{context_window.tokens} tokens, {context_window.dropped} messages dropped")
+
+    _messages = [{"role": "system", "content": system_message}, *context_window.messages]
      
     logger.info(f"Invoking model for connection {websocket_connection_id}")
     
-    fallback_model_instance = load_chat_model(configuration.fallback_model) 
-    
-    _fallback_invoke_func: Optional[Callable[[List[Any], Any], Awaitable[Any]]] = None
-    effective_fallback_model_identifier: Optional[str] = None
+    # Tool calls of the primary model can be sent to the client while it is still streaming
+    speculative_listener: Optional[SpeculativeStreamListener] = None
+    if configuration.speculative_tool_dispatch and configuration.stream_tokens and user_tools:
+        speculative_listener = get_speculative_dispatcher().stream_listener(
+            websocket_connection_id, configuration.max_concurrent_tool_calls
+        )
+
+    def _invoke_func(
+        bound_model: Any, model_identifier: str, on_chunk: Optional[SpeculativeStreamListener] = None
+    ) -> ModelInvokeFunc:
+        if configuration.prompt_caching:
+            bind_kwargs = cache_bind_kwargs(model_identifier, system_message, tool_schema_fingerprint(user_tools))
+            if bind_kwargs:
+                bound_model = bound_model.bind(**bind_kwargs)
+        # Streaming surfaces tokens through LangGraph stream modes while still returning a full AIMessage
+        if configuration.stream_tokens:
+            invoke = make_streaming_invoke(bound_model, model_identifier, on_chunk=on_chunk)
+        else:
+            invoke = bound_model.ainvoke
+        # The system message carries provider-specific cache markers, so it is built per model
+        model_system_message = build_system_message(model_identifier, system_message, configuration.prompt_caching)
+
+        async def _invoke(messages: List[Any], invoke_config: Any) -> Any:
+            return await invoke([model_system_message, *messages[1:]], invoke_config)
+        return _invoke
+
+    def _load_fallback_invoke_func() -> Optional[ModelInvokeFunc]:
+        # Only called after the primary model failed (or is being hedged)
+        fallback_model_instance = load_chat_model_with_tools(configuration.fallback_model, user_tools)
+        return _invoke_func(fallback_model_instance, configuration.fallback_model) if fallback_model_instance else None
+
+    hedge_delay: Optional[float] = None
+    if configuration.hedge_fallback:
+        # Hedge once the primary is slower than its recent p95 (or the static delay until warm);
+        # streamed calls are judged by their time to first output, not to completion
+        latency_key = _first_output_latency_key(primary_model_identifier) if configuration.stream_tokens else primary_model_identifier
+        hedge_delay = get_latency_tracker().percentile(latency_key, configuration.hedge_percentile)
+        if hedge_delay is None:
+            hedge_delay = configuration.hedge_delay_seconds
+
+    circuit_breakers: Optional[CircuitBreakerRegistry] = None
+    circuit_breaker_settings: Optional[CircuitBreakerSettings] = None
+    if configuration.circuit_breaker_enabled:
+        circuit_breakers = get_circuit_breakers()
+        circuit_breaker_settings = CircuitBreakerSettings(
+            window_size=configuration.circuit_breaker_window,
+            min_calls=configuration.circuit_breaker_min_calls,
+            failure_rate=configuration.circuit_breaker_failure_rate,
+            open_seconds=configuration.circuit_breaker_open_seconds,
+        )
 
-    if fallback_model_instance:
-        fallback_model_instance = fallback_model_instance.bind_tools(user_tools)
-        _fallback_invoke_func = fallback_model_instance.ainvoke
-        effective_fallback_model_identifier = configuration.fallback_model
-    else:
-        logger.warning(f"Fallback model '{configuration.fallback_model}' could not be loaded. Proceeding without fallback.")
-        _fallback_invoke_func = None
-        effective_fallback_model_identifier = None
-
-    response = cast(
-        AIMessage,
-        await _invoke_llm_with_retry_and_fallback(
-            primary_model_invoke_func=model.ainvoke,
-            fallback_model_invoke_func=_fallback_invoke_func,
-            primary_model_identifier=primary_model_identifier,
-            fallback_model_identifier=effective_fallback_model_identifier,
-            messages_arg=_messages,
-            config_arg=config,
-        ),
-    )
+    try:
+        response = cast(
+            AIMessage,
+            await _invoke_llm_with_retry_and_fallback(
+                primary_model_invoke_func=_invoke_func(model, primary_model_identifier, speculative_listener),
+                fallback_model_loader=_load_fallback_invoke_func,
+                primary_model_identifier=primary_model_identifier,
+                fallback_model_identifier=configuration.fallback_model or None,
+                messages_arg=_messages,
+                config_arg=config,
+                hedge_delay=hedge_delay,
+                circuit_breakers=circuit_breakers,
+                circuit_breaker_settings=circuit_breaker_settings,
+            ),
+        )
+    except BaseException:
+        if speculative_listener is not None:
+            speculative_listener.retain([])
+        raise
+    if speculative_listener is not None:
+        # Cancel calls dispatched from a stream that did not become the final response
+        speculative_listener.retain(response.tool_calls)
     logger.info(f"Model response received for {websocket_connection_id}. Tool calls: {bool(response.tool_calls)}")
-
-    # Return ONLY the messages update
-    return {"messages": [response]}
+    cached_tokens, input_tokens = cached_token_usage(response)
+    if input_tokens:
+        responding_model = response.response_metadata.get("model_name") or primary_model_identifier
+        get_prompt_cache_stats().record(responding_model, cached_tokens, input_tokens)
+        logger.info(f"Prompt cache for {websocket_connection_id}: {cached_tokens}/{input_tokens} input tokens cached ({responding_model})")
+
+    # Normalize once as the message enters state, so later steps never need to copy it
+    update: Dict[str, Any] = {"messages": [normalize_message_for_openai(response)]}
+    if context_window.summary is not None:
+        update["context_summary"] = context_window.summary
+        update["context_summary_through_id"] = context_window.summary_through_id
+    if context_window.trimmed_through_id is not None:
+        update["context_trimmed_through_id"] = context_window.trimmed_through_id
+    return update
+
+
+async def _tool_message_from_outcome(
+    tool_call: Dict[str, Any],
+    outcome: Any,
+    configuration: Configuration,
+    summarizer: Optional[ResultSummarizer] = None,
+) -> ToolMessage:
+    """Convert the result or exception of a remote tool call into a ToolMessage.
+
+    Results above the tool's size limit are shortened; the full result is kept in
+    the blob store and referenced from the message artifact.
+    """
+    tool_call_id = tool_call['id']
+    tool_name = tool_call['name']
+
+    if not isinstance(outcome, BaseException):
+        max_chars = configuration.tool_result_limits.get(tool_name, configuration.tool_result_max_chars)
+        content, artifact = await shape_tool_result(
+            tool_name, outcome, max_chars, configuration.tool_result_truncation, summarizer=summarizer
+        )
+        logger.info("Received result for tool call %s: %s", tool_call_id, clip_for_log(content))
+        return ToolMessage(content=content, tool_call_id=tool_call_id, artifact=artifact)
+
+    if isinstance(outcome, ToolTimeoutError):
+        logger.error(f"Error executing tool call {tool_call_id}: {outcome}")
+        content = f"Error: Tool '{tool_name}' timed out after {outcome.timeout} seconds."
+    elif isinstance(outcome, ClientUnavailableError):
+        logger.error(f"Error executing tool call {tool_call_id}: {outcome}")
+        content = f"Error: Client connection for tool '{tool_name}' is not available."
+    elif isinstance(outcome, ToolExecutionError):
+        logger.error(f"Error executing tool call {tool_call_id}: {outcome}", exc_info=outcome)
+        content = f"Error: Failed to execute tool '{tool_name}'. Reason: {outcome}"
+    else:
+        logger.error(f"Unexpected error processing tool call {tool_call_id} ('{tool_name}')", exc_info=outcome)
+        content = f"Error: An unexpected error occurred while trying to execute tool '{tool_name}'."
+    return ToolMessage(content=content, tool_call_id=tool_call_id)
 
 
 async def remote_tools_node(state: State, config: RunnableConfig) -> Dict[str, List[ToolMessage]]:
-    """Executes tools remotely using the WebSocketToolExecutor."""
+    """Executes tools remotely using the WebSocketToolExecutor.
+
+    With `parallel_tool_calls` enabled, every tool call of the last AI message is sent
+    to the client at once and awaited together; otherwise they run one after another.
+    Either way the returned ToolMessages follow the order of the tool calls.
+    """
     tool_results: List[ToolMessage] = []
     last_message = state.messages[-1]
 
@@ -180,43 +526,46 @@ async def remote_tools_node(state: State, config: RunnableConfig) -> Dict[str, L
     # Instantiate the executor
     manager = get_connection_manager()
     executor = WebSocketToolExecutor(connection_manager=manager)
-    
-    # Default timeout for tool execution (can be made configurable via config)
-    tool_timeout = 30.0 # Consider getting this from configuration object too
-
-    for tool_call in last_message.tool_calls:
-        tool_call_id = tool_call['id']
-        tool_name = tool_call['name']
-        tool_args = tool_call['args']
-        logger.info(f"Processing tool call {tool_call_id}: '{tool_name}' with args {tool_args} for connection {connection_id}")
 
-        try:
-            # Use the executor to call the tool remotely
-            result = await executor.execute(
-                connection_id=connection_id,
-                tool_call_id=tool_call_id,
-                tool_name=tool_name,
-                tool_args=tool_args,
-                timeout=tool_timeout
-            )
-            logger.info(f"Received result for tool call {tool_call_id}: {result}")
-            content = result
-            tool_results.append(ToolMessage(
-                content=str(content),
-                tool_call_id=tool_call_id
-            ))
-        except ToolTimeoutError as e:
-            logger.error(f"Error executing tool call {tool_call_id}: {e}")
-            tool_results.append(ToolMessage(content=f"Error: Tool '{tool_name}' timed out after {e.timeout} seconds.", tool_call_id=tool_call_id))
-        except ClientUnavailableError as e:
-            logger.error(f"Error executing tool call {tool_call_id}: {e}")
-            tool_results.append(ToolMessage(content=f"Error: Client connection for tool '{tool_name}' is not available.", tool_call_id=tool_call_id))
-        except ToolExecutionError as e:
-            logger.error(f"Error executing tool call {tool_call_id}: {e}", exc_info=True)
-            tool_results.append(ToolMessage(content=f"Error: Failed to execute tool '{tool_name}'. Reason: {e}", tool_call_id=tool_call_id))
-        except Exception as e:
-            logger.exception(f"Unexpected error processing tool call {tool_call_id} ('{tool_name}')", exc_info=True)
-            tool_results.append(ToolMessage(content=f"Error: An unexpected error occurred while trying to execute tool '{tool_name}'.", tool_call_id=tool_call_id))
+    tool_timeout = configuration.tool_timeout
+    tool_calls = last_message.tool_calls
+    cache_ttls = cache_ttls_for_tools(configuration.tools or []) if configuration.tool_result_cache else {}
+
+    for tool_call in tool_calls:
+        logger.info("Processing tool call %s: '%s' with args %s for connection %s",
+                    tool_call['id'], tool_call['name'], clip_for_log(tool_call['args']), connection_id)
+
+    if configuration.parallel_tool_calls and len(tool_calls) > 1:
+        outcomes = await executor.execute_many(
+            connection_id=connection_id,
+            tool_calls=tool_calls,
+            timeout=tool_timeout,
+            max_concurrency=configuration.max_concurrent_tool_calls,
+            cache_ttls=cache_ttls
+        )
+    else:
+        outcomes = []
+        for tool_call in tool_calls:
+            try:
+                # Use the executor to call the tool remotely
+                outcomes.append(await executor.execute(
+                    connection_id=connection_id,
+                    tool_call_id=tool_call['id'],
+                    tool_name=tool_call['name'],
+                    tool_args=tool_call['args'],
+                    timeout=tool_timeout,
+                    cache_ttl=cache_ttls.get(tool_call['name'])
+                ))
+            except Exception as e:
+                outcomes.append(e)
+
+    summarizer = None
+    if configuration.tool_result_truncation == "summarize":
+        summarizer = _make_tool_result_summarizer(configuration.model)
+    tool_results = list(await asyncio.gather(*(
+        _tool_message_from_outcome(tool_call, outcome, configuration, summarizer)
+        for tool_call, outcome in zip(tool_calls, outcomes)
+    )))
 
     # Return ONLY the messages update
     return {"messages": tool_results}
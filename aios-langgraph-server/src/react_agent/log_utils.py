@@ -0,0 +1,46 @@
+"""Logging helpers for hot paths that handle large payloads."""
+
+import os
+import reprlib
+from typing import Any
+
+# Maximum characters of a payload included in a log line; 0 leaves payloads out
+LOG_PAYLOAD_CHARS = int(os.getenv("AIOS_LOG_PAYLOAD_CHARS", "200"))
+
+
+def _repr_for_limit(limit: int) -> reprlib.Repr:
+    bounded = reprlib.Repr()
+    bounded.maxlevel = 4
+    bounded.maxdict = bounded.maxlist = bounded.maxtuple = bounded.maxset = 20
+    bounded.maxstring = bounded.maxother = bounded.maxlong = max(limit, 10)
+    return bounded
+
+
+class clip_for_log:
+    """Lazily formatted, size-capped view of a value for %-style log arguments.
+
+    Nothing is formatted unless the record is actually emitted, and only the first
+    `limit` characters are kept. Use as `logger.info("args %s", clip_for_log(args))`.
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int = LOG_PAYLOAD_CHARS):
+        """Wrap `value`, to be clipped to `limit` characters when formatted."""
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        """Format the value, clipped to `limit` characters."""
+        if self.limit <= 0:
+            return f"<{type(self.value).__name__}>"
+        value = self.value
+        if isinstance(value, (bytes, bytearray)):
+            return f"<{len(value)} bytes>"
+        if isinstance(value, str):
+            return value if len(value) <= self.limit else f"{value[:self.limit]}... ({len(value)} chars)"
+        # reprlib bounds nested containers and strings, so huge payloads are never fully rendered
+        text = _repr_for_limit(self.limit).repr(value)
+        return text if len(text) <= self.limit else f"{text[:self.limit]}..."
+
+    __repr__ = __str__
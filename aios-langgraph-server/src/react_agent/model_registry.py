@@ -0,0 +1,217 @@
+"""Process-wide registry of chat model instances.
+
+Building a chat model client is not free: every instance creates its own provider
+client and, with it, fresh HTTP connection pools. The registry keeps recently used
+models keyed by their fully specified name and constructor kwargs, so repeated
+graph steps and runs reuse warm clients.
+
+It also memoizes `bind_tools` results keyed by a fingerprint of the tool schemas,
+since binding re-serializes every tool into the provider's format.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+
+logger = logging.getLogger('model_registry')
+
+ModelKey = Tuple[str, str]
+
+# Attributes under which LangChain chat models keep their underlying SDK clients.
+_CLIENT_ATTRIBUTES = ("root_client", "root_async_client", "client", "async_client", "_client", "_async_client")
+
+
+def make_model_key(fully_specified_name: str, kwargs: Mapping[str, Any]) -> ModelKey:
+    """Build a stable cache key from a model name and its constructor kwargs."""
+    return fully_specified_name, json.dumps(kwargs, sort_keys=True, default=repr)
+
+
+def tool_schema_fingerprint(tools: Sequence[Any]) -> str:
+    """Compute a stable hash of the tool schemas that `bind_tools` would serialize.
+
+    Only cheap, already-available attributes are read: a tool's name, description
+    and raw args schema. Pydantic schemas are identified by class path rather than
+    being rendered to JSON schema.
+    """
+    described = []
+    for tool in tools:
+        if isinstance(tool, BaseTool):
+            schema = tool.args_schema
+            if isinstance(schema, type):
+                schema = f"{schema.__module__}.{schema.__qualname__}"
+            described.append([tool.name, tool.description, schema])
+        elif isinstance(tool, dict):
+            described.append(tool)
+        else:
+            described.append(f"{getattr(tool, '__module__', '')}.{getattr(tool, '__qualname__', repr(tool))}")
+    payload = json.dumps(described, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ModelRegistry:
+    """An LRU cache of chat model instances keyed by model name and kwargs.
+
+    Factories and `bind_tools` run outside the registry lock, so a slow model
+    construction does not hold up lookups of other models. A per-key lock makes
+    concurrent misses on the same key wait for one build instead of repeating it.
+    """
+
+    def __init__(self, max_size: int = 16, max_bound_size: int = 64):
+        """Create an empty registry holding at most `max_size` models and `max_bound_size` bound models."""
+        self.max_size = max_size
+        self.max_bound_size = max_bound_size
+        self._models: OrderedDict[ModelKey, BaseChatModel] = OrderedDict()
+        self._bound: OrderedDict[Tuple[ModelKey, str], Runnable] = OrderedDict()
+        self._lock = threading.RLock()
+        self._build_locks: Dict[Any, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.bind_hits = 0
+        self.bind_misses = 0
+
+    def get_or_create(
+        self,
+        fully_specified_name: str,
+        kwargs: Mapping[str, Any],
+        factory: Callable[..., BaseChatModel],
+    ) -> BaseChatModel:
+        """Return the cached model for the key, creating it with `factory` on a miss.
+
+        Args:
+            fully_specified_name: String in the format 'provider/model'.
+            kwargs: Extra constructor kwargs; they are part of the cache key.
+            factory: Called as `factory(fully_specified_name, **kwargs)` on a miss.
+        """
+        def build() -> BaseChatModel:
+            logger.info(f"Creating chat model '{fully_specified_name}' (registry size {len(self._models)})")
+            return factory(fully_specified_name, **kwargs)
+
+        key = make_model_key(fully_specified_name, kwargs)
+        return self._get_or_build(self._models, key, build, self.max_size, "")
+
+    def get_or_bind_tools(
+        self,
+        fully_specified_name: str,
+        kwargs: Mapping[str, Any],
+        tools: Sequence[Any],
+        factory: Callable[..., BaseChatModel],
+    ) -> Runnable:
+        """Return the cached model with `tools` bound, binding them only on a miss.
+
+        Args:
+            fully_specified_name: String in the format 'provider/model'.
+            kwargs: Extra model constructor kwargs; they are part of the cache key.
+            tools: The tools to bind. They are identified by `tool_schema_fingerprint`.
+            factory: Used to create the underlying model if it is not cached yet.
+        """
+        def build() -> Runnable:
+            return self.get_or_create(fully_specified_name, kwargs, factory).bind_tools(tools)
+
+        key = (make_model_key(fully_specified_name, kwargs), tool_schema_fingerprint(tools))
+        return self._get_or_build(self._bound, key, build, self.max_bound_size, "bind_")
+
+    def _get_or_build(self, cache: OrderedDict, key: Any, build: Callable[[], Any], max_size: int, stat: str) -> Any:
+        with self._lock:
+            value = self._lookup(cache, key, stat)
+            if value is not None:
+                return value
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            with self._lock:
+                # Built by a concurrent miss while this one waited
+                value = self._lookup(cache, key, stat)
+                if value is not None:
+                    return value
+                setattr(self, f"{stat}misses", getattr(self, f"{stat}misses") + 1)
+            try:
+                value = build()
+                with self._lock:
+                    cache[key] = value
+                    while len(cache) > max_size:
+                        evicted_key, _ = cache.popitem(last=False)
+                        if cache is self._models:
+                            # Evicted clients are not closed: providers may share HTTP pools between
+                            # instances, and a running step may still hold a reference to the model.
+                            logger.info(f"Evicted chat model '{evicted_key[0]}' from registry")
+            finally:
+                with self._lock:
+                    self._build_locks.pop(key, None)
+            return value
+
+    def _lookup(self, cache: OrderedDict, key: Any, stat: str) -> Any:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            setattr(self, f"{stat}hits", getattr(self, f"{stat}hits") + 1)
+        return value
+
+    def evict(self, fully_specified_name: Optional[str] = None) -> List[BaseChatModel]:
+        """Remove models from the registry without closing them.
+
+        Args:
+            fully_specified_name: Only evict models with this name. Evicts everything if None.
+
+        Returns:
+            The evicted model instances, e.g. to pass to `aclose_chat_model`.
+        """
+        with self._lock:
+            for bound_key in [k for k in self._bound if fully_specified_name is None or k[0][0] == fully_specified_name]:
+                del self._bound[bound_key]
+            keys = [k for k in self._models if fully_specified_name is None or k[0] == fully_specified_name]
+            return [self._models.pop(k) for k in keys]
+
+    async def aclose(self) -> None:
+        """Evict every cached model and close its provider clients."""
+        for model in self.evict():
+            await aclose_chat_model(model)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            bind_lookups = self.bind_hits + self.bind_misses
+            return {
+                "size": len(self._models),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bound_size": len(self._bound),
+                "bind_hits": self.bind_hits,
+                "bind_misses": self.bind_misses,
+                "bind_hit_rate": self.bind_hits / bind_lookups if bind_lookups else 0.0,
+            }
+
+
+async def aclose_chat_model(model: Any) -> None:
+    """Close the SDK clients (and their HTTP pools) held by a chat model."""
+    seen = set()
+    for attribute in _CLIENT_ATTRIBUTES:
+        client = getattr(model, attribute, None)
+        close = getattr(client, "close", None)
+        if client is None or close is None or id(client) in seen:
+            continue
+        seen.add(id(client))
+        try:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Failed to close client '{attribute}' of {type(model).__name__}: {e}")
+
+
+# --- Dependency Injection ---
+_model_registry_instance = ModelRegistry(max_size=int(os.getenv("AIOS_MODEL_CACHE_SIZE", "16")))
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide ModelRegistry singleton."""
+    return _model_registry_instance
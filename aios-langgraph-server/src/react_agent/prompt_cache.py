@@ -0,0 +1,112 @@
+"""Prompt-prefix caching support.
+
+The system prompt and the tool list are identical on every step of a run, and
+across runs for the same client. Providers can cache such a prefix if it is
+byte-for-byte stable and, for Anthropic, explicitly marked:
+
+- Anthropic models (routed through OpenRouter) get a `cache_control` breakpoint
+  on the system prompt, which caches the tools and system prompt together.
+- OpenAI caches prefixes automatically; a `prompt_cache_key` derived from the
+  prefix keeps requests sharing a prefix on the same cache. It is only sent when
+  the installed `openai` SDK accepts it, since older versions reject unknown kwargs.
+
+Cached-token counts reported by the provider are logged per step and aggregated
+in `PromptCacheStats`.
+"""
+
+import functools
+import hashlib
+import inspect
+import logging
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from react_agent.prompts import SYSTEM_PROMPT
+
+logger = logging.getLogger('prompt_cache')
+
+ANTHROPIC_PROVIDERS = ("anthropic",)
+OPENAI_PROVIDERS = ("openai",)
+
+
+@functools.lru_cache(maxsize=64)
+def build_system_prompt(client_system_prompt: str) -> str:
+    """Return the full system prompt: the static agent prompt first, then the client's prompt."""
+    return SYSTEM_PROMPT + "\n\n" + client_system_prompt
+
+
+def stable_tool_order(tools: Sequence[Any]) -> Tuple[Any, ...]:
+    """Return the tools sorted by name, so the serialized tool block does not depend on client order."""
+    return tuple(sorted(tools, key=lambda tool: getattr(tool, "name", "") or ""))
+
+
+def system_message(model_identifier: str, system_prompt: str, enabled: bool = True) -> Dict[str, Any]:
+    """Build the system message, with a cache breakpoint for providers that need one."""
+    provider = model_identifier.split("/", maxsplit=1)[0]
+    if enabled and provider in ANTHROPIC_PROVIDERS:
+        return {
+            "role": "system",
+            "content": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+        }
+    return {"role": "system", "content": system_prompt}
+
+
+def cache_bind_kwargs(model_identifier: str, system_prompt: str, tools_fingerprint: str) -> Dict[str, Any]:
+    """Return extra model call kwargs that improve prefix-cache hit rates for the provider."""
+    provider = model_identifier.split("/", maxsplit=1)[0]
+    if provider in OPENAI_PROVIDERS and _openai_accepts_prompt_cache_key():
+        prefix_hash = hashlib.sha256(f"{tools_fingerprint}:{system_prompt}".encode()).hexdigest()
+        return {"prompt_cache_key": f"aios-{prefix_hash[:32]}"}
+    return {}
+
+
+@functools.lru_cache(maxsize=1)
+def _openai_accepts_prompt_cache_key() -> bool:
+    """Return whether the installed `openai` SDK has the `prompt_cache_key` parameter."""
+    try:
+        from openai.resources.chat.completions import AsyncCompletions
+    except ImportError:
+        return False
+    return "prompt_cache_key" in inspect.signature(AsyncCompletions.create).parameters
+
+
+def cached_token_usage(message: Any) -> Tuple[int, int]:
+    """Return (cached input tokens, total input tokens) reported on a model response."""
+    usage: Optional[Dict[str, Any]] = getattr(message, "usage_metadata", None)
+    if not usage:
+        return 0, 0
+    details = usage.get("input_token_details") or {}
+    return int(details.get("cache_read") or 0), int(usage.get("input_tokens") or 0)
+
+
+class PromptCacheStats:
+    """Aggregated cached-token counters per model."""
+
+    def __init__(self) -> None:
+        """Start with empty totals."""
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_identifier: str, cached_tokens: int, input_tokens: int) -> None:
+        """Add one response's input token usage to the totals."""
+        with self._lock:
+            totals = self._totals.setdefault(model_identifier, {"calls": 0, "cached_tokens": 0, "input_tokens": 0})
+            totals["calls"] += 1
+            totals["cached_tokens"] += cached_tokens
+            totals["input_tokens"] += input_tokens
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-model totals including the cached share of input tokens."""
+        with self._lock:
+            return {
+                model: {**totals, "cached_ratio": totals["cached_tokens"] / totals["input_tokens"] if totals["input_tokens"] else 0.0}
+                for model, totals in self._totals.items()
+            }
+
+
+# --- Dependency Injection ---
+_prompt_cache_stats_instance = PromptCacheStats()
+
+def get_prompt_cache_stats() -> PromptCacheStats:
+    """Return the process-wide PromptCacheStats singleton."""
+    return _prompt_cache_stats_instance
@@ -49,4 +49,18 @@ WHEN YOU HAVE CONFIGURE_COMPONENT TOOL AVAILABLE,
 AND YOU HAVE FAILED TO CALL A PREVIOUS TOOL MORE THAN 1 TIME, 
 USE CONFIGURE_COMPONENT TOOL TO CHECK HOW TO USE EACH OF THE COMPONENT OR 
 PARAMETER OF THE TOOL THIS WILL HELP YOU CORRECT YOUR ISSUE.
-"""
\ No newline at end of file
+"""
+
+SUMMARY_PROMPT = """
+You maintain a running summary of a conversation between a user and the AIOS desktop assistant, so that older messages can be removed from the assistant's context.
+You are given the previous summary (possibly empty) and the messages that are being removed. Write an updated summary that merges both.
+Keep the user's goals and preferences, decisions made, facts and results obtained from tools (file paths, URLs, IDs, names, numbers) and any unfinished work.
+Omit pleasantries and raw tool output that is no longer relevant. Write in concise bullet points.
+"""
+
+TOOL_RESULT_SUMMARY_PROMPT = """
+You shorten tool results for the AIOS desktop assistant so they fit in its context.
+You are given the name of the tool and its output, which may itself be cut in the middle.
+Summarize the output in at most {max_chars} characters. Keep everything the assistant may need to continue its task:
+identifiers, file paths, URLs, names, numbers, error messages and the overall structure of the data. Do not add commentary.
+"""
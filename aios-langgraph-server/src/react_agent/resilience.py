@@ -0,0 +1,239 @@
+"""Latency tracking, hedging statistics and circuit breaking for model calls.
+
+These helpers keep small, process-wide statistics about model invocations so the
+graph can make routing decisions, such as when to hedge a slow primary model with
+the fallback or when to skip a failing provider entirely.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional
+
+logger = logging.getLogger('resilience')
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per model."""
+
+    def __init__(self, window_size: int = 200, min_samples: int = 20):
+        """Keep the last `window_size` latencies per model; percentiles need `min_samples` of them."""
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model_identifier: str, seconds: float) -> None:
+        """Record the latency of a successful call."""
+        with self._lock:
+            samples = self._samples.get(model_identifier)
+            if samples is None:
+                samples = self._samples[model_identifier] = deque(maxlen=self.window_size)
+            samples.append(seconds)
+
+    def percentile(self, model_identifier: str, q: float) -> Optional[float]:
+        """Return the q-th percentile (0-1) of recent latencies.
+
+        Returns None until at least `min_samples` latencies have been recorded.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(model_identifier, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))
+        return samples[index]
+
+
+class HedgeStats:
+    """Counters describing how hedged model calls were resolved."""
+
+    def __init__(self) -> None:
+        """Start with all counters at zero."""
+        self.hedges_fired = 0
+        self.wins: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record_hedge(self) -> None:
+        """Record that the fallback was started alongside a slow primary."""
+        with self._lock:
+            self.hedges_fired += 1
+
+    def record_win(self, model_identifier: str) -> None:
+        """Record which model produced the result of a hedged call."""
+        with self._lock:
+            self.wins[model_identifier] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return a copy of the counters for monitoring."""
+        with self._lock:
+            return {"hedges_fired": self.hedges_fired, "wins": dict(self.wins)}
+
+
+class CircuitOpenError(Exception):
+    """Raised in place of calling a model whose circuit breaker is open."""
+    def __init__(self, model_identifier: str):
+        """Create the error for the model whose circuit is open."""
+        self.model_identifier = model_identifier
+        super().__init__(f"Circuit breaker for model '{model_identifier}' is open.")
+
+
+@dataclass(frozen=True)
+class CircuitBreakerSettings:
+    """Thresholds controlling when a circuit breaker opens and recovers."""
+
+    window_size: int = 20
+    """Number of most recent calls used to compute the failure rate."""
+    min_calls: int = 5
+    """Minimum number of calls in the window before the circuit may open."""
+    failure_rate: float = 0.5
+    """Failure rate (0-1) within the window at which the circuit opens."""
+    open_seconds: float = 30.0
+    """How long the circuit stays open before a half-open probe is allowed."""
+    half_open_max_calls: int = 1
+    """Number of concurrent probe calls allowed while half-open."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker for a single model.
+
+    While closed, calls are allowed and their outcomes recorded in a sliding window.
+    Once the failure rate in the window reaches the threshold the circuit opens and
+    calls are rejected for `open_seconds`. After that, a limited number of probe
+    calls are let through (half-open): a success closes the circuit again, a failure
+    re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, settings: Optional[CircuitBreakerSettings] = None, clock: Callable[[], float] = time.monotonic):
+        """Create a closed breaker; `clock` returns monotonic seconds."""
+        self.settings = settings or CircuitBreakerSettings()
+        self._clock = clock
+        self._state = self.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=self.settings.window_size)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Return the current state, moving from open to half-open once the cooldown elapsed."""
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def update_settings(self, settings: CircuitBreakerSettings) -> None:
+        """Apply new thresholds, keeping the most recent outcomes."""
+        with self._lock:
+            if settings.window_size != self.settings.window_size:
+                self._outcomes = deque(self._outcomes, maxlen=settings.window_size)
+            self.settings = settings
+
+    def allow_request(self) -> bool:
+        """Return whether a call may be made now.
+
+        A True result while half-open reserves a probe slot, which is freed by
+        `record_success`, `record_failure` or `release`.
+        """
+        with self._lock:
+            self._refresh_state()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes_in_flight < self.settings.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.info("Circuit breaker probe succeeded; closing circuit")
+                self._state = self.CLOSED
+                self._outcomes.clear()
+                self._probes_in_flight = 0
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit if the threshold is reached."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.warning("Circuit breaker probe failed; re-opening circuit")
+                self._open()
+                return
+            self._outcomes.append(False)
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+            if self._state == self.CLOSED and calls >= self.settings.min_calls \
+                    and failures / calls >= self.settings.failure_rate:
+                logger.warning(f"Circuit breaker opening after {failures}/{calls} failed calls")
+                self._open()
+
+    def release(self) -> None:
+        """Free a probe slot for a call that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            if self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._probes_in_flight = 0
+
+    def _refresh_state(self) -> None:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.settings.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers keyed by fully specified model name."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """Create an empty registry whose breakers use `clock`."""
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_identifier: str, settings: Optional[CircuitBreakerSettings] = None) -> CircuitBreaker:
+        """Return the breaker for a model, creating it on first use.
+
+        If `settings` are given they replace the breaker's current thresholds.
+        """
+        with self._lock:
+            breaker = self._breakers.get(model_identifier)
+            if breaker is None:
+                breaker = self._breakers[model_identifier] = CircuitBreaker(settings, clock=self._clock)
+                return breaker
+        if settings is not None and settings != breaker.settings:
+            breaker.update_settings(settings)
+        return breaker
+
+    def snapshot(self) -> Dict[str, str]:
+        """Return the current state of every breaker for monitoring."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {model_identifier: breaker.state for model_identifier, breaker in breakers.items()}
+
+
+# --- Dependency Injection ---
+_latency_tracker_instance = LatencyTracker()
+_hedge_stats_instance = HedgeStats()
+_circuit_breaker_registry_instance = CircuitBreakerRegistry()
+
+def get_latency_tracker() -> LatencyTracker:
+    """Return the process-wide LatencyTracker singleton."""
+    return _latency_tracker_instance
+
+def get_hedge_stats() -> HedgeStats:
+    """Return the process-wide HedgeStats singleton."""
+    return _hedge_stats_instance
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """Return the process-wide CircuitBreakerRegistry singleton."""
+    return _circuit_breaker_registry_instance
@@ -56,6 +56,23 @@ class State(InputState):
     It is set to 'True' when the step count reaches recursion_limit - 1.
     """
 
+    context_summary: str = field(default="")
+    """
+    Running summary of older messages that no longer fit into the model's context budget.
+
+    Only written when the 'summarize' context policy is used.
+    """
+
+    context_summary_through_id: str = field(default="")
+    """The id of the last message covered by `context_summary`."""
+
+    context_trimmed_through_id: str = field(default="")
+    """
+    The id of the last message dropped by the 'trim' context policy.
+
+    Later steps keep the same cut until the trimmed history exceeds the budget again.
+    """
+
     # Additional attributes can be added here as needed.
     # Common examples include:
     # retrieved_documents: List[Document] = field(default_factory=list)
@@ -0,0 +1,112 @@
+"""Token streaming for model calls.
+
+`make_streaming_invoke` wraps a chat model so it is called through `astream` instead
+of `ainvoke`. Tokens reach clients as soon as they are generated:
+
+- via LangGraph's "messages" stream mode, through the chat model callbacks, and
+- via the "custom" stream mode as `{"type": "token", ...}` events.
+
+The wrapper still returns one complete `AIMessage` (including tool calls), so it is
+a drop-in replacement for `model.ainvoke` in the fallback/hedging logic. Two hooks
+keep those paths from mixing output of several calls on the client:
+
+- A call started with `start_reporting_first_output` reports its first streamed chunk,
+  so hedging can commit to whichever model starts answering first.
+- A call that fails or is cancelled after streaming tokens emits a
+  `{"type": "token_discard", ...}` event naming its message id, telling clients to drop
+  the partial output before the next call's tokens arrive.
+"""
+
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional, cast
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.messages.utils import message_chunk_to_message
+from langchain_core.runnables import Runnable
+from langgraph.config import get_stream_writer
+
+logger = logging.getLogger('streaming')
+
+ModelInvokeFunc = Callable[[List[Any], Any], Awaitable[Any]]
+ChunkListener = Callable[[AIMessageChunk, AIMessageChunk], None]
+
+_first_output_listener: ContextVar[Optional[Callable[[], None]]] = ContextVar("first_output_listener", default=None)
+
+
+def _chunk_text(chunk: AIMessageChunk) -> str:
+    """Return the text carried by a streamed chunk, without stripping whitespace."""
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block if isinstance(block, str) else (block.get("text") or "")
+        for block in content
+        if isinstance(block, str) or block.get("type") == "text"
+    )
+
+
+def _get_stream_writer() -> Callable[[Any], None]:
+    """Return the LangGraph stream writer, or a no-op outside of a graph run."""
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return lambda _: None
+
+
+def start_reporting_first_output(coro: Coroutine[Any, Any, Any], on_first_output: Callable[[], None]) -> "asyncio.Task[Any]":
+    """Start `coro` as a task whose streaming model call reports its first chunk to `on_first_output`.
+
+    Non-streaming calls never report, so they are only observed on completion.
+    """
+    token = _first_output_listener.set(on_first_output)
+    try:
+        # The task runs in a copy of the current context, listener included
+        return asyncio.ensure_future(coro)
+    finally:
+        _first_output_listener.reset(token)
+
+
+def make_streaming_invoke(
+    model: Runnable,
+    model_identifier: str,
+    on_chunk: Optional[ChunkListener] = None,
+) -> ModelInvokeFunc:
+    """Build an invoke function that streams the model's output and returns the full message.
+
+    Args:
+        model: The (possibly tool-bound) chat model to stream from.
+        model_identifier: Fully specified model name, included in emitted token events.
+        on_chunk: Optional callback receiving each chunk and the aggregate so far.
+
+    Returns:
+        An async function with the same signature and result as `model.ainvoke`.
+    """
+    async def _invoke(messages: List[Any], config: Any) -> AIMessage:
+        writer = _get_stream_writer()
+        on_first_output = _first_output_listener.get()
+        aggregate: Optional[AIMessageChunk] = None
+        emitted = False
+        try:
+            async for chunk in model.astream(messages, config):
+                if aggregate is None and on_first_output is not None:
+                    on_first_output()
+                aggregate = chunk if aggregate is None else aggregate + chunk
+                text = _chunk_text(chunk)
+                if text:
+                    writer({"type": "token", "model": model_identifier, "message_id": aggregate.id, "content": text})
+                    emitted = True
+                if on_chunk is not None:
+                    on_chunk(chunk, aggregate)
+        except BaseException:
+            if emitted:
+                writer({"type": "token_discard", "model": model_identifier, "message_id": cast(AIMessageChunk, aggregate).id})
+            raise
+
+        if aggregate is None:
+            raise ValueError(f"Model '{model_identifier}' returned an empty stream.")
+        # Turns accumulated tool_call_chunks into parsed tool_calls
+        return message_chunk_to_message(aggregate)
+
+    return _invoke
@@ -0,0 +1,132 @@
+"""Server-side cache of results of idempotent client tools.
+
+Clients mark read-only tools as cacheable in the tool dict they send, e.g.
+`{"name": "list_directory", ..., "cache": {"ttl": 30}}`. Results of such tools are
+cached per connection, tool name and canonicalized arguments, so repeated calls
+within a run (or across runs on the same connection) skip the WebSocket round-trip.
+
+Clients invalidate entries by sending `{"type": "tool_cache_invalidate"}` on the
+tool WebSocket, optionally narrowed with `"tool"` and `"args"`. Since that message
+only reaches the node holding the WebSocket, results are only cached on that node;
+calls routed to a connection on another node always make the round-trip.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger('tool_cache')
+
+CacheKey = Tuple[str, str, str]
+
+_MISSING = object()
+
+
+def canonical_args(args: Any) -> str:
+    """Return a canonical string for tool arguments, independent of key order."""
+    return json.dumps(args, sort_keys=True, separators=(",", ":"), default=repr)
+
+
+def cache_ttl_from_tool_dict(tool_dict: Dict[str, Any]) -> Optional[float]:
+    """Return the cache TTL declared in a tool dict, or None if it is not cacheable."""
+    cache = tool_dict.get("cache")
+    if not isinstance(cache, dict):
+        return None
+    ttl = cache.get("ttl")
+    if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl <= 0:
+        return None
+    return float(ttl)
+
+
+def cache_ttls_for_tools(tools: Iterable[Any]) -> Dict[str, float]:
+    """Map the names of cacheable tools to their TTL, from StructuredTool metadata."""
+    ttls: Dict[str, float] = {}
+    for tool in tools:
+        ttl = (getattr(tool, "metadata", None) or {}).get("cache_ttl")
+        if ttl:
+            ttls[tool.name] = ttl
+    return ttls
+
+
+class ToolResultCache:
+    """LRU cache of tool results with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        """Create an empty cache holding at most `max_entries` results."""
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, Tuple[float, Any]] = OrderedDict()
+        self._by_connection: Dict[str, Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, connection_id: str, tool_name: str, args: Any) -> Tuple[bool, Any]:
+        """Return (True, result) for a live cached result, else (False, None)."""
+        key = (connection_id, tool_name, canonical_args(args))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, connection_id: str, tool_name: str, args: Any, result: Any, ttl: float) -> None:
+        """Cache a result for `ttl` seconds."""
+        key = (connection_id, tool_name, canonical_args(args))
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, result)
+            self._entries.move_to_end(key)
+            self._by_connection.setdefault(connection_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, connection_id: str, tool_name: Optional[str] = None, args: Any = _MISSING) -> int:
+        """Drop a connection's entries, optionally only for one tool or one call. Returns the count."""
+        with self._lock:
+            keys = set(self._by_connection.get(connection_id, ()))
+            if tool_name is not None:
+                keys = {key for key in keys if key[1] == tool_name}
+            if args is not _MISSING:
+                canonical = canonical_args(args)
+                keys = {key for key in keys if key[2] == canonical}
+            for key in list(keys):
+                self._remove(key)
+        if keys:
+            logger.info(f"Invalidated {len(keys)} cached tool results for connection {connection_id}")
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        keys = self._by_connection.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_connection[key[0]]
+
+
+# --- Dependency Injection ---
+_tool_result_cache_instance = ToolResultCache()
+
+def get_tool_result_cache() -> ToolResultCache:
+    """Return the process-wide ToolResultCache singleton."""
+    return _tool_result_cache_instance
@@ -0,0 +1,252 @@
+"""Size limits for tool results kept in the conversation.
+
+Tool results become ToolMessages in `State.messages` and are re-sent to the model
+on every following step. Results above the configured limit are stored in full in
+the local blob store, and the message only keeps a shortened version (head, tail,
+both ends, or a model-written summary) plus a note that it was shortened. The blob
+reference is attached to the ToolMessage as its `artifact`, which is kept in state
+but never sent to the model. Binary results are described rather than decoded.
+
+Streamed results are assembled by `ResultAssembler`, which moves them to the blob
+store once they outgrow a memory limit; its async methods do the blob writes in a
+worker thread. Shaping such a `SpilledResult` only reads the excerpt back from the blob.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from react_agent.blob_store import BlobRef, BlobStore, BlobWriter, get_blob_store
+
+logger = logging.getLogger('tool_results')
+
+ResultSummarizer = Callable[[str, str, int], Awaitable[str]]
+"""Async callable receiving the tool name, the (clipped) result text and a character budget, returning a summary."""
+
+TRUNCATION_MODES = ("head", "tail", "head_tail", "summarize")
+
+# Upper bound on the text handed to a summarizer, as a multiple of the result limit
+SUMMARY_INPUT_FACTOR = 8
+
+# Most bytes a character takes in UTF-8, for reading enough of a blob to cut N characters
+_MAX_UTF8_BYTES = 4
+
+# Leading bytes of common binary formats, for describing binary results
+_BINARY_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "PNG image"),
+    (b"\xff\xd8\xff", "JPEG image"),
+    (b"GIF8", "GIF image"),
+    (b"%PDF-", "PDF document"),
+    (b"PK\x03\x04", "ZIP archive"),
+    (b"\x1f\x8b", "gzip data"),
+)
+
+# Streamed results larger than this many bytes are assembled in the blob store instead of memory
+STREAM_MEMORY_LIMIT = int(os.getenv("AIOS_STREAM_MEMORY_LIMIT", str(1024 * 1024)))
+
+
+def result_to_text(result: Any) -> str:
+    """Return the text form of a tool result, as stored in the ToolMessage content."""
+    return result if isinstance(result, str) else str(result)
+
+
+def truncate_text(text: str, max_chars: int, mode: str) -> str:
+    """Shorten text to at most `max_chars` characters using a 'head', 'tail' or 'head_tail' cut."""
+    if len(text) <= max_chars:
+        return text
+    if mode == "head":
+        return text[:max_chars]
+    if mode == "tail":
+        return text[-max_chars:] if max_chars > 0 else ""
+    if mode == "head_tail":
+        head = max_chars // 2
+        tail = max_chars - head
+        return text[:head] + "\n...\n" + (text[-tail:] if tail > 0 else "")
+    raise ValueError(f"Unknown truncation mode '{mode}'. Available: {list(TRUNCATION_MODES)}")
+
+
+@dataclass(frozen=True)
+class SpilledResult:
+    """A streamed tool result too large to keep in memory, stored in the blob store."""
+
+    ref: BlobRef
+    is_text: bool = True
+
+
+class ResultAssembler:
+    """Assembles streamed result chunks with bounded memory.
+
+    Chunks are buffered in memory up to `memory_limit` bytes; past that, everything
+    is written to the blob store incrementally and the result is a `SpilledResult`.
+    """
+
+    def __init__(self, store: Optional[BlobStore] = None, memory_limit: int = STREAM_MEMORY_LIMIT):
+        """Create an assembler spilling to `store` (default: the process-wide store) past `memory_limit` bytes."""
+        self._store = store
+        self.memory_limit = memory_limit
+        self._chunks: List[Union[str, bytes]] = []
+        self._buffered = 0
+        self._is_text = True
+        self._writer: Optional[BlobWriter] = None
+
+    def add(self, chunk: Any) -> None:
+        """Append a chunk (str or bytes; other values are converted to text)."""
+        self._append(self._normalize(chunk))
+
+    async def add_async(self, chunk: Any) -> None:
+        """Append a chunk like `add`, writing to the blob store in a worker thread."""
+        chunk = self._normalize(chunk)
+        if self._writer is None and self._buffered + len(chunk) <= self.memory_limit:
+            self._append(chunk)
+        else:
+            await asyncio.to_thread(self._append, chunk)
+
+    def result(self) -> Any:
+        """Return the assembled text, bytes, or a SpilledResult."""
+        if self._writer is not None:
+            return SpilledResult(ref=self._writer.commit(), is_text=self._is_text)
+        if self._is_text:
+            return "".join(self._chunks)
+        return b"".join(c.encode("utf-8") if isinstance(c, str) else c for c in self._chunks)
+
+    async def result_async(self) -> Any:
+        """Return the result like `result`, committing a spilled blob (and pruning the store) in a worker thread."""
+        if self._writer is not None:
+            return await asyncio.to_thread(self.result)
+        return self.result()
+
+    def discard(self) -> None:
+        """Drop everything assembled so far."""
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
+        self._chunks = []
+
+    def _normalize(self, chunk: Any) -> Union[str, bytes]:
+        if isinstance(chunk, (bytes, bytearray)):
+            self._is_text = False
+            return bytes(chunk)
+        return chunk if isinstance(chunk, str) else result_to_text(chunk)
+
+    def _append(self, chunk: Union[str, bytes]) -> None:
+        if self._writer is not None:
+            self._writer.write(chunk)
+            return
+        self._chunks.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered > self.memory_limit:
+            self._writer = (self._store or get_blob_store()).writer()
+            for buffered in self._chunks:
+                self._writer.write(buffered)
+            self._chunks = []
+
+
+def _decode(data: bytes) -> str:
+    # A byte range may start or end inside a multi-byte character
+    return data.decode("utf-8", errors="ignore")
+
+
+def _blob_excerpt(store: BlobStore, ref: BlobRef, max_chars: int, mode: str) -> str:
+    """Cut an excerpt of at most `max_chars` characters from a stored text blob, reading only the needed ranges."""
+    def _head(chars: int) -> str:
+        return _decode(store.read(ref.digest, 0, chars * _MAX_UTF8_BYTES))[:chars]
+
+    def _tail(chars: int) -> str:
+        length = min(ref.size, chars * _MAX_UTF8_BYTES)
+        return _decode(store.read(ref.digest, ref.size - length, length))[-chars:] if chars > 0 else ""
+
+    if mode == "head":
+        return _head(max_chars)
+    if mode == "tail":
+        return _tail(max_chars)
+    if mode == "head_tail":
+        head = max_chars // 2
+        return _head(head) + "\n...\n" + _tail(max_chars - head)
+    raise ValueError(f"Unknown truncation mode '{mode}'. Available: {list(TRUNCATION_MODES)}")
+
+
+def describe_binary(data: bytes, size: int) -> str:
+    """Return a short description of binary content, given its first bytes and total size."""
+    kind = next((name for signature, name in _BINARY_SIGNATURES if data.startswith(signature)), "binary data")
+    return f"[Binary tool result: {kind}, {size} bytes. The content is not shown.]"
+
+
+async def shape_tool_result(
+    tool_name: str,
+    result: Any,
+    max_chars: int,
+    mode: str = "head_tail",
+    store: Optional[BlobStore] = None,
+    summarizer: Optional[ResultSummarizer] = None,
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Apply the size limit to a tool result.
+
+    Args:
+        tool_name: Name of the tool that produced the result.
+        result: The raw result returned by the client (bytes are described, not decoded),
+            or a SpilledResult.
+        max_chars: Maximum number of characters kept in the conversation.
+        mode: One of TRUNCATION_MODES.
+        store: Blob store for the full result. Defaults to the process-wide store.
+        summarizer: Required for the 'summarize' mode; on failure 'head_tail' is used instead.
+
+    Returns:
+        The content for the ToolMessage and, if the result was shortened, an artifact
+        holding the blob reference of the full result.
+    """
+    store = store or get_blob_store()
+    if isinstance(result, (bytes, bytearray)):
+        ref = await asyncio.to_thread(store.put, bytes(result))
+        artifact = {"blob": {"uri": ref.uri, "sha256": ref.digest, "size": ref.size}}
+        return describe_binary(bytes(result[:16]), ref.size), artifact
+
+    artifact_blob: Dict[str, Any]
+    text: Optional[str] = None
+    if isinstance(result, SpilledResult):
+        # Already in the blob store; only the excerpt is read back
+        ref = result.ref
+        artifact_blob = {"uri": ref.uri, "sha256": ref.digest, "size": ref.size}
+        if not result.is_text:
+            return describe_binary(store.read(ref.digest, 0, 16), ref.size), {"blob": artifact_blob}
+        if ref.size <= max_chars * _MAX_UTF8_BYTES:
+            # Small enough to read back whole, and it may still fit in characters
+            text = _decode(store.read(ref.digest))
+            if len(text) <= max_chars:
+                return text, None
+            artifact_blob["chars"] = len(text)
+        total = f"{ref.size} bytes"
+    else:
+        text = result_to_text(result)
+        if len(text) <= max_chars:
+            return text, None
+        # Hashing and writing megabytes would block the event loop
+        ref = await asyncio.to_thread(store.put, text)
+        total = f"{len(text)} characters"
+        artifact_blob = {"uri": ref.uri, "sha256": ref.digest, "size": ref.size, "chars": len(text)}
+
+    def excerpt(chars: int, cut: str) -> str:
+        if text is not None:
+            return truncate_text(text, chars, cut)
+        return _blob_excerpt(store, ref, chars, cut)
+
+    shortened: Optional[str] = None
+    kind = "excerpt"
+    if mode == "summarize" and summarizer is not None:
+        clipped = excerpt(max_chars * SUMMARY_INPUT_FACTOR, "head_tail")
+        try:
+            shortened = (await summarizer(tool_name, clipped, max_chars))[:max_chars]
+            kind = "summary"
+        except Exception as e:
+            logger.warning(f"Summarizing result of tool '{tool_name}' failed, truncating instead: {e}")
+    if shortened is None:
+        shortened = excerpt(max_chars, "head_tail" if mode == "summarize" else mode)
+
+    # The full result is only kept for the application (see the artifact); the model cannot read it back
+    note = (
+        f"\n\n[Tool result shortened: {kind} of {total}. "
+        f"The rest is not available; call the tool again with narrower arguments if more is needed.]"
+    )
+    logger.info(f"Result of tool '{tool_name}' shortened from {total} to {len(shortened)} characters ({ref.uri})")
+    return shortened + note, {"blob": artifact_blob}
@@ -1,14 +1,17 @@
 """Utility & helper functions."""
 
-import copy
 import os
-from typing import Optional
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage, AIMessage
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
 
+from react_agent.model_registry import get_model_registry
+
 class OpenRouter(ChatOpenAI):
     """OpenRouter chat model that extends OpenAI."""
     
@@ -33,17 +36,45 @@ def get_message_text(msg: BaseMessage) -> str:
         return "".join(txts).strip()
 
 
-def load_chat_model(fully_specified_name: str) -> BaseChatModel:
+def load_chat_model(fully_specified_name: str, **kwargs: Any) -> BaseChatModel:
     """Load a chat model from a fully specified name.
 
+    Instances are cached process-wide by name and kwargs, so repeated calls reuse
+    the same client and its pooled HTTP connections.
+
+    Args:
+        fully_specified_name (str): String in the format 'provider/model'.
+        **kwargs: Extra keyword arguments passed to the model constructor.
+    """
+    return get_model_registry().get_or_create(fully_specified_name, kwargs, _create_chat_model)
+
+
+def load_chat_model_with_tools(fully_specified_name: str, tools: Sequence[Any], **kwargs: Any) -> Runnable:
+    """Load a chat model and bind tools to it, reusing a cached binding when possible.
+
+    Bindings are cached by model name, kwargs and a fingerprint of the tool schemas,
+    so steps that reuse the same toolset skip the provider schema conversion.
+
     Args:
         fully_specified_name (str): String in the format 'provider/model'.
+        tools: The tools to bind. If empty, the plain model is returned.
+        **kwargs: Extra keyword arguments passed to the model constructor.
     """
+    if not tools:
+        return load_chat_model(fully_specified_name, **kwargs)
+    return get_model_registry().get_or_bind_tools(fully_specified_name, kwargs, tools, _create_chat_model)
+
+
+def _create_chat_model(fully_specified_name: str, **kwargs: Any) -> BaseChatModel:
+    """Construct a new chat model instance, bypassing the registry."""
     provider, model = fully_specified_name.split("/", maxsplit=1)
     if provider == "anthropic":
         print("Using OpenRouter for Anthropic")
-        return OpenRouter(model=fully_specified_name)
-    return init_chat_model(model, model_provider=provider)
+        # Report token usage (including cached tokens) when streaming
+        return OpenRouter(model=fully_specified_name, **{"stream_usage": True, **kwargs})
+    if provider == "openai":
+        kwargs = {"stream_usage": True, **kwargs}
+    return init_chat_model(model, model_provider=provider, **kwargs)
 
 
 def normalize_message_for_openai(msg: BaseMessage) -> BaseMessage:
@@ -70,39 +101,49 @@ def normalize_message_for_openai(msg: BaseMessage) -> BaseMessage:
     
     # If both exist, we need to create a normalized copy
     if has_tool_calls and has_function_call:
-        # Try multiple copy methods for compatibility
-        msg_copy = _safe_copy_message(msg)
-        if msg_copy:
-            # Remove the function_call to avoid OpenAI API error
-            del msg_copy.additional_kwargs['function_call']
-            return msg_copy
+        # Shallow copy: only additional_kwargs is replaced, content and tool calls are shared
+        additional_kwargs = {k: v for k, v in msg.additional_kwargs.items() if k != 'function_call'}
+        return msg.model_copy(update={"additional_kwargs": additional_kwargs})
     
-    # Message doesn't need normalization or copy failed (rare)
+    # Message doesn't need normalization
     return msg
 
 
-def _safe_copy_message(msg: BaseMessage) -> Optional[BaseMessage]:
-    """Create a deep copy of a message using the appropriate method.
-    
-    Tries multiple copy methods for compatibility with different LangChain versions.
-    
-    Args:
-        msg (BaseMessage): Message to copy
-        
-    Returns:
-        Optional[BaseMessage]: Copied message or None if all methods fail
+class _NormalizationCache:
+    """Identity-keyed cache of normalized messages.
+
+    Entries are dropped automatically when the original message is garbage collected.
+    Only messages that actually changed keep a reference to their normalized copy.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[int, Tuple[weakref.ref[BaseMessage], Optional[BaseMessage]]] = {}
+
+    def normalize(self, msg: BaseMessage) -> BaseMessage:
+        key = id(msg)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is msg:
+            return entry[1] if entry[1] is not None else msg
+
+        normalized = normalize_message_for_openai(msg)
+        ref = weakref.ref(msg, lambda r, key=key: self._discard(key, r))
+        # Store None for unchanged messages so the cache never keeps the original alive
+        self._entries[key] = (ref, normalized if normalized is not msg else None)
+        return normalized
+
+    def _discard(self, key: int, ref: "weakref.ref[BaseMessage]") -> None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is ref:
+            del self._entries[key]
+
+
+_normalization_cache = _NormalizationCache()
+
+
+def normalize_messages_for_openai(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """Normalize a message history, doing the work at most once per message object.
+
+    Messages already seen on a previous step are looked up by identity, so each step
+    only normalizes the newly appended tail of the history.
     """
-    try:
-        # Try Pydantic v2+ method
-        return msg.model_copy(deep=True)
-    except AttributeError:
-        try:
-            # Try Pydantic v1 method
-            return msg.copy(deep=True)
-        except AttributeError:
-            try:
-                # General fallback
-                return copy.deepcopy(msg)
-            except Exception:
-                # If all copy methods fail (very unlikely)
-                return None
+    return [_normalization_cache.normalize(msg) for msg in messages]
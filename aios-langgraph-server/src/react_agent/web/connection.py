@@ -1,12 +1,18 @@
 """WebSocket connection management."""
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Set, Tuple
 import asyncio
 from uuid import uuid4
-import json
+import os
 from fastapi import WebSocket
 
+from react_agent.web.protocol import WireProtocol
+from react_agent.web.result_stream import CHUNK, END, PROGRESS, START, ToolResultStream
+from react_agent.web.routing import RoutingBackend
+from react_agent.web.send_queue import SendQueue
+
 logger = logging.getLogger('websocket_server')
 
 # Custom Exceptions
@@ -18,89 +24,190 @@ class PendingToolCallError(Exception):
     """Raised when trying to disconnect a client with pending tool calls."""
     pass
 
+class RemoteToolCallError(Exception):
+    """Raised when a tool call forwarded to another node failed there."""
+    pass
+
+class PendingCallLimitError(Exception):
+    """Raised when a connection already has the maximum number of pending tool calls."""
+    pass
+
+# Upper bound on pending tool calls per connection
+MAX_PENDING_CALLS = int(os.getenv("AIOS_MAX_PENDING_CALLS", "1024"))
+# Pending calls nobody resolved or awaited within this time are evicted and counted as leaked
+PENDING_CALL_TTL_SECONDS = float(os.getenv("AIOS_PENDING_CALL_TTL", "600"))
+# Upper bound on cached proxies for connections owned by other nodes
+MAX_REMOTE_CONNECTIONS = 4096
+
 @dataclass
 class WebSocketConnection:
+    """A client connection with its tools, pending calls and outbound queue."""
+
     socket: WebSocket
     tools: Dict[str, Any]  # Store tool definitions for this connection
-    pending_calls: set[str] # Keep track of tool_call_ids pending for this connection
+    pending_calls: Dict[str, asyncio.Future] = field(default_factory=dict) # Pending tool calls of this connection, by tool_call_id
+    call_slots: Optional[asyncio.Semaphore] = field(default=None) # Caps concurrent tool calls, created on first use
+    protocol: WireProtocol = field(default_factory=WireProtocol) # Wire format negotiated with the client
+    result_streams: Dict[str, ToolResultStream] = field(default_factory=dict) # Open chunked results, by tool_call_id
+    send_queue: Optional[SendQueue] = field(default=None) # Single writer for all outbound messages
+
+    def __post_init__(self):
+        """Create the send queue, unless one was given."""
+        if self.send_queue is None:
+            self.send_queue = SendQueue(self.socket, self.protocol)
+
+
+class RemoteSocket:
+    """Stand-in socket for a connection held by another node.
+
+    Frames sent to it are forwarded through the routing backend to the node that
+    owns the client's WebSocket.
+    """
+
+    def __init__(self, routing: RoutingBackend, connection_id: str):
+        """Create a socket forwarding frames for `connection_id` through `routing`."""
+        self._routing = routing
+        self._connection_id = connection_id
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        """Forward a frame to the owning node."""
+        owner = await self._routing.locate(self._connection_id)
+        if owner is None or owner == self._routing.node_id:
+            raise ConnectionNotFoundError(f"No active connection found for ID: {self._connection_id}")
+        delivered = await self._routing.publish(owner, {
+            "type": "tool_call",
+            "origin": self._routing.node_id,
+            "connection_id": self._connection_id,
+            "payload": data,
+        })
+        if not delivered:
+            raise ConnectionNotFoundError(f"Node {owner} owning connection {self._connection_id} is not reachable.")
+
+    async def cancel(self, tool_call_id: str) -> None:
+        """Tell the owning node that a forwarded call is no longer awaited."""
+        owner = await self._routing.locate(self._connection_id)
+        if owner is None or owner == self._routing.node_id:
+            return
+        await self._routing.publish(owner, {
+            "type": "tool_cancel",
+            "origin": self._routing.node_id,
+            "connection_id": self._connection_id,
+            "tool_call_id": tool_call_id,
+        })
 
 
 class ConnectionManager:
-    _instance = None
+    """Registry of client connections and their pending tool calls.
+
+    Pending calls are kept per connection rather than in one global table, so a
+    disconnect only touches that connection's calls. A call is removed as soon as its
+    future completes, including when the caller cancels it on timeout, and an expiry
+    timer evicts calls that are never resolved or awaited. All state is only touched
+    from the event loop, so no locks are needed.
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            # Initialize here to ensure they exist before __init__ is potentially called multiple times
-            cls._instance.active_connections = {}
-            cls._instance.response_callbacks = {}
-        return cls._instance
+    Outbound messages go through each connection's bounded SendQueue, whose single
+    writer task keeps concurrent runs from racing on the socket.
+
+    With a routing backend started, connections owned by other workers or nodes can be
+    called too: calls are forwarded to the owning node and the responses routed back.
+    Use the process-wide instance from `get_connection_manager`.
+    """
 
     def __init__(self):
-        # Initialize only if these attributes don't exist yet
-        # Note: __new__ already initialized them, this is defensive.
-        if not hasattr(self, 'active_connections'):
-            self.active_connections: Dict[str, WebSocketConnection] = {}
-        if not hasattr(self, 'response_callbacks'):
-            self.response_callbacks: Dict[str, asyncio.Future] = {}
-
-    async def connect(self, websocket: WebSocket, tools: Dict[str, Any]) -> str:
+        self.active_connections: Dict[str, WebSocketConnection] = {}
+        self.remote_connections: OrderedDict[str, WebSocketConnection] = OrderedDict()
+        self.max_pending_calls = MAX_PENDING_CALLS
+        self.pending_call_ttl = PENDING_CALL_TTL_SECONDS
+        self.routing: Optional[RoutingBackend] = None
+        self._background_tasks: Set[asyncio.Task[Any]] = set()
+        self._routed_calls: Dict[Tuple[str, str, str], asyncio.Task[None]] = {} # Forwarded calls being served, by (origin, connection_id, tool_call_id)
+        self._pending_count = 0
+        self._leaked_futures = 0
+        self._late_responses = 0
+
+    async def start_routing(self, routing: RoutingBackend) -> None:
+        """Route tool calls between this node and other nodes through `routing`."""
+        self.routing = routing
+        await routing.start(self._handle_routed_message)
+        for connection_id in self.active_connections:
+            await routing.register(connection_id)
+        logger.info(f"Tool call routing started on node {routing.node_id}")
+
+    async def stop_routing(self) -> None:
+        """Stop routing and forget connections owned by other nodes."""
+        routing, self.routing = self.routing, None
+        if routing is None:
+            return
+        for connection_id in self.active_connections:
+            await routing.unregister(connection_id)
+        await routing.stop()
+        for connection_id in list(self.remote_connections):
+            self.disconnect(connection_id)
+
+    async def connect(self, websocket: WebSocket, tools: Dict[str, Any], protocol: Optional[WireProtocol] = None) -> str:
         """Store a new client connection and their tools"""
         connection_id = str(uuid4())
         logger.info(f"New connection created with ID: {connection_id}")
         self.active_connections[connection_id] = WebSocketConnection(
             socket=websocket,
             tools=tools,
-            pending_calls=set() # Initialize pending calls set
+            protocol=protocol or WireProtocol()
         )
+        if self.routing is not None:
+            await self.routing.register(connection_id)
         return connection_id
 
     def disconnect(self, connection_id: str):
-        """Remove a client connection"""
-        if connection_id in self.active_connections:
-            connection = self.active_connections[connection_id]
-            # Optional: Check if there are pending calls before disconnecting fully
-            # if connection.pending_calls:
-            #     logger.warning(f"Disconnecting client {connection_id} with pending tool calls: {connection.pending_calls}")
-            #     # Decide handling: maybe cancel futures, maybe raise error
-            #     # For now, just log and proceed. Consider raising PendingToolCallError if strictness needed.
-
-            logger.info(f"Disconnecting client: {connection_id}")
-            # Clean up any futures associated with this connection that might still be lingering
-            # This prevents memory leaks if a client disconnects before sending a response
-            for tool_call_id in list(connection.pending_calls): # Iterate copy as we modify callbacks
-                 if tool_call_id in self.response_callbacks:
-                     future = self.response_callbacks.pop(tool_call_id)
-                     if not future.done():
-                         # Cancel the future to signal the waiting task
-                         future.cancel()
-                         logger.info(f"Cancelled pending future {tool_call_id} for disconnected client {connection_id}")
-
-            del self.active_connections[connection_id]
-        else:
+        """Remove a client connection and cancel its pending tool calls"""
+        connection = self.active_connections.pop(connection_id, None)
+        if connection is not None and self.routing is not None:
+            self._spawn(self.routing.unregister(connection_id))
+        if connection is None:
+            connection = self.remote_connections.pop(connection_id, None)
+        if connection is None:
             # Optionally log or handle cases where disconnect is called for an unknown ID
             logger.warning(f"Attempted to disconnect non-existent connection ID: {connection_id}")
             # Do not raise ConnectionNotFoundError here, as disconnect might be called during cleanup
+            return
+
+        logger.info(f"Disconnecting client: {connection_id}")
+        # Cancel the futures so waiting tasks are released; their done callbacks
+        # remove them from the table
+        for tool_call_id, future in list(connection.pending_calls.items()):
+            self._forget(connection, tool_call_id, future)
+            if not future.done():
+                future.cancel()
+                logger.info(f"Cancelled pending future {tool_call_id} for disconnected client {connection_id}")
+        for stream in list(connection.result_streams.values()):
+            stream.abort(ConnectionNotFoundError(f"Connection {connection_id} closed while streaming a tool result"))
+        connection.send_queue.close(ConnectionNotFoundError(f"Connection {connection_id} closed"))
 
     async def call_tool(self, connection_id: str, tool_call_id: str, tool_name: str, tool_args: Dict[str, Any]) -> asyncio.Future:
         """Call a tool on the client side and return a Future for the result"""
-        connection = self.active_connections.get(connection_id)
+        connection = self._get_connection(connection_id)
         if connection is None:
             logger.error(f"No connection found for {connection_id} during tool call")
             raise ConnectionNotFoundError(f"No active connection found for ID: {connection_id}")
 
-        if tool_call_id in self.response_callbacks:
-             logger.warning(f"Tool call ID {tool_call_id} already exists. Overwriting.")
-             # Decide handling: raise error or allow overwrite? Overwriting might happen with retries.
+        previous_future = connection.pending_calls.get(tool_call_id)
+        if previous_future is not None:
+            logger.warning(f"Tool call ID {tool_call_id} already exists. Overwriting.")
+            # Overwriting might happen with retries; the previous waiter is released
+            self._forget(connection, tool_call_id, previous_future)
+            previous_future.cancel()
+        elif len(connection.pending_calls) >= self.max_pending_calls:
+            logger.error(f"Connection {connection_id} has {len(connection.pending_calls)} pending tool calls; rejecting {tool_call_id}")
+            raise PendingCallLimitError(
+                f"Connection {connection_id} already has {self.max_pending_calls} pending tool calls."
+            )
 
         logger.info(f"Calling tool {tool_name} with tool call ID: {tool_call_id} for connection {connection_id}")
 
-        response_future = asyncio.Future()
-        self.response_callbacks[tool_call_id] = response_future
-        connection.pending_calls.add(tool_call_id) # Track pending call
+        response_future = self._track(connection, tool_call_id)
 
         try:
-            await connection.socket.send_json({
+            # Waits for room in the send queue and for the message to be written
+            await connection.send_queue.send({
                 "tool_call_id": tool_call_id,
                 "type": "tool_call",
                 "data": {
@@ -110,31 +217,289 @@ class ConnectionManager:
             })
         except Exception as e:
             logger.error(f"Failed to send tool call {tool_call_id} to {connection_id}: {e}")
-            # Clean up the callback if sending failed
-            self.response_callbacks.pop(tool_call_id, None)
-            connection.pending_calls.discard(tool_call_id)
+            # Clean up the pending call if sending failed
+            self._forget(connection, tool_call_id, response_future)
+            response_future.cancel()
             # Re-raise or raise a specific "SendError"? Re-raising for now.
             raise
 
-        # Add a listener to remove the tool_call_id from pending_calls when the future completes
-        response_future.add_done_callback(
-            lambda _: connection.pending_calls.discard(tool_call_id) if connection_id in self.active_connections else None
-        )
-
         return response_future
 
-    def handle_response(self, tool_call_id: str, response_data: Any):
-        """Handle a response to a previously sent event"""
+    def is_local(self, connection_id: str) -> bool:
+        """Return whether the client's WebSocket is held by this node."""
+        return connection_id in self.active_connections
+
+    def get_call_slots(self, connection_id: str, limit: int) -> asyncio.Semaphore:
+        """Return the semaphore limiting concurrent tool calls on a connection.
+
+        The semaphore is created lazily with the given limit on first use and is
+        shared by every run using the connection, so concurrent runs on the same
+        client respect one combined cap. It is discarded with the connection.
+        """
+        connection = self._get_connection(connection_id)
+        if connection is None:
+            raise ConnectionNotFoundError(f"No active connection found for ID: {connection_id}")
+        if connection.call_slots is None:
+            connection.call_slots = asyncio.Semaphore(max(1, limit))
+        return connection.call_slots
+
+    def handle_response(self, tool_call_id: str, response_data: Any, connection_id: Optional[str] = None):
+        """Handle a response to a previously sent event.
+
+        Pass the id of the connection the response arrived on; without it every
+        connection's table has to be searched.
+        """
         logger.info(f"Handling response for tool call ID: {tool_call_id}")
-        if tool_call_id in self.response_callbacks:
-            future = self.response_callbacks.pop(tool_call_id) # Remove here
+        connection = self._find_pending(tool_call_id, connection_id)
+        if connection is None:
+            self._late_responses += 1
+            logger.warning(f"No callback found or already handled for tool call: {tool_call_id}")
+            return
+
+        future = connection.pending_calls[tool_call_id]
+        self._forget(connection, tool_call_id, future)
+        if not future.done():
+             logger.info(f"Found callback for tool call: {tool_call_id}. Setting result.")
+             future.set_result(response_data)
+        else:
+             logger.warning(f"Future for {tool_call_id} was already done (possibly cancelled or timed out).")
+
+    async def handle_stream_frame(self, message: Dict[str, Any], connection_id: Optional[str] = None):
+        """Handle a frame of a chunked tool result (see `react_agent.web.result_stream`).
+
+        The first frame for a call resolves its pending future with a ToolResultStream;
+        later frames are fed to that stream, waiting while its buffer is full.
+        """
+        tool_call_id = message.get("tool_call_id")
+        frame_type = message.get("type")
+        stream = self._find_stream(tool_call_id, connection_id)
+
+        if stream is None:
+            connection = self._find_pending(tool_call_id, connection_id)
+            if connection is None:
+                self._late_responses += 1
+                logger.warning(f"No pending call for streamed result frame '{frame_type}' of tool call: {tool_call_id}")
+                return
+            future = connection.pending_calls[tool_call_id]
+            self._forget(connection, tool_call_id, future)
+            if future.done():
+                logger.warning(f"Future for {tool_call_id} was already done (possibly cancelled or timed out).")
+                return
+            stream = ToolResultStream(tool_call_id)
+            connection.result_streams[tool_call_id] = stream
+            stream.set_close_callback(lambda closed: self._on_stream_closed(connection, closed))
+            logger.info(f"Streaming result started for tool call: {tool_call_id}")
+            future.set_result(stream)
+
+        if frame_type == CHUNK:
+            await stream.feed(CHUNK, message.get("data"))
+        elif frame_type == PROGRESS:
+            await stream.feed(PROGRESS, message.get("progress"))
+        elif frame_type == END:
+            await stream.feed(END, message.get("error"))
+        elif frame_type != START:
+            logger.warning(f"Ignoring unknown stream frame type '{frame_type}' for tool call: {tool_call_id}")
+
+    def expects(self, tool_call_id: str, connection_id: Optional[str] = None) -> bool:
+        """Return whether a response or stream frame for the tool call would be used."""
+        return self._find_pending(tool_call_id, connection_id) is not None \
+            or self._find_stream(tool_call_id, connection_id) is not None
+
+    def stats(self) -> Dict[str, int]:
+        """Return registry gauges for monitoring."""
+        return {
+            "connections": len(self.active_connections),
+            "remote_connections": len(self.remote_connections),
+            "pending_calls": self._pending_count,
+            "leaked_futures": self._leaked_futures,
+            "late_responses": self._late_responses,
+            "queued_messages": sum(connection.send_queue.depth for connection in self.active_connections.values()),
+        }
+
+    def send_queue_stats(self, connection_id: str) -> Dict[str, Any]:
+        """Return the send queue depth and latency metrics of a connection."""
+        connection = self.active_connections.get(connection_id) or self.remote_connections.get(connection_id)
+        if connection is None:
+            raise ConnectionNotFoundError(f"No active connection found for ID: {connection_id}")
+        return connection.send_queue.stats()
+
+    def _track(self, connection: WebSocketConnection, tool_call_id: str) -> asyncio.Future:
+        """Register a new pending call, evicted when it completes or expires."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        connection.pending_calls[tool_call_id] = future
+        self._pending_count += 1
+        expiry = loop.call_later(self.pending_call_ttl, self._expire, connection, tool_call_id, future)
+
+        def _on_done(_: asyncio.Future) -> None:
+            expiry.cancel()
+            abandoned = future.cancelled() and connection.pending_calls.get(tool_call_id) is future
+            self._forget(connection, tool_call_id, future)
+            if abandoned:
+                self._cancel_remote(connection, tool_call_id)
+
+        future.add_done_callback(_on_done)
+        return future
+
+    def _forget(self, connection: WebSocketConnection, tool_call_id: str, future: asyncio.Future) -> None:
+        """Remove a pending call from its connection's table, if still registered."""
+        if connection.pending_calls.get(tool_call_id) is future:
+            del connection.pending_calls[tool_call_id]
+            self._pending_count -= 1
+
+    def _expire(self, connection: WebSocketConnection, tool_call_id: str, future: asyncio.Future) -> None:
+        if future.done():
+            return
+        self._leaked_futures += 1
+        logger.warning(f"Evicting tool call {tool_call_id}: unresolved after {self.pending_call_ttl}s")
+        self._forget(connection, tool_call_id, future)
+        future.cancel()
+        self._cancel_remote(connection, tool_call_id)
+
+    def _on_stream_closed(self, connection: WebSocketConnection, stream: ToolResultStream) -> None:
+        connection.result_streams.pop(stream.tool_call_id, None)
+        if stream.abandoned:
+            self._cancel_remote(connection, stream.tool_call_id)
+
+    def _cancel_remote(self, connection: WebSocketConnection, tool_call_id: str) -> None:
+        """Let the owning node stop serving a forwarded call this node gave up on."""
+        if isinstance(connection.socket, RemoteSocket):
+            self._spawn(connection.socket.cancel(tool_call_id))
+
+    def _find_pending(self, tool_call_id: str, connection_id: Optional[str]) -> Optional[WebSocketConnection]:
+        if connection_id is not None:
+            connection = self.active_connections.get(connection_id) or self.remote_connections.get(connection_id)
+            return connection if connection is not None and tool_call_id in connection.pending_calls else None
+        for connection in (*self.active_connections.values(), *self.remote_connections.values()):
+            if tool_call_id in connection.pending_calls:
+                return connection
+        return None
+
+    def _find_stream(self, tool_call_id: str, connection_id: Optional[str]) -> Optional[ToolResultStream]:
+        if connection_id is not None:
+            connection = self.active_connections.get(connection_id) or self.remote_connections.get(connection_id)
+            return connection.result_streams.get(tool_call_id) if connection is not None else None
+        for connection in (*self.active_connections.values(), *self.remote_connections.values()):
+            if tool_call_id in connection.result_streams:
+                return connection.result_streams[tool_call_id]
+        return None
+
+    def _get_connection(self, connection_id: str) -> Optional[WebSocketConnection]:
+        """Return the local connection, or a proxy for it if routing is enabled."""
+        connection = self.active_connections.get(connection_id)
+        if connection is not None or self.routing is None:
+            return connection
+        connection = self.remote_connections.get(connection_id)
+        if connection is None:
+            connection = WebSocketConnection(socket=RemoteSocket(self.routing, connection_id), tools={})
+            self.remote_connections[connection_id] = connection
+            self._evict_remote_connections()
+        else:
+            self.remote_connections.move_to_end(connection_id)
+        return connection
+
+    def _evict_remote_connections(self) -> None:
+        # Drop the least recently used proxies without pending calls
+        excess = len(self.remote_connections) - MAX_REMOTE_CONNECTIONS
+        for connection_id in list(self.remote_connections):
+            if excess <= 0:
+                break
+            if not self.remote_connections[connection_id].pending_calls:
+                self.remote_connections.pop(connection_id).send_queue.close()
+                excess -= 1
+
+    async def _handle_routed_message(self, message: Dict[str, Any]) -> None:
+        """Handle a message forwarded by another node."""
+        message_type = message.get("type")
+        if message_type == "tool_call":
+            key = (message["origin"], message["connection_id"], message["payload"]["tool_call_id"])
+            task = self._spawn(self._serve_routed_call(message))
+            self._routed_calls[key] = task
+
+            def _on_served(done: "asyncio.Task[Any]") -> None:
+                if self._routed_calls.get(key) is done:
+                    del self._routed_calls[key]
+
+            task.add_done_callback(_on_served)
+        elif message_type == "tool_cancel":
+            task = self._routed_calls.pop((message["origin"], message["connection_id"], message["tool_call_id"]), None)
+            if task is not None:
+                logger.info(f"Tool call {message['tool_call_id']} was cancelled by node {message['origin']}")
+                task.cancel()
+        elif message_type == "tool_stream_frame":
+            await self.handle_stream_frame(message["frame"], connection_id=message["connection_id"])
+        elif message_type == "tool_response":
+            self.handle_response(message["tool_call_id"], message.get("response"), connection_id=message["connection_id"])
+        elif message_type == "tool_error":
+            connection = self._find_pending(message["tool_call_id"], message["connection_id"])
+            if connection is None:
+                self._late_responses += 1
+                return
+            future = connection.pending_calls[message["tool_call_id"]]
+            self._forget(connection, message["tool_call_id"], future)
             if not future.done():
-                 logger.info(f"Found callback for tool call: {tool_call_id}. Setting result.")
-                 future.set_result(response_data)
-            else:
-                 logger.warning(f"Future for {tool_call_id} was already done (possibly cancelled or timed out).")
+                error_type = ConnectionNotFoundError if message.get("reason") == "connection_not_found" else RemoteToolCallError
+                future.set_exception(error_type(message.get("error", "Tool call failed on the owning node.")))
         else:
-            logger.warning(f"No callback found or already handled for tool call: {tool_call_id}")
+            logger.warning(f"Ignoring routed message of unknown type: {message_type}")
+
+    async def _serve_routed_call(self, message: Dict[str, Any]) -> None:
+        """Send a tool call forwarded by another node to the local client and reply with the result."""
+        connection_id = message["connection_id"]
+        payload = message["payload"]
+        tool_call_id = payload["tool_call_id"]
+        reply: Dict[str, Any] = {"type": "tool_response", "connection_id": connection_id, "tool_call_id": tool_call_id}
+        try:
+            if connection_id not in self.active_connections:
+                raise ConnectionNotFoundError(f"No active connection found for ID: {connection_id}")
+            future = await self.call_tool(connection_id, tool_call_id, payload["data"]["name"], payload["data"]["arguments"])
+            try:
+                # Shielded so a cancellation by the origin can be told apart from a disconnect
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    future.cancel()
+                    raise
+                raise ConnectionNotFoundError(f"Tool call {tool_call_id} was cancelled on connection {connection_id}")
+            if isinstance(result, ToolResultStream):
+                await self._forward_result_stream(message["origin"], connection_id, result)
+                return
+            reply["response"] = result
+        except ConnectionNotFoundError as e:
+            reply.update(type="tool_error", reason="connection_not_found", error=str(e))
+        except Exception as e:
+            logger.error(f"Routed tool call {tool_call_id} failed: {e}")
+            reply.update(type="tool_error", reason="error", error=str(e))
+        if self.routing is not None:
+            await self.routing.publish(message["origin"], reply)
+
+    async def _forward_result_stream(self, origin: str, connection_id: str, stream: ToolResultStream) -> None:
+        """Relay a chunked result to the node that made the call, frame by frame."""
+        async def _publish(frame: Dict[str, Any]) -> None:
+            if self.routing is not None:
+                await self.routing.publish(origin, {"type": "tool_stream_frame", "connection_id": connection_id, "frame": frame})
+
+        tool_call_id = stream.tool_call_id
+        await _publish({"type": START, "tool_call_id": tool_call_id})
+        try:
+            async for kind, data in stream.frames(idle_timeout=self.pending_call_ttl):
+                if kind == "chunk":
+                    await _publish({"type": CHUNK, "tool_call_id": tool_call_id, "data": data})
+                else:
+                    await _publish({"type": PROGRESS, "tool_call_id": tool_call_id, "progress": data})
+        except Exception as e:
+            await _publish({"type": END, "tool_call_id": tool_call_id, "error": str(e) or type(e).__name__})
+        else:
+            await _publish({"type": END, "tool_call_id": tool_call_id})
+        finally:
+            stream.close()
+
+    def _spawn(self, coroutine: Any) -> "asyncio.Task[Any]":
+        # Keep a reference so background tasks are not garbage collected mid-flight
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
 
 
 # --- Dependency Injection ---
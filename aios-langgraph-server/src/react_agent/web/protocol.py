@@ -0,0 +1,304 @@
+"""Wire protocol for the /ws tool WebSocket.
+
+Clients choose the protocol with query parameters on the WebSocket URL and the
+server confirms what it will use in the `connection_established` message (which is
+always sent as JSON text):
+
+- `encoding`: 'json' (default) or 'msgpack' (if the server has msgpack installed).
+- `framing`: 'text' (default) or 'binary'. msgpack always uses binary framing.
+- `compression`: 'none' (default) or 'zstd' (if the server has zstandard installed).
+- `batch`: '1' to accept several server messages combined into one
+  `{"type": "batch", "messages": [...]}` frame (see `react_agent.web.send_queue`).
+
+Text framing is the original protocol: one JSON document per text message; bytes
+values are sent as `{"$base64": "..."}`.
+
+Binary framing sends one message per binary WebSocket frame::
+
+    flags (1 byte) | body length (4 bytes, big endian) | body
+    [ | attachment length (4 bytes) | attachment bytes ]...
+
+The body is the encoded message, zstd-compressed when flag bit 0 is set (only done
+above `compression_threshold` bytes). Every `bytes` value in the message is moved
+to a raw attachment and replaced in the body by `{"$attachment": index}`, so images
+and files are never base64-encoded. Attachments are not compressed.
+
+WebSocket-level permessage-deflate is negotiated separately by the ASGI server.
+"""
+
+import base64
+import json
+import logging
+import re
+import struct
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, a faster JSON parser for large frames
+    orjson = None
+
+logger = logging.getLogger('websocket_protocol')
+
+FLAG_COMPRESSED = 0x01
+_LENGTH = struct.Struct(">I")
+DEFAULT_COMPRESSION_THRESHOLD = 16 * 1024
+
+# Only the start of a frame is searched when peeking at its tool_call_id
+PEEK_WINDOW = 512
+_TOOL_CALL_ID_PATTERN = re.compile(r'"tool_call_id"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+class ProtocolError(Exception):
+    """Raised when a frame cannot be decoded."""
+    pass
+
+
+@dataclass(frozen=True)
+class WireProtocol:
+    """Protocol settings of one tool WebSocket connection."""
+
+    encoding: str = "json"
+    framing: str = "text"
+    compression: str = "none"
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD
+    batching: bool = False
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the settings as sent to the client in `connection_established`."""
+        return asdict(self)
+
+
+def supported_options() -> Dict[str, List[str]]:
+    """Return the protocol options available on this server."""
+    return {
+        "encoding": ["json"] + (["msgpack"] if msgpack is not None else []),
+        "framing": ["text", "binary"],
+        "compression": ["none"] + (["zstd"] if zstandard is not None else []),
+        "batch": ["0", "1"],
+    }
+
+
+def negotiate(params: Mapping[str, str]) -> WireProtocol:
+    """Pick the protocol for a connection from the client's requested options.
+
+    Unsupported options fall back to the defaults.
+    """
+    supported = supported_options()
+    encoding = params.get("encoding", "json")
+    framing = params.get("framing", "text")
+    compression = params.get("compression", "none")
+    batching = params.get("batch", "0").lower() in ("1", "true")
+    if encoding not in supported["encoding"]:
+        logger.warning(f"Client requested unsupported encoding '{encoding}', using json")
+        encoding = "json"
+    if compression not in supported["compression"]:
+        logger.warning(f"Client requested unsupported compression '{compression}', using none")
+        compression = "none"
+    if framing not in supported["framing"]:
+        framing = "text"
+    # Only binary frames can carry msgpack, compressed bodies or raw attachments
+    if encoding != "json" or compression != "none":
+        framing = "binary"
+    return WireProtocol(encoding=encoding, framing=framing, compression=compression, batching=batching)
+
+
+# --- JSON text helpers ---
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"$base64": base64.b64encode(bytes(value)).decode("ascii")}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_object_hook(value: Dict[str, Any]) -> Any:
+    if len(value) == 1 and "$base64" in value:
+        return base64.b64decode(value["$base64"])
+    return value
+
+
+def _decode_base64_values(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and "$base64" in value:
+            return base64.b64decode(value["$base64"])
+        return {key: _decode_base64_values(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_base64_values(item) for item in value]
+    return value
+
+
+def _loads(data: Union[str, bytes]) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def dumps_json(message: Any) -> str:
+    """Serialize a message to JSON, encoding bytes values as base64."""
+    return json.dumps(message, default=_json_default)
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """Parse JSON produced by `dumps_json`, decoding base64 values back to bytes."""
+    if orjson is None:
+        return json.loads(data, object_hook=_json_object_hook)
+    value = orjson.loads(data)
+    # orjson has no object hook; only walk the result if it can contain base64 values
+    marker = "$base64" if isinstance(data, str) else b"$base64"
+    return _decode_base64_values(value) if marker in data else value
+
+
+def peek_tool_call_id(data: Union[str, bytes]) -> Optional[str]:
+    """Return the tool_call_id of a JSON text frame without parsing the whole frame.
+
+    Only finds ids that appear near the start of the frame; returns None otherwise.
+    """
+    if not isinstance(data, str):
+        return None
+    match = _TOOL_CALL_ID_PATTERN.search(data, 0, PEEK_WINDOW)
+    return json.loads(f'"{match.group(1)}"') if match else None
+
+
+# --- Binary frames ---
+
+def _extract_attachments(value: Any, attachments: List[bytes]) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        attachments.append(bytes(value))
+        return {"$attachment": len(attachments) - 1}
+    if isinstance(value, dict):
+        return {key: _extract_attachments(item, attachments) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_extract_attachments(item, attachments) for item in value]
+    return value
+
+
+def _restore_attachments(value: Any, attachments: List[bytes]) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and "$attachment" in value:
+            index = value["$attachment"]
+            if not isinstance(index, int) or not 0 <= index < len(attachments):
+                raise ProtocolError(f"Invalid attachment reference {index!r}")
+            return attachments[index]
+        return {key: _restore_attachments(item, attachments) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_restore_attachments(item, attachments) for item in value]
+    return value
+
+
+def encode_frame(protocol: WireProtocol, message: Any) -> Union[str, bytes]:
+    """Encode a message for the connection's protocol."""
+    if protocol.framing == "text":
+        return dumps_json(message)
+
+    attachments: List[bytes] = []
+    body_value = _extract_attachments(message, attachments)
+    if protocol.encoding == "msgpack":
+        body = msgpack.packb(body_value, use_bin_type=True)
+    elif orjson is not None:
+        body = orjson.dumps(body_value, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        body = json.dumps(body_value).encode("utf-8")
+
+    flags = 0
+    if protocol.compression == "zstd" and len(body) >= protocol.compression_threshold:
+        body = zstandard.ZstdCompressor().compress(body)
+        flags |= FLAG_COMPRESSED
+
+    parts = [bytes([flags]), _LENGTH.pack(len(body)), body]
+    for attachment in attachments:
+        parts.append(_LENGTH.pack(len(attachment)))
+        parts.append(attachment)
+    return b"".join(parts)
+
+
+def decode_frame(protocol: WireProtocol, data: Union[str, bytes]) -> Any:
+    """Decode a received text or binary frame into a message."""
+    if isinstance(data, str):
+        try:
+            return loads_json(data)
+        except ValueError as e:
+            raise ProtocolError(f"Invalid JSON text frame: {e}") from e
+
+    view = memoryview(data)
+    try:
+        flags = view[0]
+        (body_length,) = _LENGTH.unpack_from(view, 1)
+        offset = 1 + _LENGTH.size
+        body = bytes(view[offset:offset + body_length])
+        if len(body) != body_length:
+            raise ProtocolError("Truncated frame body")
+        offset += body_length
+        attachments: List[bytes] = []
+        while offset < len(view):
+            (attachment_length,) = _LENGTH.unpack_from(view, offset)
+            offset += _LENGTH.size
+            attachment = bytes(view[offset:offset + attachment_length])
+            if len(attachment) != attachment_length:
+                raise ProtocolError("Truncated frame attachment")
+            attachments.append(attachment)
+            offset += attachment_length
+    except (IndexError, struct.error) as e:
+        raise ProtocolError(f"Malformed binary frame: {e}") from e
+
+    if flags & FLAG_COMPRESSED:
+        if zstandard is None:
+            raise ProtocolError("Received a zstd-compressed frame but zstandard is not installed")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    try:
+        if protocol.encoding == "msgpack":
+            message = msgpack.unpackb(body, raw=False)
+        else:
+            message = _loads(body)
+    except Exception as e:
+        raise ProtocolError(f"Invalid {protocol.encoding} frame body: {e}") from e
+    return _restore_attachments(message, attachments)
+
+
+async def send_message(websocket: Any, protocol: WireProtocol, message: Any) -> None:
+    """Send a message over a tool WebSocket using the connection's protocol."""
+    if protocol.framing == "text":
+        # Plain JSON, as sent by the original protocol
+        if _contains_bytes(message):
+            await websocket.send_text(dumps_json(message))
+        else:
+            await websocket.send_json(message)
+        return
+    await websocket.send_bytes(encode_frame(protocol, message))
+
+
+async def receive_frame(websocket: WebSocket) -> Union[str, bytes]:
+    """Receive one raw text or binary frame without decoding it."""
+    event = await websocket.receive()
+    if event["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(event.get("code", 1000))
+    if event.get("text") is not None:
+        return event["text"]
+    if event.get("bytes") is not None:
+        return event["bytes"]
+    raise ProtocolError(f"Unexpected WebSocket event: {event['type']}")
+
+
+async def receive_message(websocket: WebSocket, protocol: WireProtocol) -> Any:
+    """Receive and decode one message. Text frames are accepted in every mode."""
+    return decode_frame(protocol, await receive_frame(websocket))
+
+
+def _contains_bytes(value: Any) -> bool:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return True
+    if isinstance(value, dict):
+        return any(_contains_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_contains_bytes(item) for item in value)
+    return False
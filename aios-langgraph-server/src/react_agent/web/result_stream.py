@@ -0,0 +1,154 @@
+"""Chunked tool results.
+
+Instead of a single `{"tool_call_id", "response"}` message, a client may stream a
+tool result as a sequence of frames keyed by the tool call id:
+
+- `{"type": "tool_result_start", "tool_call_id": ...}` opens the stream.
+- `{"type": "tool_result_chunk", "tool_call_id": ..., "data": ...}` carries partial
+  output (text, or bytes with binary framing).
+- `{"type": "tool_progress", "tool_call_id": ...}` reports progress without output.
+- `{"type": "tool_result_end", "tool_call_id": ..., "error": optional}` closes it.
+
+The first frame of a call resolves its pending future with a `ToolResultStream`,
+which the executor consumes as an async iterator. Every chunk or progress frame
+restarts the consumer's idle timeout, so long-running tools that report progress
+are not timed out. Buffering is bounded: once the consumer falls behind by
+`max_buffered_bytes`, feeding waits, which applies backpressure to the client.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
+
+logger = logging.getLogger('websocket_server')
+
+START = "tool_result_start"
+CHUNK = "tool_result_chunk"
+PROGRESS = "tool_progress"
+END = "tool_result_end"
+STREAM_FRAME_TYPES = (START, CHUNK, PROGRESS, END)
+
+DEFAULT_MAX_BUFFERED_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_BUFFERED_FRAMES = 1024
+
+
+class ToolResultStreamError(Exception):
+    """Raised to the consumer when the client reports an error at the end of a stream."""
+    pass
+
+
+def _size(data: Any) -> int:
+    return len(data) if isinstance(data, (str, bytes, bytearray)) else 0
+
+
+class ToolResultStream:
+    """Bounded buffer of result chunks for one tool call, consumed as an async iterator."""
+
+    def __init__(
+        self,
+        tool_call_id: str,
+        max_buffered_bytes: int = DEFAULT_MAX_BUFFERED_BYTES,
+        max_buffered_frames: int = DEFAULT_MAX_BUFFERED_FRAMES,
+    ):
+        """Create an empty stream for `tool_call_id`, bounded by bytes and frames."""
+        self.tool_call_id = tool_call_id
+        self.max_buffered_bytes = max_buffered_bytes
+        self._queue: asyncio.Queue[Tuple[str, Any]] = asyncio.Queue(maxsize=max_buffered_frames)
+        self._buffered_bytes = 0
+        self._space = asyncio.Event()
+        self._space.set()
+        self._closed = False
+        self._abandoned = False
+        self._on_close: Optional[Callable[[ToolResultStream], None]] = None
+        self.received_bytes = 0
+
+    @property
+    def closed(self) -> bool:
+        """Whether the stream was ended, aborted or abandoned by its consumer."""
+        return self._closed
+
+    @property
+    def abandoned(self) -> bool:
+        """Whether the consumer closed the stream before it ended."""
+        return self._abandoned
+
+    def set_close_callback(self, callback: Callable[["ToolResultStream"], None]) -> None:
+        """Register a callback run once when the stream closes."""
+        self._on_close = callback
+
+    async def feed(self, kind: str, data: Any = None) -> bool:
+        """Add a frame; waits while the buffer is full. Returns False if the stream is closed."""
+        if self._closed:
+            return False
+        size = _size(data)
+        # A single oversized chunk is accepted once the buffer is empty
+        while self._buffered_bytes and self._buffered_bytes + size > self.max_buffered_bytes:
+            self._space.clear()
+            await self._space.wait()
+            if self._closed:
+                return False
+        self._buffered_bytes += size
+        self.received_bytes += size
+        await self._queue.put((kind, data))
+        if kind == END:
+            self._close()
+        return True
+
+    def abort(self, error: BaseException) -> None:
+        """End the stream with an error, e.g. because the client disconnected."""
+        if self._closed:
+            return
+        self._drain()
+        self._queue.put_nowait(("error", error))
+        self._close()
+
+    def close(self) -> None:
+        """Abandon the stream from the consumer side; later frames are dropped."""
+        if not self._closed:
+            self._abandoned = True
+            self._drain()
+            self._close()
+
+    async def frames(self, idle_timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield ('chunk', data) and ('progress', data) frames until the stream ends.
+
+        Raises TimeoutError if no frame arrives within `idle_timeout` seconds.
+        """
+        while True:
+            kind, data = await asyncio.wait_for(self._queue.get(), timeout=idle_timeout)
+            self._buffered_bytes -= _size(data)
+            self._space.set()
+            if kind == CHUNK:
+                yield "chunk", data
+            elif kind == PROGRESS:
+                yield "progress", data
+            elif kind == END:
+                if data:
+                    raise ToolResultStreamError(str(data))
+                return
+            elif kind == "error":
+                raise data
+            # START frames carry no data
+
+    async def chunks(self, idle_timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        """Yield result chunks until the stream ends; progress frames only extend the timeout."""
+        async for kind, data in self.frames(idle_timeout):
+            if kind == "chunk":
+                yield data
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        """Iterate over the chunks, as `chunks` does."""
+        return self.chunks()
+
+    def _drain(self) -> None:
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._buffered_bytes = 0
+        self._space.set()
+
+    def _close(self) -> None:
+        self._closed = True
+        self._space.set()
+        if self._on_close is not None:
+            callback, self._on_close = self._on_close, None
+            callback(self)
@@ -0,0 +1,328 @@
+"""Routing of tool calls between server processes.
+
+A client's tool WebSocket is held by exactly one worker process, but a graph run
+for that client may execute in any worker or node. A `RoutingBackend` records which
+node owns each connection and carries messages between nodes:
+
+- `tool_call` messages go from the node running the graph to the owning node, which
+  sends the call down the client's socket.
+- `tool_response` / `tool_error` / `tool_stream_frame` messages go back to the node
+  that made the call, and `tool_cancel` tells the owning node the caller gave up.
+
+Received messages are handled off the transport's receive loop by a
+`MessageDispatcher`, so a slow handler (e.g. a stream frame waiting for buffer
+space) never holds up other messages for the node.
+
+`InMemoryRoutingBackend` connects nodes living in one process (and is useful in
+tests); `RedisRoutingBackend` uses Redis keys for ownership and pub/sub channels for
+messages, so workers and hosts can share one Redis instance. Ownership keys expire
+unless the owning node keeps refreshing them, so a crashed node stops attracting calls.
+"""
+
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+from uuid import uuid4
+
+from react_agent.web.protocol import dumps_json, loads_json
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Optional dependency, only needed for the Redis backend
+    aioredis = None
+
+logger = logging.getLogger('websocket_routing')
+
+MessageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class MessageDispatcher:
+    """Runs a message handler on received messages without blocking the receiver.
+
+    Each message is handled in its own task, except that the frames of one streamed
+    result are handled one at a time, in the order they arrived.
+    """
+
+    def __init__(self, handler: MessageHandler, node_id: str = ""):
+        """Create a dispatcher passing received messages to `handler`."""
+        self._handler = handler
+        self._node_id = node_id
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self._ordered: Dict[Tuple[Any, Any], Deque[Dict[str, Any]]] = {}
+
+    def dispatch(self, message: Dict[str, Any]) -> None:
+        """Schedule a message for handling."""
+        key = _ordering_key(message)
+        if key is None:
+            self._spawn(self._run(message))
+            return
+        queue = self._ordered.get(key)
+        if queue is not None:
+            queue.append(message)
+            return
+        self._ordered[key] = deque([message])
+        self._spawn(self._drain(key))
+
+    async def close(self) -> None:
+        """Cancel messages still being handled."""
+        tasks, self._tasks = self._tasks, set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._ordered.clear()
+
+    async def _drain(self, key: Tuple[Any, Any]) -> None:
+        queue = self._ordered[key]
+        try:
+            while queue:
+                await self._run(queue[0])
+                queue.popleft()
+        finally:
+            self._ordered.pop(key, None)
+
+    async def _run(self, message: Dict[str, Any]) -> None:
+        try:
+            await self._handler(message)
+        except Exception as e:
+            logger.error(f"Error handling routing message on node {self._node_id}: {e}", exc_info=True)
+
+    def _spawn(self, coroutine: Any) -> None:
+        # Keep a reference so handler tasks are not garbage collected mid-flight
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+def _ordering_key(message: Dict[str, Any]) -> Optional[Tuple[Any, Any]]:
+    """Return the key of messages that must be handled in order, or None."""
+    if message.get("type") != "tool_stream_frame":
+        return None
+    frame = message.get("frame") or {}
+    return message.get("connection_id"), frame.get("tool_call_id")
+
+
+class RoutingBackend(ABC):
+    """Connection ownership registry and message transport between nodes."""
+
+    def __init__(self, node_id: Optional[str] = None):
+        """Create the backend for this node, with a random id unless `node_id` is given."""
+        self.node_id = node_id or uuid4().hex
+
+    @abstractmethod
+    async def start(self, handler: MessageHandler) -> None:
+        """Start delivering messages addressed to this node to `handler`."""
+        pass
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop receiving messages and release resources."""
+        pass
+
+    @abstractmethod
+    async def register(self, connection_id: str) -> None:
+        """Record this node as the owner of a connection."""
+        pass
+
+    @abstractmethod
+    async def unregister(self, connection_id: str) -> None:
+        """Remove this node's ownership record for a connection."""
+        pass
+
+    @abstractmethod
+    async def locate(self, connection_id: str) -> Optional[str]:
+        """Return the id of the node owning a connection, or None if unknown."""
+        pass
+
+    @abstractmethod
+    async def publish(self, node_id: str, message: Dict[str, Any]) -> bool:
+        """Send a message to a node. Returns False if no node received it."""
+        pass
+
+
+class InMemoryRoutingHub:
+    """Shared state connecting the InMemoryRoutingBackends of one process."""
+
+    def __init__(self) -> None:
+        """Create a hub with no nodes."""
+        self.owners: Dict[str, str] = {}
+        self.dispatchers: Dict[str, MessageDispatcher] = {}
+
+
+class InMemoryRoutingBackend(RoutingBackend):
+    """Routing between nodes that share an InMemoryRoutingHub."""
+
+    def __init__(self, hub: Optional[InMemoryRoutingHub] = None, node_id: Optional[str] = None):
+        """Create a backend on `hub`, or on a hub of its own if omitted."""
+        super().__init__(node_id)
+        self.hub = hub or InMemoryRoutingHub()
+
+    async def start(self, handler: MessageHandler) -> None:
+        """Subscribe this node to the hub."""
+        self.hub.dispatchers[self.node_id] = MessageDispatcher(handler, self.node_id)
+
+    async def stop(self) -> None:
+        """Unsubscribe this node from the hub."""
+        dispatcher = self.hub.dispatchers.pop(self.node_id, None)
+        if dispatcher is not None:
+            await dispatcher.close()
+
+    async def register(self, connection_id: str) -> None:
+        """Record this node as the owner of a connection."""
+        self.hub.owners[connection_id] = self.node_id
+
+    async def unregister(self, connection_id: str) -> None:
+        """Remove this node's ownership record for a connection."""
+        if self.hub.owners.get(connection_id) == self.node_id:
+            del self.hub.owners[connection_id]
+
+    async def locate(self, connection_id: str) -> Optional[str]:
+        """Return the id of the node owning a connection."""
+        return self.hub.owners.get(connection_id)
+
+    async def publish(self, node_id: str, message: Dict[str, Any]) -> bool:
+        """Deliver a message to a node's handler on the next loop iteration."""
+        dispatcher = self.hub.dispatchers.get(node_id)
+        if dispatcher is None:
+            return False
+        # Round-trip through JSON so messages behave as they would over the wire
+        dispatcher.dispatch(loads_json(dumps_json(message)))
+        return True
+
+
+class RedisRoutingBackend(RoutingBackend):
+    """Routing through Redis: ownership keys plus one pub/sub channel per node.
+
+    Args:
+        client: A `redis.asyncio.Redis` client (or compatible, e.g. fakeredis). If
+            omitted one is created from `url` and closed on `stop`.
+        url: Redis URL used when no client is given.
+        prefix: Prefix for keys and channels.
+        node_id: Id of this node. Defaults to a random id.
+        owner_ttl_seconds: Lifetime of ownership keys. While running, the node
+            refreshes the keys of its connections every third of this interval.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: Optional[str] = None,
+        prefix: str = "aios:tools",
+        node_id: Optional[str] = None,
+        owner_ttl_seconds: float = 30.0,
+    ):
+        """Create the backend; the arguments are described on the class."""
+        super().__init__(node_id)
+        self._owns_client = client is None
+        if client is None:
+            if aioredis is None:
+                raise ImportError("RedisRoutingBackend requires the 'redis' package. Install it with 'pip install redis'.")
+            client = aioredis.from_url(url or "redis://localhost:6379/0")
+        self._client = client
+        self.prefix = prefix
+        self.owner_ttl_seconds = owner_ttl_seconds
+        self._pubsub: Any = None
+        self._listener: Optional[asyncio.Task[None]] = None
+        self._refresher: Optional[asyncio.Task[None]] = None
+        self._dispatcher: Optional[MessageDispatcher] = None
+        self._owned: Set[str] = set()
+
+    def _owner_key(self, connection_id: str) -> str:
+        return f"{self.prefix}:owner:{connection_id}"
+
+    def _channel(self, node_id: str) -> str:
+        return f"{self.prefix}:node:{node_id}"
+
+    async def start(self, handler: MessageHandler) -> None:
+        """Subscribe to this node's channel and start the listener task."""
+        self._pubsub = self._client.pubsub()
+        await self._pubsub.subscribe(self._channel(self.node_id))
+        self._dispatcher = MessageDispatcher(handler, self.node_id)
+        self._listener = asyncio.create_task(self._listen(self._dispatcher))
+        self._refresher = asyncio.create_task(self._refresh_ownership())
+        logger.info(f"Routing node {self.node_id} subscribed to {self._channel(self.node_id)}")
+
+    async def stop(self) -> None:
+        """Stop the listener and unsubscribe."""
+        for task in (self._listener, self._refresher):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        self._listener = self._refresher = None
+        if self._dispatcher is not None:
+            await self._dispatcher.close()
+            self._dispatcher = None
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe()
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def register(self, connection_id: str) -> None:
+        """Record this node as the owner of a connection, until the key expires."""
+        self._owned.add(connection_id)
+        await self._client.set(self._owner_key(connection_id), self.node_id, px=self._owner_ttl_ms)
+
+    async def unregister(self, connection_id: str) -> None:
+        """Remove the ownership record if it still points at this node."""
+        self._owned.discard(connection_id)
+        key = self._owner_key(connection_id)
+        if await self.locate(connection_id) == self.node_id:
+            await self._client.delete(key)
+
+    async def locate(self, connection_id: str) -> Optional[str]:
+        """Return the id of the node owning a connection."""
+        owner = await self._client.get(self._owner_key(connection_id))
+        if isinstance(owner, bytes):
+            owner = owner.decode("utf-8")
+        return owner
+
+    async def publish(self, node_id: str, message: Dict[str, Any]) -> bool:
+        """Publish a message on a node's channel."""
+        receivers = await self._client.publish(self._channel(node_id), dumps_json(message))
+        return receivers > 0
+
+    @property
+    def _owner_ttl_ms(self) -> int:
+        return max(1, int(self.owner_ttl_seconds * 1000))
+
+    async def _refresh_ownership(self) -> None:
+        while True:
+            await asyncio.sleep(self.owner_ttl_seconds / 3)
+            if not self._owned:
+                continue
+            try:
+                async with self._client.pipeline(transaction=False) as pipe:
+                    for connection_id in list(self._owned):
+                        pipe.set(self._owner_key(connection_id), self.node_id, px=self._owner_ttl_ms)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"Failed to refresh connection ownership of node {self.node_id}: {e}")
+
+    async def _listen(self, dispatcher: MessageDispatcher) -> None:
+        async for raw in self._pubsub.listen():
+            if raw.get("type") != "message":
+                continue
+            try:
+                message = loads_json(raw["data"])
+            except ValueError:
+                logger.error(f"Ignoring malformed routing message on node {self.node_id}")
+                continue
+            dispatcher.dispatch(message)
+
+
+def create_routing_backend_from_env() -> Optional[RoutingBackend]:
+    """Create the backend selected by AIOS_TOOL_ROUTING ('memory' or 'redis'), if any."""
+    kind = os.getenv("AIOS_TOOL_ROUTING", "").lower()
+    if not kind or kind == "local":
+        return None
+    if kind == "memory":
+        return InMemoryRoutingBackend()
+    if kind == "redis":
+        return RedisRoutingBackend(url=os.getenv("AIOS_REDIS_URL"))
+    raise ValueError(f"Unknown AIOS_TOOL_ROUTING backend '{kind}'. Use 'local', 'memory' or 'redis'.")
@@ -0,0 +1,191 @@
+"""Outbound message queue of one tool WebSocket connection.
+
+Every message to a client goes through the connection's SendQueue and is written by
+a single writer task, so concurrent runs sharing a connection never interleave
+writes on the socket. The queue is bounded; what happens when it is full depends on
+the overflow policy:
+
+- 'block' (default): senders wait for room, which pushes back on the graph tasks.
+- 'reject': the new message fails with SendQueueFullError.
+- 'drop_oldest': the oldest queued message fails with SendQueueFullError and the new
+  one is queued.
+
+When the client negotiated batching (`batch=1` on the WebSocket URL), messages
+queued while a write is in progress are sent together as one
+`{"type": "batch", "messages": [...]}` frame.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from react_agent.web.protocol import WireProtocol, send_message
+
+logger = logging.getLogger('websocket_send_queue')
+
+OVERFLOW_POLICIES = ("block", "reject", "drop_oldest")
+
+# Maximum messages queued per connection
+SEND_QUEUE_DEPTH = int(os.getenv("AIOS_SEND_QUEUE_DEPTH", "256"))
+# What to do when a connection's queue is full, one of OVERFLOW_POLICIES
+SEND_QUEUE_OVERFLOW = os.getenv("AIOS_SEND_QUEUE_OVERFLOW", "block")
+# Maximum messages combined into one batch frame
+SEND_BATCH_MAX_MESSAGES = 32
+# Weight of the latest sample in the moving average of send latency
+_LATENCY_SMOOTHING = 0.1
+
+
+class SendQueueFullError(Exception):
+    """Raised when a message is rejected or dropped because the send queue is full."""
+    pass
+
+
+class SendQueueClosedError(Exception):
+    """Raised when sending on a queue whose connection has been closed."""
+    pass
+
+
+_QueuedMessage = Tuple[Any, asyncio.Future, float]
+
+
+class SendQueue:
+    """Bounded outbound queue with a single writer task for one socket."""
+
+    def __init__(
+        self,
+        socket: Any,
+        protocol: Optional[WireProtocol] = None,
+        max_depth: int = SEND_QUEUE_DEPTH,
+        overflow: str = SEND_QUEUE_OVERFLOW,
+        batch_max_messages: int = SEND_BATCH_MAX_MESSAGES,
+    ):
+        """Create the queue for `socket`; the writer task starts with the first message."""
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown send queue overflow policy '{overflow}', expected one of {OVERFLOW_POLICIES}")
+        self.socket = socket
+        self.protocol = protocol or WireProtocol()
+        self.max_depth = max(1, max_depth)
+        self.overflow = overflow
+        self.batch_max_messages = max(1, batch_max_messages)
+        self._queue: Deque[_QueuedMessage] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._writer: Optional[asyncio.Task[None]] = None
+        self._closed: Optional[BaseException] = None
+        # Metrics
+        self.max_depth_seen = 0
+        self.messages_sent = 0
+        self.frames_sent = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.avg_latency = 0.0
+        self.max_latency = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting to be written."""
+        return len(self._queue)
+
+    async def send(self, message: Any) -> None:
+        """Queue a message and wait until it has been written to the socket.
+
+        Raises the socket's error if the write fails, SendQueueFullError if the
+        message was rejected or dropped, and the close reason (SendQueueClosedError
+        by default) after `close`.
+        """
+        while len(self._queue) >= self.max_depth and self._closed is None:
+            if self.overflow == "reject":
+                self.rejected += 1
+                raise SendQueueFullError(f"Send queue is full ({self.max_depth} messages)")
+            if self.overflow == "drop_oldest":
+                _, dropped, _ = self._queue.popleft()
+                self.dropped += 1
+                if not dropped.done():
+                    dropped.set_exception(SendQueueFullError("Message dropped from a full send queue"))
+                break
+            self._not_full.clear()
+            await self._not_full.wait()
+        if self._closed is not None:
+            raise self._closed
+
+        delivered = asyncio.get_running_loop().create_future()
+        self._queue.append((message, delivered, time.monotonic()))
+        self.max_depth_seen = max(self.max_depth_seen, len(self._queue))
+        self._not_empty.set()
+        if self._writer is None:
+            self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+        await delivered
+
+    def close(self, reason: Optional[BaseException] = None) -> None:
+        """Stop the writer and fail every queued message."""
+        if self._closed is not None:
+            return
+        self._closed = reason or SendQueueClosedError("Send queue is closed")
+        if self._writer is not None:
+            self._writer.cancel()
+        self._fail_queued(self._closed)
+        # Wake senders blocked on a full queue so they see the queue is closed
+        self._not_full.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue gauges and send latency (seconds from queueing to written)."""
+        return {
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "max_depth_seen": self.max_depth_seen,
+            "messages_sent": self.messages_sent,
+            "frames_sent": self.frames_sent,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "avg_latency": self.avg_latency,
+            "max_latency": self.max_latency,
+        }
+
+    async def _write_loop(self) -> None:
+        while True:
+            await self._not_empty.wait()
+            batch_size = self.batch_max_messages if self.protocol.batching else 1
+            batch = [self._queue.popleft() for _ in range(min(batch_size, len(self._queue)))]
+            if not self._queue:
+                self._not_empty.clear()
+            self._not_full.set()
+            # Drop messages whose senders stopped waiting (e.g. cancelled on timeout)
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            if len(batch) == 1:
+                frame = batch[0][0]
+            else:
+                frame = {"type": "batch", "messages": [message for message, _, _ in batch]}
+            try:
+                await send_message(self.socket, self.protocol, frame)
+            except asyncio.CancelledError:
+                self._fail_queued(self._closed or SendQueueClosedError("Send queue is closed"), batch)
+                raise
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} queued message(s): {e}")
+                for _, delivered, _ in batch:
+                    if not delivered.done():
+                        delivered.set_exception(e)
+                continue
+
+            now = time.monotonic()
+            self.frames_sent += 1
+            for _, delivered, queued_at in batch:
+                latency = now - queued_at
+                self.avg_latency += _LATENCY_SMOOTHING * (latency - self.avg_latency)
+                self.max_latency = max(self.max_latency, latency)
+                self.messages_sent += 1
+                if not delivered.done():
+                    delivered.set_result(None)
+
+    def _fail_queued(self, error: BaseException, batch: Any = ()) -> None:
+        for _, delivered, _ in (*batch, *self._queue):
+            if not delivered.done():
+                delivered.set_exception(error)
+        self._queue.clear()
@@ -3,23 +3,62 @@ from uuid import uuid4
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends
 from typing import Dict, Any
 import logging
-import json
 import asyncio
-from contextlib import suppress
+from contextlib import asynccontextmanager, suppress
 from starlette.websockets import WebSocketState
 
 # Use the new dependency getter and custom exception
 from react_agent.web.connection import ConnectionManager, get_connection_manager, ConnectionNotFoundError
 from react_agent.web.stt.router import stt_router
+from react_agent.web.stt.providers.deepgram import get_deepgram_session_pool
+from react_agent.web.stt.providers.local import get_local_engine_pool, shutdown_local_engine_pool
+from react_agent.web.stt.config import stt_settings
+from react_agent.model_registry import get_model_registry
+from react_agent.log_utils import clip_for_log
+from react_agent.tool_cache import get_tool_result_cache
+from react_agent.executors import get_speculative_dispatcher
+from react_agent.web.routing import create_routing_backend_from_env
+from react_agent.web.result_stream import STREAM_FRAME_TYPES
+from react_agent.web.protocol import ProtocolError, decode_frame, negotiate, peek_tool_call_id, receive_frame, supported_options
 
 # Get the logger
 logger = logging.getLogger(__name__)
 
+# Text frames at least this large are checked for a pending tool call before being parsed
+LAZY_DECODE_THRESHOLD = 64 * 1024
+
 # Basic logging configuration (configure level and format as needed)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage process-wide resources for the lifetime of the server."""
+    # Route tool calls between workers when AIOS_TOOL_ROUTING is set
+    routing = create_routing_backend_from_env()
+    if routing is not None:
+        await get_connection_manager().start_routing(routing)
+    # Keep pre-opened STT sessions ready when DEEPGRAM_POOL_SIZE is set
+    stt_pool = get_deepgram_session_pool()
+    if stt_pool is not None:
+        await stt_pool.start()
+    # Start the local engine workers up front when it is the default STT provider
+    if stt_settings.stt_provider == "local":
+        try:
+            get_local_engine_pool().start()
+        except RuntimeError as e:
+            logger.warning(f"Local STT engine unavailable: {e}")
+    yield
+    if stt_pool is not None:
+        await stt_pool.stop()
+    shutdown_local_engine_pool()
+    await get_connection_manager().stop_routing()
+    # Close pooled chat model clients on shutdown
+    await get_model_registry().aclose()
+
+
 # Create FastAPI app
-app = FastAPI(title="AIOS Agent Server with Tool and STT WebSocket")
+app = FastAPI(title="AIOS Agent Server with Tool and STT WebSocket", lifespan=lifespan)
 
 
 @app.get("/")
@@ -39,12 +78,18 @@ async def websocket_tool_endpoint(
         await websocket.accept()
         logger.info("Tool WebSocket connection accepted")
 
+        # Pick the wire protocol from the options requested in the query string
+        protocol = negotiate(websocket.query_params)
+
         # Store connection (with empty tools) and immediately send back the connection ID
-        connection_id = await manager.connect(websocket, tools={}) # Pass empty tools
+        connection_id = await manager.connect(websocket, tools={}, protocol=protocol) # Pass empty tools
         try:
+            # Always plain JSON, so clients can read it before switching protocols
             await websocket.send_json({
                 "type": "connection_established",
-                "connection_id": connection_id
+                "connection_id": connection_id,
+                "protocol": protocol.describe(),
+                "supported_protocols": supported_options()
             })
             logger.info(f"Tool connection established for {connection_id}")
         except WebSocketDisconnect:
@@ -60,13 +105,19 @@ async def websocket_tool_endpoint(
         try:
             while True:
                 try:
-                    message_raw = await websocket.receive_text()
-                    message = json.loads(message_raw)
-                    logger.info(f"Received raw tool message content from {connection_id}: {message}")
-                    # logger.info(f"Initial type of received message object for {connection_id}: {type(message)}")
-
-                except json.JSONDecodeError:
-                    logger.error(f"Initial JSON parse failed for tool WS {connection_id}. Raw data: '{message_raw[:100]}...'. Ignoring message.")
+                    frame = await receive_frame(websocket)
+                    if len(frame) >= LAZY_DECODE_THRESHOLD:
+                        # Skip parsing large responses nobody is waiting for (e.g. after a timeout)
+                        peeked_id = peek_tool_call_id(frame)
+                        if peeked_id is not None and not manager.expects(peeked_id, connection_id):
+                            logger.warning("Dropping %d-byte frame for unknown tool call %s from %s", len(frame), peeked_id, connection_id)
+                            continue
+                    message = decode_frame(protocol, frame)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Received tool message from %s: %s", connection_id, clip_for_log(message))
+
+                except ProtocolError as e:
+                    logger.error(f"Failed to decode message on tool WS {connection_id}: {e}. Ignoring message.")
                     continue
                 except WebSocketDisconnect:
                     logger.info(f"Tool WebSocket disconnected normally for {connection_id} during receive loop.")
@@ -77,11 +128,20 @@ async def websocket_tool_endpoint(
                     logger.error(f"Received tool message is not a dictionary after parsing for {connection_id}: {type(message)}. Ignoring.")
                     continue
 
-                if "tool_call_id" in message:
+                if message.get("type") in STREAM_FRAME_TYPES:
+                    await manager.handle_stream_frame(message, connection_id=connection_id)
+                elif message.get("type") == "tool_cache_invalidate":
+                    # Narrowed to one tool, or one call when "args" is given
+                    if "args" in message:
+                        get_tool_result_cache().invalidate(connection_id, message.get("tool"), message["args"])
+                    else:
+                        get_tool_result_cache().invalidate(connection_id, message.get("tool"))
+                elif "tool_call_id" in message:
                     logger.info(f"Processing response for tool call {message['tool_call_id']} from {connection_id}")
                     manager.handle_response(
                         message["tool_call_id"],
-                        message.get("response")
+                        message.get("response"),
+                        connection_id=connection_id
                     )
                 else:
                     logger.warning(f"Received message from tool WS {connection_id} without tool_call_id. Type: {message.get('type', 'N/A')}. Ignoring.")
@@ -104,6 +164,8 @@ async def websocket_tool_endpoint(
         if connection_id:
             logger.info(f"Cleaning up tool connection: {connection_id}")
             manager.disconnect(connection_id)
+            get_tool_result_cache().invalidate(connection_id)
+            get_speculative_dispatcher().drop_connection(connection_id)
         else:
              logger.info("Cleaning up tool connection attempt that failed before ID assignment.")
 
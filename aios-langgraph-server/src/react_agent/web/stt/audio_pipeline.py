@@ -0,0 +1,192 @@
+"""Ingest pipeline between the STT client socket and the upstream STT service.
+
+Incoming audio frames are coalesced into larger chunks (at least `target_bytes`, or
+whatever has arrived after `max_delay_seconds`) and sent upstream by a dedicated
+sender task, so the client receive loop never waits on the upstream connection.
+Buffered audio is bounded by `max_buffered_bytes`; when the upstream falls behind,
+the 'block' policy makes `push` wait for room (backpressure on the client socket)
+and 'drop_oldest' discards the oldest buffered audio instead.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop_oldest")
+
+# Weight of the latest sample in the moving average of upstream send latency
+_LATENCY_SMOOTHING = 0.1
+
+
+def bytes_for_duration(duration_ms: int, sample_rate: int, channels: int = 1, sample_width: int = 2) -> int:
+    """Return the size of `duration_ms` of raw PCM audio (linear16 by default)."""
+    return duration_ms * sample_rate * channels * sample_width // 1000
+
+
+class AudioIngestPipeline:
+    """Coalescing, bounded buffer of audio frames with a single upstream sender."""
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[Any]],
+        target_bytes: int = 4096,
+        max_delay_seconds: float = 0.1,
+        max_buffered_bytes: int = 1024 * 1024,
+        overflow: str = "block",
+    ):
+        """Create the pipeline; the sender task starts with the first frame."""
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audio overflow policy '{overflow}', expected one of {OVERFLOW_POLICIES}")
+        self._send = send
+        self.target_bytes = max(1, target_bytes)
+        self.max_delay_seconds = max_delay_seconds
+        self.max_buffered_bytes = max(self.target_bytes, max_buffered_bytes)
+        self.overflow = overflow
+        # Ring of received frames, oldest first
+        self._frames: Deque[bytes] = deque()
+        self._buffered = 0
+        self._first_buffered_at: Optional[float] = None
+        self._data_ready = asyncio.Event()
+        self._space_ready = asyncio.Event()
+        self._space_ready.set()
+        self._closing = False
+        self._error: Optional[BaseException] = None
+        self._sender: Optional[asyncio.Task[None]] = None
+        # Metrics
+        self.frames_received = 0
+        self.chunks_sent = 0
+        self.bytes_sent = 0
+        self.dropped_bytes = 0
+        self.max_buffered_seen = 0
+        self.avg_send_latency = 0.0
+        self.max_send_latency = 0.0
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Bytes received but not yet sent upstream."""
+        return self._buffered
+
+    async def push(self, frame: bytes) -> None:
+        """Buffer a frame for sending.
+
+        Raises the upstream error if a previous send failed, and RuntimeError after
+        the pipeline was closed.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._closing:
+            raise RuntimeError("Audio pipeline is closed")
+        if not frame:
+            return
+        if self.overflow == "drop_oldest":
+            while self._frames and self._buffered + len(frame) > self.max_buffered_bytes:
+                self._drop_oldest()
+        else:
+            while self._buffered and self._buffered + len(frame) > self.max_buffered_bytes:
+                self._space_ready.clear()
+                await self._space_ready.wait()
+                if self._error is not None:
+                    raise self._error
+
+        self._frames.append(frame)
+        self._buffered += len(frame)
+        self.frames_received += 1
+        self.max_buffered_seen = max(self.max_buffered_seen, self._buffered)
+        if self._first_buffered_at is None:
+            self._first_buffered_at = time.monotonic()
+        self._data_ready.set()
+        if self._sender is None:
+            self._sender = asyncio.get_running_loop().create_task(self._send_loop())
+
+    async def close(self, timeout: float = 2.0) -> None:
+        """Send what is still buffered (waiting at most `timeout`) and stop the sender."""
+        self._closing = True
+        self._data_ready.set()
+        if self._sender is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._sender), timeout)
+        except TimeoutError:
+            logger.warning(f"Dropping {self._buffered} bytes of audio not sent upstream before close")
+            self._sender.cancel()
+        except Exception:
+            pass  # Already recorded as self._error
+
+    def stats(self) -> Dict[str, Any]:
+        """Return buffer fill and upstream send metrics."""
+        return {
+            "buffered_bytes": self._buffered,
+            "max_buffered_bytes": self.max_buffered_bytes,
+            "fill": self._buffered / self.max_buffered_bytes,
+            "max_buffered_seen": self.max_buffered_seen,
+            "frames_received": self.frames_received,
+            "chunks_sent": self.chunks_sent,
+            "bytes_sent": self.bytes_sent,
+            "dropped_bytes": self.dropped_bytes,
+            "avg_send_latency": self.avg_send_latency,
+            "max_send_latency": self.max_send_latency,
+        }
+
+    def _drop_oldest(self) -> None:
+        dropped = self._frames.popleft()
+        self._buffered -= len(dropped)
+        self.dropped_bytes += len(dropped)
+
+    def _take_chunk(self) -> bytes:
+        """Remove and join up to target_bytes worth of buffered frames (at least one)."""
+        parts = [self._frames.popleft()]
+        size = len(parts[0])
+        while self._frames and size + len(self._frames[0]) <= self.target_bytes:
+            frame = self._frames.popleft()
+            parts.append(frame)
+            size += len(frame)
+        self._buffered -= size
+        if self._frames:
+            self._first_buffered_at = time.monotonic()
+            self._data_ready.set()
+        else:
+            self._first_buffered_at = None
+            if not self._closing:
+                self._data_ready.clear()
+        self._space_ready.set()
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                await self._data_ready.wait()
+                if not self._frames:
+                    if self._closing:
+                        return
+                    self._data_ready.clear()
+                    continue
+                # Wait for a full chunk unless the oldest audio has waited long enough
+                if self._buffered < self.target_bytes and not self._closing:
+                    remaining = self.max_delay_seconds - (time.monotonic() - self._first_buffered_at)
+                    if remaining > 0:
+                        self._data_ready.clear()
+                        try:
+                            await asyncio.wait_for(self._data_ready.wait(), remaining)
+                            continue
+                        except TimeoutError:
+                            pass
+
+                chunk = self._take_chunk()
+                started = time.monotonic()
+                await self._send(chunk)
+                latency = time.monotonic() - started
+                self.avg_send_latency += _LATENCY_SMOOTHING * (latency - self.avg_send_latency)
+                self.max_send_latency = max(self.max_send_latency, latency)
+                self.chunks_sent += 1
+                self.bytes_sent += len(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to send audio upstream: {e}")
+            self._error = e
+            # Release a blocked push so it sees the error
+            self._space_ready.set()
@@ -9,9 +9,27 @@ class STTSettings(BaseSettings):
     """Configuration settings for the STT service, loaded from environment variables."""
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
 
+    stt_provider: str = "deepgram" # Default provider, 'deepgram' or 'local' (STT_PROVIDER); clients may pick another in their config message
+    stt_local_engine: str = "vosk" # Engine of the local provider, 'vosk' or 'module:callable' (STT_LOCAL_ENGINE)
+    stt_local_model_path: str = "" # Model directory of the local engine (STT_LOCAL_MODEL_PATH)
+    stt_local_workers: int = 2 # Worker processes of the local engine (STT_LOCAL_WORKERS)
     deepgram_api_key: str = "" # Loaded from DEEPGRAM_API_KEY env var
     deepgram_model: str = "nova-3" # Loaded from DEEPGRAM_MODEL env var, defaults to nova-2
     deepgram_language: str = "multi" # Loaded from DEEPGRAM_LANGUAGE env var, defaults to en-US
+    deepgram_pool_size: int = 0 # Pre-opened live sessions kept ready (DEEPGRAM_POOL_SIZE), 0 disables the pool
+    deepgram_pool_max_idle_seconds: float = 60.0 # Pooled sessions unused this long are recycled (DEEPGRAM_POOL_MAX_IDLE_SECONDS)
+    deepgram_pool_preprocessed: bool = False # Open pooled sessions for preprocessed 16 kHz linear16 audio instead of the defaults (DEEPGRAM_POOL_PREPROCESSED)
+    stt_config_wait_ms: int = 50 # How long to wait for the optional config message before connecting with defaults; a later config sent before any audio reconnects (STT_CONFIG_WAIT_MS)
+    stt_coalesce_bytes: int = 4096 # Audio frames are combined into chunks of about this size (STT_COALESCE_BYTES)
+    stt_coalesce_ms: int = 100 # Longest audio is held back for coalescing; also the chunk duration for linear16 (STT_COALESCE_MS)
+    stt_audio_buffer_bytes: int = 1024 * 1024 # Audio buffered while the upstream is slow (STT_AUDIO_BUFFER_BYTES)
+    stt_audio_overflow: str = "block" # 'block' (backpressure) or 'drop_oldest' when the buffer is full (STT_AUDIO_OVERFLOW)
+    stt_vad_enabled: bool = False # Gate silent audio before it is sent upstream (STT_VAD_ENABLED); needs negotiated PCM audio
+    stt_vad_threshold_db: float = -45.0 # Minimum level counted as speech (STT_VAD_THRESHOLD_DB)
+    stt_vad_hangover_ms: int = 1200 # Audio kept after speech stops; keep above utterance_end_ms (STT_VAD_HANGOVER_MS)
+    stt_vad_preroll_ms: int = 300 # Audio sent ahead of each speech onset (STT_VAD_PREROLL_MS)
+    stt_vad_silence: str = "drop" # 'drop' or 'thin' (send every 10th frame) for silence (STT_VAD_SILENCE)
+    stt_vad_keepalive_seconds: float = 5.0 # KeepAlive interval while audio is gated (STT_VAD_KEEPALIVE_SECONDS)
 
 # Create a single instance to be imported elsewhere
 stt_settings = STTSettings()
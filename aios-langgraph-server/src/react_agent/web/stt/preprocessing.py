@@ -0,0 +1,250 @@
+"""Audio preprocessing between the STT client and the upstream STT service.
+
+A client may describe its audio in the first text message on /stt/stt-stream::
+
+    {"type": "config", "encoding": "linear16", "sample_rate": 48000, "channels": 2}
+
+Raw PCM ('linear16', 'float32') and raw Opus packets ('opus', one packet per
+WebSocket frame) are then converted to 16 kHz mono linear16 before being sent
+upstream, which is all speech recognition needs and a fraction of the bandwidth.
+Clients that send no config (or a container format such as webm) get their audio
+forwarded unchanged, as before.
+
+Conversion uses NumPy; Opus decoding needs opuslib. Without them the stage falls
+back to forwarding audio as received. Preprocessors for other encodings can be added
+with `register_preprocessor`.
+
+To measure the stage offline on a recording::
+
+    python -m react_agent.web.stt.preprocessing recording.wav
+"""
+
+import json
+import logging
+import sys
+import time
+import wave
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+try:
+    import opuslib
+except ImportError:  # Optional dependency
+    opuslib = None
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+# LiveOptions overrides for audio produced by the conversion preprocessors
+PREPROCESSED_LIVE_OPTIONS: Dict[str, Any] = {"encoding": "linear16", "sample_rate": TARGET_SAMPLE_RATE, "channels": 1}
+# Taps of the anti-aliasing filter applied before downsampling
+_FILTER_TAPS = 31
+# Largest Opus frame (120 ms) at 48 kHz, the decoder's output buffer size
+_OPUS_MAX_FRAME_SAMPLES = 5760
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """Encoding, sample rate and channel count of an audio stream."""
+
+    encoding: str
+    sample_rate: int = TARGET_SAMPLE_RATE
+    channels: int = 1
+
+
+class AudioPreprocessor:
+    """Converts client audio frames to what is sent upstream.
+
+    The base class forwards audio unchanged and leaves the upstream to detect the
+    format.
+    """
+
+    # LiveOptions overrides describing the output; empty means provider defaults
+    live_options: Dict[str, Any] = {}
+
+    def process(self, frame: bytes) -> bytes:
+        """Convert one frame; may return b"" while input is being buffered."""
+        return frame
+
+    def flush(self) -> bytes:
+        """Return any output still held back at the end of the stream."""
+        return b""
+
+
+class PcmPreprocessor(AudioPreprocessor):
+    """Converts interleaved PCM to mono linear16 at `target_rate`.
+
+    Channels are averaged, and downsampling applies a windowed-sinc low-pass filter
+    followed by linear interpolation. Filter and interpolation state carry over
+    between frames, so frame boundaries do not produce clicks.
+    """
+
+    live_options = PREPROCESSED_LIVE_OPTIONS
+
+    def __init__(self, input_format: AudioFormat, target_rate: int = TARGET_SAMPLE_RATE):
+        """Create a converter for `input_format` audio; raises RuntimeError without numpy."""
+        if np is None:
+            raise RuntimeError("PCM preprocessing requires numpy")
+        if input_format.encoding not in ("linear16", "float32"):
+            raise ValueError(f"Unsupported PCM encoding '{input_format.encoding}'")
+        self.input_format = input_format
+        self.target_rate = target_rate
+        self._dtype = np.dtype("<i2") if input_format.encoding == "linear16" else np.dtype("<f4")
+        self._step = input_format.sample_rate / target_rate
+        self._partial = b""  # Bytes of an incomplete sample frame
+        self._filter = _lowpass_filter(target_rate / input_format.sample_rate) if self._step > 1 else None
+        self._history = np.zeros(_FILTER_TAPS - 1, dtype=np.float32) if self._filter is not None else None
+        self._last: Optional[float] = None  # Last input sample of the previous frame
+        self._phase = 0.0  # Position of the next output sample, relative to _last
+
+    def process(self, frame: bytes) -> bytes:
+        """Convert a frame of interleaved PCM, holding back any incomplete sample."""
+        data = self._partial + frame
+        frame_size = self._dtype.itemsize * self.input_format.channels
+        usable = len(data) - len(data) % frame_size
+        self._partial = data[usable:]
+        if not usable:
+            return b""
+
+        samples = np.frombuffer(data[:usable], dtype=self._dtype).astype(np.float32)
+        if self._dtype.kind == "i":
+            samples /= 32768.0
+        if self.input_format.channels > 1:
+            samples = samples.reshape(-1, self.input_format.channels).mean(axis=1)
+        if self._filter is not None:
+            padded = np.concatenate((self._history, samples))
+            self._history = padded[-(_FILTER_TAPS - 1):]
+            samples = np.convolve(padded, self._filter, mode="valid").astype(np.float32)
+        if self._step != 1:
+            samples = self._resample(samples)
+        return _to_linear16(samples)
+
+    def _resample(self, samples: "np.ndarray") -> "np.ndarray":
+        x = samples if self._last is None else np.concatenate(([self._last], samples))
+        self._last = float(x[-1])
+        last_index = len(x) - 1
+        if self._phase > last_index:
+            self._phase -= last_index
+            return np.zeros(0, dtype=np.float32)
+        count = int((last_index - self._phase) // self._step) + 1
+        positions = self._phase + np.arange(count) * self._step
+        # The last sample of this frame is index 0 of the next one
+        self._phase = self._phase + count * self._step - last_index
+        return np.interp(positions, np.arange(len(x)), x).astype(np.float32)
+
+
+class OpusPreprocessor(AudioPreprocessor):
+    """Decodes raw Opus packets (one per frame) and converts them like PcmPreprocessor."""
+
+    live_options = PREPROCESSED_LIVE_OPTIONS
+
+    def __init__(self, input_format: AudioFormat, target_rate: int = TARGET_SAMPLE_RATE):
+        """Create a decoder for `input_format` Opus audio; raises RuntimeError without opuslib."""
+        if opuslib is None:
+            raise RuntimeError("Opus preprocessing requires opuslib")
+        # Opus always decodes at 48 kHz internally
+        self._decoder = opuslib.Decoder(48000, input_format.channels)
+        self._pcm = PcmPreprocessor(AudioFormat("linear16", 48000, input_format.channels), target_rate)
+
+    def process(self, frame: bytes) -> bytes:
+        """Decode one Opus packet and convert it like PcmPreprocessor."""
+        return self._pcm.process(self._decoder.decode(frame, _OPUS_MAX_FRAME_SAMPLES))
+
+
+PreprocessorFactory = Callable[[AudioFormat], AudioPreprocessor]
+
+_PREPROCESSORS: Dict[str, PreprocessorFactory] = {
+    "linear16": PcmPreprocessor,
+    "float32": PcmPreprocessor,
+    "opus": OpusPreprocessor,
+}
+
+
+def register_preprocessor(encoding: str, factory: PreprocessorFactory) -> None:
+    """Use `factory` for clients declaring `encoding` in their config message."""
+    _PREPROCESSORS[encoding] = factory
+
+
+def negotiate_preprocessor(config: Optional[Dict[str, Any]]) -> AudioPreprocessor:
+    """Pick the preprocessor for a client's config message (None for no config)."""
+    if not config or "encoding" not in config:
+        return AudioPreprocessor()
+    try:
+        input_format = AudioFormat(
+            encoding=str(config["encoding"]),
+            sample_rate=int(config.get("sample_rate", 48000 if config["encoding"] == "opus" else TARGET_SAMPLE_RATE)),
+            channels=int(config.get("channels", 1)),
+        )
+        if input_format.sample_rate <= 0 or input_format.channels <= 0:
+            raise ValueError("sample_rate and channels must be positive")
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Ignoring invalid STT audio config {config}: {e}")
+        return AudioPreprocessor()
+    factory = _PREPROCESSORS.get(input_format.encoding)
+    if factory is None:
+        logger.info(f"No preprocessor for STT encoding '{input_format.encoding}', forwarding audio unchanged")
+        return AudioPreprocessor()
+    try:
+        return factory(input_format)
+    except RuntimeError as e:
+        logger.warning(f"STT preprocessing unavailable ({e}), forwarding audio unchanged")
+        if input_format.encoding in ("linear16", "opus"):
+            # Deepgram can still take these raw if told what they are
+            passthrough = AudioPreprocessor()
+            passthrough.live_options = {
+                "encoding": input_format.encoding, "sample_rate": input_format.sample_rate, "channels": input_format.channels,
+            }
+            return passthrough
+        return AudioPreprocessor()
+
+
+def _lowpass_filter(cutoff: float) -> "np.ndarray":
+    """Return a Hamming-windowed sinc low-pass filter; `cutoff` is the output/input sample rate ratio."""
+    n = np.arange(_FILTER_TAPS) - (_FILTER_TAPS - 1) / 2
+    taps = cutoff * np.sinc(cutoff * n) * np.hamming(_FILTER_TAPS)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def _to_linear16(samples: "np.ndarray") -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+
+
+# --- Offline benchmark ---
+
+def benchmark_wav(path: str, frame_ms: int = 20) -> Dict[str, Any]:
+    """Run a 16-bit PCM WAV file through the preprocessing stage in client-sized frames."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM WAV files are supported")
+        input_format = AudioFormat("linear16", wav.getframerate(), wav.getnchannels())
+        audio = wav.readframes(wav.getnframes())
+    preprocessor = negotiate_preprocessor(
+        {"encoding": "linear16", "sample_rate": input_format.sample_rate, "channels": input_format.channels}
+    )
+    frame_bytes = input_format.sample_rate * input_format.channels * 2 * frame_ms // 1000
+    output_bytes = 0
+    started = time.perf_counter()
+    for offset in range(0, len(audio), frame_bytes):
+        output_bytes += len(preprocessor.process(audio[offset:offset + frame_bytes]))
+    output_bytes += len(preprocessor.flush())
+    elapsed = time.perf_counter() - started
+    duration = len(audio) / (input_format.sample_rate * input_format.channels * 2)
+    return {
+        "input_format": input_format.__dict__,
+        "audio_seconds": duration,
+        "input_bytes": len(audio),
+        "output_bytes": output_bytes,
+        "bandwidth_ratio": output_bytes / len(audio) if audio else 0.0,
+        "processing_seconds": elapsed,
+        "realtime_factor": elapsed / duration if duration else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    for wav_path in sys.argv[1:]:
+        print(json.dumps({"file": wav_path, **benchmark_wav(wav_path)}, indent=2))  # noqa: T201
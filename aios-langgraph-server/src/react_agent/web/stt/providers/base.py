@@ -51,6 +51,10 @@ class STTServiceProvider(Protocol):
         """
         ...
 
+    async def keep_alive(self) -> None:
+        """Keep the session open while no audio is sent, e.g. during silence dropped by the voice-activity gate."""
+        ...
+
     async def finish(self) -> None:
         """
         Signals the end of the audio stream and gracefully disconnects
@@ -1,5 +1,6 @@
 import logging
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Optional
 
 from deepgram import (
     DeepgramClient, DeepgramClientOptions, LiveTranscriptionEvents, LiveOptions,
@@ -9,10 +10,138 @@ from deepgram import (
 from deepgram.clients.live.v1.client import AsyncLiveClient
 
 from .base import STTServiceProvider, SendToClientCallback
-from ..config import STTSettings
+from ..config import STTSettings, stt_settings
+from ..audio_pipeline import AudioIngestPipeline, bytes_for_duration
+from ..preprocessing import PREPROCESSED_LIVE_OPTIONS
+from ..session_pool import SessionPool
 
 logger = logging.getLogger(__name__)
 
+# Shared Deepgram clients, by API key
+_deepgram_clients: Dict[str, DeepgramClient] = {}
+
+
+def get_deepgram_client(api_key: str) -> DeepgramClient:
+    """Return the process-wide DeepgramClient for an API key.
+
+    Keepalive is enabled so live sessions stay open while no audio is flowing,
+    which pooled sessions rely on.
+    """
+    client = _deepgram_clients.get(api_key)
+    if client is None:
+        dg_config = DeepgramClientOptions(verbose=logging.WARNING, options={"keepalive": "true"})
+        client = _deepgram_clients[api_key] = DeepgramClient(api_key, dg_config)
+        logger.info("Deepgram client initialized.")
+    return client
+
+
+def build_live_options(config: STTSettings, options: Dict[str, Any]) -> LiveOptions:
+    """Build LiveOptions from the configured defaults, overridden by `options`."""
+    live_options = LiveOptions(
+        model=options.get("model", config.deepgram_model),
+        language=options.get("language", config.deepgram_language),
+        # Common options for streaming:
+        interim_results=True, utterance_end_ms="1000", vad_events=True,
+        endpointing=300, smart_format=True,
+    )
+    # Allow overriding any LiveOption directly if provided in options dict
+    # Note: This could override our encoding/sample_rate if client sends them
+    for key, value in options.items():
+        if hasattr(live_options, key):
+            logger.info(f"Overriding LiveOption '{key}' with value: {value}")
+            setattr(live_options, key, value)
+    return live_options
+
+
+# Provider handlers that live connection events are dispatched to
+_EVENT_HANDLERS = {
+    LiveTranscriptionEvents.Open: "_on_open",
+    LiveTranscriptionEvents.Transcript: "_on_message",
+    LiveTranscriptionEvents.Metadata: "_on_metadata",
+    LiveTranscriptionEvents.SpeechStarted: "_on_speech_started",
+    LiveTranscriptionEvents.UtteranceEnd: "_on_utterance_end",
+    LiveTranscriptionEvents.Error: "_on_error",
+    LiveTranscriptionEvents.Close: "_on_close",
+    LiveTranscriptionEvents.Unhandled: "_on_unhandled",
+}
+
+
+class DeepgramLiveSession:
+    """A started Deepgram live connection, possibly opened before its user connected.
+
+    Events are forwarded to the provider the session is bound to; events arriving
+    while it is unbound (e.g. waiting in the pool) are only logged.
+    """
+
+    def __init__(self, connection: AsyncLiveClient):
+        """Wrap a started connection and route its events through this session."""
+        self.connection = connection
+        self.provider: Optional[DeepgramServiceProvider] = None
+        self.closed = False
+        for event, handler_name in _EVENT_HANDLERS.items():
+            connection.on(event, self._dispatcher(event, handler_name))
+
+    def bind(self, provider: "DeepgramServiceProvider") -> None:
+        """Forward the session's events to `provider` from now on."""
+        self.provider = provider
+
+    def _dispatcher(self, event: LiveTranscriptionEvents, handler_name: str):
+        async def _dispatch(client_instance: AsyncLiveClient, *args, **kwargs):
+            if event in (LiveTranscriptionEvents.Close, LiveTranscriptionEvents.Error):
+                self.closed = True
+            if self.provider is not None:
+                await getattr(self.provider, handler_name)(client_instance, *args, **kwargs)
+            elif event != LiveTranscriptionEvents.Open:
+                logger.info(f"Deepgram event '{event}' on an unbound session: {kwargs}")
+        return _dispatch
+
+
+async def open_live_session(client: DeepgramClient, live_options: LiveOptions) -> DeepgramLiveSession:
+    """Open and start a Deepgram live connection.
+
+    Raises:
+        ConnectionError: If the connection cannot be started.
+    """
+    session = DeepgramLiveSession(client.listen.asynclive.v("1"))
+    logger.info(f"Starting Deepgram connection with LiveOptions: {live_options}")
+    if not await session.connection.start(live_options):
+        raise ConnectionError("Failed to connect to Deepgram STT service.")
+    return session
+
+
+async def close_live_session(session: DeepgramLiveSession) -> None:
+    """Finish a live session that was never handed to a client."""
+    session.closed = True
+    await session.connection.finish()
+
+
+def pool_live_overrides(config: STTSettings) -> Dict[str, Any]:
+    """Return the LiveOptions overrides pooled sessions are opened with."""
+    return dict(PREPROCESSED_LIVE_OPTIONS) if config.deepgram_pool_preprocessed else {}
+
+
+# --- Dependency Injection ---
+_session_pool_instance: Optional[SessionPool] = None
+
+def get_deepgram_session_pool(config: STTSettings = stt_settings) -> Optional[SessionPool]:
+    """Return the process-wide pool of pre-opened sessions, or None if pooling is off.
+
+    Pooled sessions are opened with `pool_live_overrides`, so they only serve
+    clients connecting with exactly those options. The pool must be started with `await pool.start()`.
+    """
+    global _session_pool_instance
+    if _session_pool_instance is None and config.deepgram_pool_size > 0 and config.deepgram_api_key:
+        client = get_deepgram_client(config.deepgram_api_key)
+        live_options = build_live_options(config, pool_live_overrides(config))
+        _session_pool_instance = SessionPool(
+            open_session=lambda: open_live_session(client, live_options),
+            close_session=close_live_session,
+            size=config.deepgram_pool_size,
+            max_idle_seconds=config.deepgram_pool_max_idle_seconds,
+            is_usable=lambda session: not session.closed,
+        )
+    return _session_pool_instance
+
 class DeepgramServiceProvider:
     """Implementation of STTServiceProvider using the Deepgram service.
 
@@ -30,13 +159,19 @@ class DeepgramServiceProvider:
         - `_on_close`: Sends `{"type": "status", "message": "STT engine disconnected"}`
     """
 
-    def __init__(self, config: STTSettings, send_to_client_callback: SendToClientCallback):
+    def __init__(
+        self,
+        config: STTSettings,
+        send_to_client_callback: SendToClientCallback,
+        session_pool: Optional[SessionPool] = None
+    ):
         """
         Initializes the Deepgram STT service provider.
 
         Args:
             config: The STTSettings instance containing API keys and defaults.
             send_to_client_callback: Async callback function to send messages to the client.
+            session_pool: Optional pool of pre-opened sessions used by `connect`.
         """
         logger.info("Initializing DeepgramServiceProvider")
         if not config.deepgram_api_key:
@@ -45,15 +180,16 @@ class DeepgramServiceProvider:
 
         self.config = config
         self.send_to_client_callback = send_to_client_callback
+        self.session_pool = session_pool
         self.dg_connection: AsyncLiveClient | None = None # Will hold the active Deepgram connection
         self._is_finals: List[str] = [] # Buffer for final utterances
+        self._connect_started_at: Optional[float] = None # For time-to-first-interim logging
+        self._pooled = False
+        self._options: Dict[str, Any] = {} # LiveOptions overrides of the current connection
+        self._audio_pipeline: Optional[AudioIngestPipeline] = None # Created with the first audio frame
 
-        # Configure Deepgram client
-        dg_config: DeepgramClientOptions = DeepgramClientOptions(
-            verbose=logging.DEBUG,
-        )
-        self.deepgram_client: DeepgramClient = DeepgramClient(config.deepgram_api_key, dg_config)
-        logger.info("Deepgram client initialized.")
+        # Deepgram clients are shared by all sessions of the process
+        self.deepgram_client: DeepgramClient = get_deepgram_client(config.deepgram_api_key)
 
     # --- Deepgram Event Handlers ---
     async def _on_open(self, client_instance: AsyncLiveClient, open_data: OpenResponse, **kwargs):
@@ -99,6 +235,10 @@ class DeepgramServiceProvider:
             else:
                 # Send interim results
                 # logger.debug(f"Deepgram interim: {sentence}") # Can be verbose
+                if self._connect_started_at is not None:
+                    elapsed_ms = (time.monotonic() - self._connect_started_at) * 1000
+                    logger.info(f"Deepgram first interim transcript {elapsed_ms:.0f} ms after connect (pooled session: {self._pooled})")
+                    self._connect_started_at = None
                 message_to_send = {"type": "interim_transcript", "transcript": sentence}
 
             # Send the message if one was prepared
@@ -195,6 +335,8 @@ class DeepgramServiceProvider:
             options: Dictionary containing Deepgram LiveOptions keys
                      (e.g., 'model', 'language', 'encoding', 'sample_rate', 'channels').
                      Defaults from config are merged with provided options.
+                     If the options match the pool's, a pre-opened session from the
+                     pool is used when one is available.
         Raises:
             ConnectionError: If the connection to Deepgram fails.
         """
@@ -202,43 +344,23 @@ class DeepgramServiceProvider:
             logger.warning("Connect called while already connected. Ignoring.")
             return
 
+        self._connect_started_at = time.monotonic()
+        self._options = options
+        if self.session_pool is not None and options == pool_live_overrides(self.config):
+            session = self.session_pool.acquire()
+            if session is not None:
+                session.bind(self)
+                self.dg_connection = session.connection
+                self._pooled = True
+                logger.info("Using a pre-opened Deepgram connection from the pool.")
+                return
+
         logger.info(f"Attempting to connect to Deepgram with options: {options}")
 
         try:
-            # --- Configure LiveOptions for Opus Encoding --- 
-            live_options = LiveOptions(
-                model=options.get("model", self.config.deepgram_model),
-                language=options.get("language", self.config.deepgram_language),
-                # Common options for streaming:
-                interim_results=True, utterance_end_ms="1000", vad_events=True,
-                endpointing=300, smart_format=True,
-            )
-            # -----------------------------------------------
-            # Allow overriding any LiveOption directly if provided in options dict
-            # Note: This could override our encoding/sample_rate if client sends them
-            for key, value in options.items():
-                if hasattr(live_options, key):
-                    logger.info(f"Overriding LiveOption '{key}' with value: {value}")
-                    setattr(live_options, key, value)
-
-            # Create the connection instance
-            self.dg_connection = self.deepgram_client.listen.asynclive.v("1")
-
-            # Register event handlers
-            self.dg_connection.on(LiveTranscriptionEvents.Open, self._on_open)
-            self.dg_connection.on(LiveTranscriptionEvents.Transcript, self._on_message)
-            self.dg_connection.on(LiveTranscriptionEvents.Metadata, self._on_metadata)
-            self.dg_connection.on(LiveTranscriptionEvents.SpeechStarted, self._on_speech_started)
-            self.dg_connection.on(LiveTranscriptionEvents.UtteranceEnd, self._on_utterance_end)
-            self.dg_connection.on(LiveTranscriptionEvents.Error, self._on_error)
-            self.dg_connection.on(LiveTranscriptionEvents.Close, self._on_close)
-            self.dg_connection.on(LiveTranscriptionEvents.Unhandled, self._on_unhandled)
-
-            logger.info(f"Starting Deepgram connection with LiveOptions: {live_options}")
-            if not await self.dg_connection.start(live_options):
-                 logger.error("Failed to start Deepgram connection.")
-                 self.dg_connection = None
-                 raise ConnectionError("Failed to connect to Deepgram STT service.")
+            session = await open_live_session(self.deepgram_client, build_live_options(self.config, options))
+            session.bind(self)
+            self.dg_connection = session.connection
             logger.info("Deepgram connection started successfully.")
 
         except Exception as e:
@@ -248,27 +370,52 @@ class DeepgramServiceProvider:
 
     async def send_audio(self, audio_chunk: bytes) -> None:
         """
-        Sends an audio chunk to Deepgram.
+        Queues an audio chunk for Deepgram.
+
+        Chunks are coalesced and sent by the ingest pipeline's sender task, so this
+        only waits when the buffer is full and the overflow policy is 'block'.
 
         Args:
             audio_chunk: The raw audio data bytes.
 
         Raises:
-            Exception: Can raise exceptions if the send operation fails.
+            Exception: The error of a failed earlier send to Deepgram.
         """
         if not self.dg_connection:
             logger.warning("Attempted to send audio before connection established or after failure.")
             # Potentially raise an error or notify client?
             return
-        try:
-            logger.info(f"Sending {len(audio_chunk)} bytes to Deepgram") # Optional: very verbose
-            await self.dg_connection.send(audio_chunk)
-        except Exception as e:
-            logger.error(f"Error sending audio to Deepgram: {e}", exc_info=True)
-            # Consider how to handle send errors - maybe notify client via callback?
-            # Maybe try to finish/close connection?
-            # Re-raise the exception for the router to potentially handle?
-            raise # Re-raise the exception for now
+        if self._audio_pipeline is None:
+            self._audio_pipeline = self._create_audio_pipeline()
+        await self._audio_pipeline.push(audio_chunk)
+
+    def _create_audio_pipeline(self) -> AudioIngestPipeline:
+        target_bytes = self.config.stt_coalesce_bytes
+        sample_rate = self._options.get("sample_rate")
+        if self._options.get("encoding") == "linear16" and sample_rate:
+            # Raw PCM has a known byte rate, so coalesce by duration
+            target_bytes = bytes_for_duration(self.config.stt_coalesce_ms, int(sample_rate), int(self._options.get("channels", 1)))
+        return AudioIngestPipeline(
+            self._send_upstream,
+            target_bytes=target_bytes,
+            max_delay_seconds=self.config.stt_coalesce_ms / 1000,
+            max_buffered_bytes=self.config.stt_audio_buffer_bytes,
+            overflow=self.config.stt_audio_overflow,
+        )
+
+    async def _send_upstream(self, audio_chunk: bytes) -> None:
+        """Send a coalesced chunk to Deepgram; run by the ingest pipeline's sender task."""
+        connection = self.dg_connection
+        if connection is None:
+            raise ConnectionError("Deepgram connection is closed.")
+        logger.debug("Sending %d bytes to Deepgram", len(audio_chunk))
+        if not await connection.send(audio_chunk):
+            raise ConnectionError("Failed to send audio to Deepgram.")
+
+    async def keep_alive(self) -> None:
+        """Send a KeepAlive message so Deepgram keeps the session open while no audio is sent."""
+        if self.dg_connection:
+            await self.dg_connection.keep_alive()
 
     async def finish(self) -> None:
         """
@@ -279,6 +426,12 @@ class DeepgramServiceProvider:
         # Reset finals buffer regardless of connection state
         self._is_finals = []
 
+        pipeline, self._audio_pipeline = self._audio_pipeline, None
+        if pipeline is not None:
+            # Flush buffered audio before telling Deepgram the stream is complete
+            await pipeline.close()
+            logger.info(f"Audio ingest stats: {pipeline.stats()}")
+
         if self.dg_connection:
              try:
                  # This signals to Deepgram that the audio stream is complete.
@@ -0,0 +1,365 @@
+"""On-box STT provider running a local speech engine in worker processes.
+
+Recognition is CPU-bound, so it runs in a pool of worker processes rather than on
+the event loop. Each session is pinned to one worker, which keeps its streaming
+recognizer; audio goes to the worker over a queue and transcript events come back
+over a shared result queue, read by a thread that hands them to the event loop.
+
+An engine is a picklable callable `factory(sample_rate) -> recognizer`, where the
+recognizer has `accept(pcm: bytes)` and `finish()`, both returning a list of
+`(kind, text)` events with kind 'interim' or 'final'. The built-in 'vosk' engine
+needs the vosk package and a model directory (STT_LOCAL_MODEL_PATH); other engines
+are given as 'module:callable' import paths.
+
+The provider needs 16-bit PCM, so clients must negotiate it with a config message
+(see `react_agent.web.stt.preprocessing`).
+"""
+
+import asyncio
+import functools
+import importlib
+import json
+import logging
+import multiprocessing
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ..config import STTSettings, stt_settings
+from .base import SendToClientCallback
+
+try:
+    import vosk
+except ImportError:  # Optional dependency
+    vosk = None
+
+logger = logging.getLogger(__name__)
+
+Event = Tuple[str, str]
+EngineFactory = Callable[[int], Any]
+
+# Seconds `open_session` waits for the worker to create the recognizer
+OPEN_TIMEOUT_SECONDS = 30.0
+# Seconds `finish` waits for the final transcript of a session
+FINISH_TIMEOUT_SECONDS = 5.0
+
+
+# --- Engines (run inside the worker processes) ---
+
+_vosk_models: Dict[str, Any] = {}
+
+
+class VoskRecognizer:
+    """Streaming recognizer backed by a Vosk model, loaded once per worker process."""
+
+    def __init__(self, model_path: str, sample_rate: int):
+        """Create a recognizer for `sample_rate` audio with the model at `model_path`."""
+        model = _vosk_models.get(model_path)
+        if model is None:
+            model = _vosk_models[model_path] = vosk.Model(model_path)
+        self._recognizer = vosk.KaldiRecognizer(model, sample_rate)
+        self._last_partial = ""
+
+    def accept(self, pcm: bytes) -> List[Event]:
+        """Feed PCM audio and return the transcript events it produced."""
+        if self._recognizer.AcceptWaveform(pcm):
+            self._last_partial = ""
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            return [("final", text)] if text else []
+        partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        if partial and partial != self._last_partial:
+            self._last_partial = partial
+            return [("interim", partial)]
+        return []
+
+    def finish(self) -> List[Event]:
+        """Return the final transcript of the audio fed so far."""
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        return [("final", text)] if text else []
+
+
+def create_engine_factory(config: STTSettings) -> EngineFactory:
+    """Return the engine factory configured by STT_LOCAL_ENGINE.
+
+    Raises:
+        RuntimeError: If the engine is unavailable or misconfigured.
+    """
+    engine = config.stt_local_engine
+    if engine == "vosk":
+        if vosk is None:
+            raise RuntimeError("The 'vosk' local STT engine requires the vosk package")
+        if not config.stt_local_model_path:
+            raise RuntimeError("The 'vosk' local STT engine requires STT_LOCAL_MODEL_PATH")
+        return functools.partial(VoskRecognizer, config.stt_local_model_path)
+    module_name, _, attribute = engine.partition(":")
+    if not attribute:
+        raise RuntimeError(f"Unknown local STT engine '{engine}', expected 'vosk' or 'module:callable'")
+    try:
+        return getattr(importlib.import_module(module_name), attribute)
+    except (ImportError, AttributeError) as e:
+        raise RuntimeError(f"Cannot load local STT engine '{engine}': {e}") from e
+
+
+def _worker_main(engine_factory: EngineFactory, requests: Any, results: Any) -> None:
+    recognizers: Dict[str, Any] = {}
+    while True:
+        kind, session_id, payload = requests.get()
+        if kind == "stop":
+            return
+        if kind == "open":
+            # The session waits for this reply, so a failed open is not mistaken for a live stream
+            try:
+                recognizers[session_id] = engine_factory(payload)
+                results.put((session_id, ("opened", "")))
+            except Exception as e:
+                results.put((session_id, ("open_failed", f"{type(e).__name__}: {e}")))
+            continue
+        try:
+            if kind == "audio":
+                events = recognizers[session_id].accept(payload)
+            else:  # close
+                recognizer = recognizers.pop(session_id, None)
+                events = recognizer.finish() if recognizer is not None else []
+        except Exception as e:
+            events = [("error", f"{type(e).__name__}: {e}")]
+        for event in events:
+            results.put((session_id, event))
+        if kind == "close":
+            results.put((session_id, ("closed", "")))
+
+
+# --- Worker pool (event loop side) ---
+
+class LocalEngineSession:
+    """One client's stream on a worker process."""
+
+    def __init__(self, pool: "LocalEngineWorkerPool", session_id: str, worker: int, on_event: Callable[[Event], None]):
+        """Create the session; `on_event` receives its transcript events on the event loop."""
+        self._pool = pool
+        self.session_id = session_id
+        self.worker = worker
+        self.loop = asyncio.get_running_loop()
+        self._on_event = on_event
+        self.opened = self.loop.create_future()
+        self.closed = self.loop.create_future()
+
+    def send(self, pcm: bytes) -> None:
+        """Queue PCM audio for the worker."""
+        self._pool._requests[self.worker].put(("audio", self.session_id, pcm))
+
+    async def close(self, timeout: float = FINISH_TIMEOUT_SECONDS) -> None:
+        """Ask the worker for the final transcript and wait until it has been delivered."""
+        self._pool._requests[self.worker].put(("close", self.session_id, None))
+        try:
+            await asyncio.wait_for(asyncio.shield(self.closed), timeout)
+        except TimeoutError:
+            logger.warning(f"Local STT session {self.session_id} did not finish within {timeout}s")
+        finally:
+            self._pool._sessions.pop(self.session_id, None)
+
+    def _deliver(self, event: Event) -> None:
+        if event[0] in ("opened", "open_failed"):
+            if not self.opened.done():
+                if event[0] == "opened":
+                    self.opened.set_result(None)
+                else:
+                    self.opened.set_exception(RuntimeError(event[1]))
+            return
+        if event[0] == "closed":
+            if not self.closed.done():
+                self.closed.set_result(None)
+            return
+        self._on_event(event)
+
+
+class LocalEngineWorkerPool:
+    """Worker processes running a local speech engine, with sessions pinned to workers."""
+
+    def __init__(self, engine_factory: EngineFactory, workers: int = 2):
+        """Create the pool; the worker processes start with the first session."""
+        self.engine_factory = engine_factory
+        self.workers = max(1, workers)
+        self._requests: List[Any] = []
+        self._results: Any = None
+        self._processes: List[multiprocessing.Process] = []
+        self._reader: Optional[threading.Thread] = None
+        self._sessions: Dict[str, LocalEngineSession] = {}
+        self._next_id = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker processes are started."""
+        return bool(self._processes)
+
+    def start(self) -> None:
+        """Start the worker processes and the result reader thread."""
+        if self.running:
+            return
+        self._results = multiprocessing.Queue()
+        for index in range(self.workers):
+            requests = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(self.engine_factory, requests, self._results),
+                name=f"stt-local-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._requests.append(requests)
+            self._processes.append(process)
+        self._reader = threading.Thread(target=self._read_results, name="stt-local-results", daemon=True)
+        self._reader.start()
+        logger.info(f"Local STT engine started with {self.workers} worker processes")
+
+    def stop(self) -> None:
+        """Stop the workers; open sessions get no further events."""
+        if not self.running:
+            return
+        for requests in self._requests:
+            requests.put(("stop", "", None))
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._results.put(None)
+        if self._reader is not None:
+            self._reader.join(timeout=5)
+        self._requests, self._processes, self._reader = [], [], None
+        self._sessions.clear()
+
+    async def open_session(
+        self, sample_rate: int, on_event: Callable[[Event], None], timeout: float = OPEN_TIMEOUT_SECONDS
+    ) -> LocalEngineSession:
+        """Open a recognizer for a new stream on the least busy worker.
+
+        Raises:
+            RuntimeError: If the worker could not create the recognizer.
+            TimeoutError: If the worker did not answer within `timeout` seconds.
+        """
+        self.start()
+        load = [0] * self.workers
+        for session in self._sessions.values():
+            load[session.worker] += 1
+        worker = load.index(min(load))
+        self._next_id += 1
+        session = LocalEngineSession(self, f"session-{self._next_id}", worker, on_event)
+        self._sessions[session.session_id] = session
+        self._requests[worker].put(("open", session.session_id, sample_rate))
+        try:
+            await asyncio.wait_for(asyncio.shield(session.opened), timeout)
+        except BaseException:
+            # Drop the recognizer in case the worker creates it late
+            self._requests[worker].put(("close", session.session_id, None))
+            self._sessions.pop(session.session_id, None)
+            raise
+        return session
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of workers and open sessions."""
+        return {"workers": len(self._processes), "sessions": len(self._sessions)}
+
+    def _read_results(self) -> None:
+        while True:
+            item = self._results.get()
+            if item is None:
+                return
+            session_id, event = item
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.loop.call_soon_threadsafe(session._deliver, event)
+
+
+# --- Dependency Injection ---
+_local_engine_pool_instance: Optional[LocalEngineWorkerPool] = None
+
+def get_local_engine_pool(config: STTSettings = stt_settings) -> LocalEngineWorkerPool:
+    """Return the process-wide local engine pool, created on first use.
+
+    Raises:
+        RuntimeError: If the configured engine is unavailable.
+    """
+    global _local_engine_pool_instance
+    if _local_engine_pool_instance is None:
+        _local_engine_pool_instance = LocalEngineWorkerPool(create_engine_factory(config), config.stt_local_workers)
+    return _local_engine_pool_instance
+
+
+def shutdown_local_engine_pool() -> None:
+    """Stop the process-wide local engine pool if it was started."""
+    if _local_engine_pool_instance is not None:
+        _local_engine_pool_instance.stop()
+
+
+# --- Provider ---
+
+class LocalServiceProvider:
+    """Implementation of STTServiceProvider using a local speech engine.
+
+    Sends the same `interim_transcript` and `final_transcript` messages to the client
+    as the Deepgram provider.
+    """
+
+    def __init__(
+        self,
+        config: STTSettings,
+        send_to_client_callback: SendToClientCallback,
+        engine_pool: Optional[LocalEngineWorkerPool] = None
+    ):
+        """Create the provider on the process-wide engine pool unless `engine_pool` is given."""
+        try:
+            self.engine_pool = engine_pool or get_local_engine_pool(config)
+        except RuntimeError as e:
+            raise ValueError(str(e)) from e
+        self.config = config
+        self.send_to_client_callback = send_to_client_callback
+        self._session: Optional[LocalEngineSession] = None
+        self._tasks: Set[asyncio.Task[Any]] = set()
+
+    async def connect(self, options: Dict[str, Any]) -> None:
+        """Open a recognizer for the stream.
+
+        Args:
+            options: Must describe 16-bit PCM, e.g. {"encoding": "linear16",
+                     "sample_rate": 16000, "channels": 1}.
+
+        Raises:
+            ConnectionError: If the audio format is not supported or the engine fails to start.
+        """
+        if options.get("encoding") != "linear16" or int(options.get("channels", 1)) != 1:
+            raise ConnectionError("The local STT engine needs mono linear16 audio; send a config message first.")
+        try:
+            self._session = await self.engine_pool.open_session(int(options["sample_rate"]), self._on_event)
+        except Exception as e:
+            raise ConnectionError(f"Failed to start the local STT engine: {e}") from e
+        logger.info(f"Local STT session {self._session.session_id} opened on worker {self._session.worker}")
+
+    async def send_audio(self, audio_chunk: bytes) -> None:
+        """Queue an audio chunk for the session's worker process."""
+        if self._session is None:
+            logger.warning("Attempted to send audio before connection established or after failure.")
+            return
+        self._session.send(audio_chunk)
+
+    async def keep_alive(self) -> None:
+        """Do nothing; local sessions do not time out."""
+
+    async def finish(self) -> None:
+        """Flush the final transcript and close the session."""
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _on_event(self, event: Event) -> None:
+        kind, text = event
+        if kind == "interim":
+            message = {"type": "interim_transcript", "transcript": text}
+        elif kind == "final":
+            message = {"type": "final_transcript", "transcript": text}
+        else:
+            logger.error(f"Local STT engine error: {text}")
+            message = {"type": "error", "message": f"Local STT Error: {text}"}
+        # Keep a reference so sends are not garbage collected mid-flight
+        task = asyncio.get_running_loop().create_task(self.send_to_client_callback(message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,55 @@
+"""Registry of STT service providers.
+
+The provider for a session is chosen by the `provider` field of the client's config
+message, falling back to STT_PROVIDER. Providers are registered by name with a
+factory taking the settings and the send-to-client callback; built-in providers are
+imported only when first used, so their SDKs are only needed if selected.
+"""
+
+import importlib
+from typing import Callable, Dict, List
+
+from ..config import STTSettings
+from .base import SendToClientCallback, STTServiceProvider
+
+ProviderFactory = Callable[[STTSettings, SendToClientCallback], STTServiceProvider]
+
+
+def _create_deepgram(config: STTSettings, send_to_client_callback: SendToClientCallback) -> STTServiceProvider:
+    deepgram = importlib.import_module("react_agent.web.stt.providers.deepgram")
+    return deepgram.DeepgramServiceProvider(
+        config, send_to_client_callback, session_pool=deepgram.get_deepgram_session_pool(config)
+    )
+
+
+def _create_local(config: STTSettings, send_to_client_callback: SendToClientCallback) -> STTServiceProvider:
+    local = importlib.import_module("react_agent.web.stt.providers.local")
+    return local.LocalServiceProvider(config, send_to_client_callback)
+
+
+_PROVIDERS: Dict[str, ProviderFactory] = {
+    "deepgram": _create_deepgram,
+    "local": _create_local,
+}
+
+
+def register_provider(name: str, factory: ProviderFactory) -> None:
+    """Make a provider selectable by `name`."""
+    _PROVIDERS[name] = factory
+
+
+def available_providers() -> List[str]:
+    """Return the names of the registered providers."""
+    return sorted(_PROVIDERS)
+
+
+def create_provider(name: str, config: STTSettings, send_to_client_callback: SendToClientCallback) -> STTServiceProvider:
+    """Instantiate the provider registered as `name`.
+
+    Raises:
+        ValueError: If no provider is registered under that name, or it is misconfigured.
+    """
+    factory = _PROVIDERS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown STT provider '{name}', expected one of {available_providers()}")
+    return factory(config, send_to_client_callback)
@@ -1,82 +1,192 @@
 import asyncio
+import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Mapping
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from starlette.websockets import WebSocketState
 from contextlib import suppress
 
 # Import provider and config
-from react_agent.web.stt.providers.deepgram import DeepgramServiceProvider
+from react_agent.web.stt.providers.base import STTServiceProvider
+from react_agent.web.stt.providers.registry import create_provider
 from react_agent.web.stt.config import stt_settings
+from react_agent.web.stt.preprocessing import AudioPreprocessor, negotiate_preprocessor
+from react_agent.web.stt.vad import VadGate, create_vad_gate
 
 logger = logging.getLogger(__name__)
 
 stt_router = APIRouter()
 
+# Query parameters that may carry the audio config instead of a config message
+_CONFIG_QUERY_PARAMS = ("encoding", "sample_rate", "channels", "provider")
+
+
+class _UpstreamError(Exception):
+    """Raised when the STT provider of a session cannot be created or connected."""
+    pass
+
+
+def _config_from_query(query_params: Mapping[str, str]) -> Dict[str, Any] | None:
+    """Return the audio config given in the connection's query parameters, if any."""
+    config = {key: query_params[key] for key in _CONFIG_QUERY_PARAMS if query_params.get(key)}
+    return {"type": "config", **config} if config else None
+
+
+def _parse_config(text: str) -> Dict[str, Any] | None:
+    """Return the config message in a text frame, or None if it is something else."""
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) and parsed.get("type") == "config" else None
+
+
 @stt_router.websocket("/stt-stream")
 async def stt_stream_endpoint(websocket: WebSocket):
     """WebSocket endpoint for streaming Speech-to-Text."""
     session_id = None # Placeholder for potential session management
-    provider: DeepgramServiceProvider | None = None # Type hint for clarity
+    provider: STTServiceProvider | None = None # Type hint for clarity
+    preprocessor: AudioPreprocessor = AudioPreprocessor() # Replaced by negotiation below
+    vad_gate: VadGate | None = None # Drops silence when enabled and the audio is PCM
+    pending_receive: asyncio.Future[Dict[str, Any]] | None = None # First receive, if it outlasted the config wait
 
     try:
         await websocket.accept()
         session_id = websocket.headers.get("sec-websocket-key") # Use key as temporary ID
         logger.info(f"STT WebSocket connection accepted from {websocket.client.host}:{websocket.client.port}, session: {session_id}")
 
-        # --- Instantiate Provider (Step 5) ---
-        try:
-            # Define the callback function specific to this client connection
-            async def send_json_to_client(data: Dict[str, Any]):
-                try:
-                    await websocket.send_json(data)
-                except WebSocketDisconnect:
-                    logger.warning(f"Client {session_id} disconnected while trying to send message: {data.get('type')}")
-                except Exception as e:
-                    logger.error(f"Error sending message to client {session_id}: {e}", exc_info=True)
-
-            provider = DeepgramServiceProvider(stt_settings, send_json_to_client)
-            logger.info(f"STT Provider instantiated for session {session_id}")
-
-        except ValueError as e:
-             logger.error(f"Failed to instantiate STT provider for session {session_id}: {e}", exc_info=True)
-             await websocket.close(code=1011, reason=f"Configuration error: {e}")
-             return # Stop processing if provider fails to init
-        except Exception as e:
-             logger.error(f"Unexpected error instantiating STT provider for session {session_id}: {e}", exc_info=True)
-             await websocket.close(code=1011, reason="Provider initialization failed")
-             return # Stop processing
+        # --- Negotiate audio preprocessing ---
+        # Clients describe their audio in query parameters (?encoding=...&sample_rate=...
+        # &channels=...&provider=...) or in a first text message:
+        # {"type": "config", "encoding": ..., "sample_rate": ..., "channels": ..., "provider": ...}
+        # Without query parameters the message is only waited for briefly, so for clients
+        # that just send audio the provider connects while their first chunk is still being
+        # recorded. A config message arriving later, but before any audio, reconnects the
+        # provider with it.
+        first_audio: bytes | None = None
+        audio_config = _config_from_query(websocket.query_params)
+        if audio_config is None:
+            pending_receive = asyncio.ensure_future(websocket.receive())
+            try:
+                first_message = await asyncio.wait_for(asyncio.shield(pending_receive), stt_settings.stt_config_wait_ms / 1000)
+            except TimeoutError:
+                pass # Still pending; read by the main loop below
+            else:
+                pending_receive = None
+                if first_message["type"] == "websocket.disconnect":
+                    logger.info(f"Client {session_id} disconnected before sending audio.")
+                    return
+                if first_message.get("text"):
+                    audio_config = _parse_config(first_message["text"])
+                    if audio_config is None:
+                        logger.warning(f"Ignoring non-config first text message ({len(first_message['text'])} chars) for session {session_id}")
+                elif first_message.get("bytes"):
+                    first_audio = first_message["bytes"]
         # -------------------------------------
 
-        # --- Connect Provider (Step 6) ---
-        try:
-            # TODO: Eventually allow client to pass options (encoding, sample_rate, etc.)
-            # For now, use defaults defined in DeepgramServiceProvider.connect()
-            await provider.connect({})
-            logger.info(f"STT Provider connected for session {session_id}")
-        except ConnectionError as e:
-            logger.error(f"STT Provider connection failed for session {session_id}: {e}", exc_info=True)
-            await websocket.close(code=1011, reason=f"STT connection failed: {e}")
-            return # Stop processing if provider can't connect
-        except Exception as e:
-            logger.error(f"Unexpected error connecting STT provider for session {session_id}: {e}", exc_info=True)
-            await websocket.close(code=1011, reason="STT connection failed")
-            return # Stop processing
-        # -------------------------------
+        # Define the callback function specific to this client connection
+        async def send_json_to_client(data: Dict[str, Any]):
+            try:
+                await websocket.send_json(data)
+            except WebSocketDisconnect:
+                logger.warning(f"Client {session_id} disconnected while trying to send message: {data.get('type')}")
+            except Exception as e:
+                logger.error(f"Error sending message to client {session_id}: {e}", exc_info=True)
+
+        async def open_upstream(config: Dict[str, Any] | None) -> None:
+            """Create and connect the provider for a config (None for the defaults)."""
+            nonlocal provider, preprocessor, vad_gate
+            preprocessor = negotiate_preprocessor(config)
+            provider_name = str((config or {}).get("provider") or stt_settings.stt_provider)
+
+            # --- Instantiate Provider (Step 5) ---
+            try:
+                provider = create_provider(provider_name, stt_settings, send_json_to_client)
+                logger.info(f"STT Provider '{provider_name}' instantiated for session {session_id}")
+            except ValueError as e:
+                raise _UpstreamError(f"Configuration error: {e}") from e
+            except Exception as e:
+                raise _UpstreamError("Provider initialization failed") from e
+            # -------------------------------------
+
+            vad_gate = create_vad_gate(stt_settings, preprocessor.live_options)
+
+            # --- Connect Provider (Step 6) ---
+            try:
+                await provider.connect(dict(preprocessor.live_options))
+                logger.info(f"STT Provider connected for session {session_id}")
+            except Exception as e:
+                failed, provider = provider, None
+                with suppress(Exception):
+                    await failed.finish()
+                reason = f"STT connection failed: {e}" if isinstance(e, ConnectionError) else "STT connection failed"
+                raise _UpstreamError(reason) from e
+            # -------------------------------
+
+            if config is not None:
+                logger.info(f"STT audio config for session {session_id}: {config}, upstream options: {preprocessor.live_options}")
+                await websocket.send_json({"type": "config_ack", "provider": provider_name, "upstream": preprocessor.live_options})
+
+        async def reopen_upstream(config: Dict[str, Any] | None) -> bool:
+            """Replace the provider by one for `config`; closes the socket and returns False on failure."""
+            nonlocal provider
+            if provider is not None:
+                previous, provider = provider, None
+                with suppress(Exception):
+                    await previous.finish()
+            try:
+                await open_upstream(config)
+            except _UpstreamError as e:
+                logger.error(f"Failed to start STT provider for session {session_id}: {e}", exc_info=e.__cause__)
+                await websocket.close(code=1011, reason=str(e))
+                return False
+            return True
+
+        async def forward_audio(chunk: bytes):
+            audio = preprocessor.process(chunk)
+            if vad_gate is not None:
+                audio = vad_gate.process(audio)
+                if not audio and vad_gate.keepalive_due():
+                    # Nothing is flowing upstream; keep the session from timing out
+                    await provider.keep_alive()
+            if audio:
+                await provider.send_audio(audio)
+
+        if audio_config is not None or first_audio:
+            if not await reopen_upstream(audio_config):
+                return # Stop processing if the provider can't start
+        else:
+            # Connect with the defaults ahead of the first chunk; if that fails, e.g. because
+            # the provider needs a config, connecting is retried once the client sends something
+            try:
+                await open_upstream(None)
+            except _UpstreamError as e:
+                logger.info(f"STT provider not connected with default options for session {session_id} ({e}); waiting for the client")
+
+        audio_sent = False
+        if first_audio:
+            await forward_audio(first_audio)
+            audio_sent = True
 
         # Main loop to receive audio/messages from client
         while True:
             try:
-                message = await websocket.receive()
+                if pending_receive is not None:
+                    message, pending_receive = await pending_receive, None
+                else:
+                    message = await websocket.receive()
                 # logger.info(f"Received message: {message} for session {session_id}")
                 # logger.debug(f"Received message type: {message.get('type')} for session {session_id}")
 
                 if message["type"] == "websocket.receive":
                     if message.get("bytes"):
+                        if provider is None and not await reopen_upstream(None):
+                            break # The deferred connect with the defaults failed
+                        audio_sent = True
                         # --- Pass audio chunk to provider (Step 7) ---
                         if provider:
                            try:
-                               await provider.send_audio(message['bytes'])
+                               await forward_audio(message['bytes'])
                            except Exception as e:
                                # Handle potential errors during audio sending (e.g., connection closed)
                                logger.error(f"Error sending audio chunk for session {session_id}: {e}", exc_info=False) # Don't need full stack trace usually
@@ -86,8 +196,16 @@ async def stt_stream_endpoint(websocket: WebSocket):
                         # ---------------------------------------------
                     elif message.get("text"):
                         # TODO: Handle potential JSON control messages (e.g., stop)
-                        logger.warning(f"Received text message for session {session_id}: {message.get('text')}. Ignoring for now.")
-                        pass # Placeholder
+                        late_config = _parse_config(message["text"])
+                        if late_config is None:
+                            logger.warning(f"Ignoring text message ({len(message['text'])} chars) for session {session_id}")
+                        elif not audio_sent:
+                            logger.info(f"Reconnecting STT provider for session {session_id} with the client's config")
+                            if not await reopen_upstream(late_config):
+                                break
+                        else:
+                            logger.warning(f"Ignoring config message for session {session_id}; audio was already sent.")
+                            await send_json_to_client({"type": "error", "message": "The config message must be sent before any audio; it was ignored."})
 
                 elif message["type"] == "websocket.disconnect":
                     logger.info(f"Client {session_id} disconnected gracefully.")
@@ -112,10 +230,18 @@ async def stt_stream_endpoint(websocket: WebSocket):
                 await websocket.close(code=1011, reason="Server error during setup or communication")
     finally:
         logger.info(f"Cleaning up STT WebSocket connection for session {session_id}")
+        if pending_receive is not None:
+            pending_receive.cancel()
         if provider:
             # --- Ensure provider is cleaned up (Step 9) ---
             logger.debug(f"Initiating provider cleanup for session {session_id}")
             try:
+                tail = preprocessor.flush()
+                if vad_gate is not None:
+                    tail = vad_gate.process(tail) + vad_gate.flush()
+                    logger.info(f"STT voice-activity gate stats for session {session_id}: {vad_gate.stats()}")
+                if tail:
+                    await provider.send_audio(tail)
                 await provider.finish() # Ensure Deepgram connection is closed
             except Exception as e:
                  logger.error(f"Error during provider cleanup for session {session_id}: {e}", exc_info=True)
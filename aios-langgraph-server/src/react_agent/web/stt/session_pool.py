@@ -0,0 +1,146 @@
+"""Pool of pre-opened streaming STT sessions.
+
+Opening a live transcription session costs a network handshake. The pool keeps a few
+sessions open ahead of time so a client connecting to /stt/stt-stream gets one
+immediately. Sessions that sat in the pool longer than `max_idle_seconds`, or that
+the provider reports as no longer usable, are closed and replaced.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """Keeps up to `size` idle sessions open and hands them out on `acquire`."""
+
+    def __init__(
+        self,
+        open_session: Callable[[], Awaitable[Any]],
+        close_session: Callable[[Any], Awaitable[None]],
+        size: int,
+        max_idle_seconds: float = 60.0,
+        is_usable: Callable[[Any], bool] = lambda session: True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Create an empty pool; sessions are opened once it is started."""
+        self._open_session = open_session
+        self._close_session = close_session
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self._is_usable = is_usable
+        self._clock = clock
+        self._idle: Deque[Tuple[float, Any]] = deque()
+        self._opening = 0
+        self._tasks: Set[asyncio.Task[Any]] = set()
+        self._maintenance: Optional[asyncio.Task[None]] = None
+        self._running = False
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.open_failures = 0
+
+    async def start(self) -> None:
+        """Open the initial sessions and start recycling stale ones."""
+        if self._running:
+            return
+        self._running = True
+        self._refill()
+        self._maintenance = asyncio.get_running_loop().create_task(self._maintain())
+        logger.info(f"STT session pool started with size {self.size}")
+
+    async def stop(self) -> None:
+        """Stop refilling and close every idle session."""
+        self._running = False
+        tasks = list(self._tasks)
+        if self._maintenance is not None:
+            tasks.append(self._maintenance)
+            self._maintenance = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while self._idle:
+            _, session = self._idle.popleft()
+            await self._close(session)
+
+    def acquire(self) -> Optional[Any]:
+        """Return a ready session, or None if none is available (the caller opens its own)."""
+        self._recycle_stale()
+        session = None
+        if self._idle:
+            _, session = self._idle.popleft()
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._refill()
+        return session
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool gauges for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "idle": len(self._idle),
+            "opening": self._opening,
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "recycled": self.recycled,
+            "open_failures": self.open_failures,
+        }
+
+    def _recycle_stale(self) -> None:
+        now = self._clock()
+        fresh: Deque[Tuple[float, Any]] = deque()
+        for opened_at, session in self._idle:
+            if now - opened_at > self.max_idle_seconds or not self._is_usable(session):
+                self.recycled += 1
+                self._spawn(self._close(session))
+            else:
+                fresh.append((opened_at, session))
+        self._idle = fresh
+
+    def _refill(self) -> None:
+        if not self._running:
+            return
+        for _ in range(self.size - len(self._idle) - self._opening):
+            self._opening += 1
+            self._spawn(self._open_one())
+
+    async def _open_one(self) -> None:
+        try:
+            session = await self._open_session()
+        except Exception as e:
+            self.open_failures += 1
+            logger.warning(f"Failed to pre-open STT session: {e}")
+            return
+        finally:
+            self._opening -= 1
+        if self._running:
+            self._idle.append((self._clock(), session))
+        else:
+            await self._close(session)
+
+    async def _close(self, session: Any) -> None:
+        try:
+            await self._close_session(session)
+        except Exception as e:
+            logger.warning(f"Error closing pooled STT session: {e}")
+
+    async def _maintain(self) -> None:
+        interval = max(1.0, self.max_idle_seconds / 4)
+        while True:
+            await asyncio.sleep(interval)
+            self._recycle_stale()
+            # Retry sessions that failed to open earlier
+            self._refill()
+
+    def _spawn(self, coroutine: Any) -> None:
+        # Keep a reference so background tasks are not garbage collected mid-flight
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,261 @@
+"""Voice-activity gate for STT audio.
+
+An energy-based detector classifies linear16 audio in short analysis frames (RMS
+level against a fixed threshold and an adaptive noise floor, computed with NumPy for
+all frames of a chunk at once). Silence is then dropped, or thinned to every Nth
+frame, instead of being streamed to the provider:
+
+- A pre-roll ring buffer keeps the most recent silent audio, which is sent ahead of
+  each detected onset so the start of speech is never clipped.
+- After speech stops, audio keeps flowing for a hangover period. Keep it longer than
+  the provider's utterance-end window so utterances are still finalized.
+
+While audio is gated the caller should send keepalives so the upstream session
+stays open (see `VadGate.keepalive_due`).
+
+To measure bytes saved and onset accuracy offline::
+
+    python -m react_agent.web.stt.vad recording.wav
+
+where an optional `recording.json` sidecar lists the true speech onsets in seconds
+as `{"onsets": [0.8, 4.2]}`.
+"""
+
+import json
+import os
+import sys
+import time
+import wave
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+SILENCE_MODES = ("drop", "thin")
+
+# Adaptation rates of the noise floor estimate: it falls quickly to quieter levels
+# and rises slowly (over ~10 s of 20 ms frames), so steady background noise is
+# learned while speech bursts barely move it
+_NOISE_FLOOR_FALL = 0.2
+_NOISE_FLOOR_RISE = 0.002
+_MIN_DB = -100.0
+
+
+class VadGate:
+    """Drops or thins silent linear16 audio, keeping pre-roll and hangover around speech."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int = 1,
+        frame_ms: int = 20,
+        threshold_db: float = -45.0,
+        margin_db: float = 10.0,
+        hangover_ms: int = 1200,
+        preroll_ms: int = 300,
+        silence_mode: str = "drop",
+        thin_every: int = 10,
+        keepalive_seconds: float = 5.0,
+        on_onset: Optional[Callable[[float], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Create a gate for `sample_rate` audio; it starts out in silence."""
+        if np is None:
+            raise RuntimeError("Voice-activity detection requires numpy")
+        if silence_mode not in SILENCE_MODES:
+            raise ValueError(f"Unknown silence mode '{silence_mode}', expected one of {SILENCE_MODES}")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.silence_mode = silence_mode
+        self.thin_every = max(1, thin_every)
+        self.keepalive_seconds = keepalive_seconds
+        self._on_onset = on_onset
+        self._clock = clock
+        self._frame_bytes = sample_rate * frame_ms // 1000 * channels * 2
+        self._frame_seconds = frame_ms / 1000
+        self._hangover_frames = max(0, hangover_ms // frame_ms)
+        self._preroll: Deque[bytes] = deque(maxlen=max(0, preroll_ms // frame_ms))
+        self._partial = b""
+        self._noise_floor_db = threshold_db - margin_db
+        self._hangover_left = 0
+        self._silent_run = 0
+        self._frames_seen = 0
+        self._last_forwarded_at = clock()
+        # Metrics
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.speech_frames = 0
+        self.silence_frames = 0
+        self.onsets = 0
+
+    @property
+    def in_speech(self) -> bool:
+        """Whether audio is currently being forwarded (speech or hangover)."""
+        return self._hangover_left > 0
+
+    def process(self, pcm: bytes) -> bytes:
+        """Classify a chunk of audio and return the part to forward upstream."""
+        self.bytes_in += len(pcm)
+        data = self._partial + pcm
+        usable = len(data) - len(data) % self._frame_bytes
+        self._partial = data[usable:]
+        if not usable:
+            return b""
+
+        samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        frames = samples.reshape(-1, self._frame_bytes // 2)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        levels_db = 20 * np.log10(np.maximum(rms, 10 ** (_MIN_DB / 20)))
+
+        output: List[bytes] = []
+        for index, level_db in enumerate(levels_db.tolist()):
+            frame = data[index * self._frame_bytes:(index + 1) * self._frame_bytes]
+            self._classify(frame, level_db, output)
+            self._frames_seen += 1
+
+        forwarded = b"".join(output)
+        if forwarded:
+            self.bytes_out += len(forwarded)
+            self._last_forwarded_at = self._clock()
+        return forwarded
+
+    def flush(self) -> bytes:
+        """Return the trailing partial frame if speech is in progress."""
+        tail, self._partial = self._partial, b""
+        if tail and self.in_speech:
+            self.bytes_out += len(tail)
+            return tail
+        return b""
+
+    def keepalive_due(self) -> bool:
+        """Whether nothing was forwarded for `keepalive_seconds`; resets the timer when True."""
+        if self._clock() - self._last_forwarded_at < self.keepalive_seconds:
+            return False
+        self._last_forwarded_at = self._clock()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return traffic and detection counters."""
+        return {
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+            "saved_ratio": 1 - self.bytes_out / self.bytes_in if self.bytes_in else 0.0,
+            "speech_frames": self.speech_frames,
+            "silence_frames": self.silence_frames,
+            "onsets": self.onsets,
+            "noise_floor_db": self._noise_floor_db,
+        }
+
+    def _classify(self, frame: bytes, level_db: float, output: List[bytes]) -> None:
+        threshold = max(self.threshold_db, self._noise_floor_db + self.margin_db)
+        rate = _NOISE_FLOOR_FALL if level_db < self._noise_floor_db else _NOISE_FLOOR_RISE
+        self._noise_floor_db += rate * (level_db - self._noise_floor_db)
+        if level_db >= threshold:
+            self.speech_frames += 1
+            if not self.in_speech:
+                self.onsets += 1
+                if self._on_onset is not None:
+                    # Stream time of the first forwarded sample, pre-roll included
+                    self._on_onset((self._frames_seen - len(self._preroll)) * self._frame_seconds)
+                output.extend(self._preroll)
+                self._preroll.clear()
+            self._hangover_left = self._hangover_frames + 1
+            self._silent_run = 0
+            output.append(frame)
+            return
+
+        self.silence_frames += 1
+        if self.in_speech:
+            self._hangover_left -= 1
+            if self.in_speech:
+                output.append(frame)
+                return
+        self._silent_run += 1
+        if self.silence_mode == "thin" and self._silent_run % self.thin_every == 0:
+            output.append(frame)
+            # Thinned frames must not be replayed as pre-roll
+            self._preroll.clear()
+        elif self._preroll.maxlen:
+            self._preroll.append(frame)
+
+
+def create_vad_gate(config: Any, live_options: Dict[str, Any]) -> Optional[VadGate]:
+    """Return a VadGate for the upstream audio format, or None if gating is off or impossible.
+
+    Gating needs linear16 audio, so it only applies to negotiated PCM streams.
+    """
+    if not config.stt_vad_enabled or np is None or live_options.get("encoding") != "linear16":
+        return None
+    return VadGate(
+        sample_rate=int(live_options["sample_rate"]),
+        channels=int(live_options.get("channels", 1)),
+        threshold_db=config.stt_vad_threshold_db,
+        hangover_ms=config.stt_vad_hangover_ms,
+        preroll_ms=config.stt_vad_preroll_ms,
+        silence_mode=config.stt_vad_silence,
+        keepalive_seconds=config.stt_vad_keepalive_seconds,
+    )
+
+
+# --- Offline benchmark ---
+
+def benchmark_vad(path: str, onsets: Optional[List[float]] = None, chunk_ms: int = 20, **gate_options: Any) -> Dict[str, Any]:
+    """Run a 16-bit PCM WAV file through a VadGate.
+
+    Reports bytes saved and, given the true speech onsets in seconds, how early each
+    was detected (positive lead means the pre-roll started before the onset) and how
+    many onsets were clipped or missed.
+    """
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM WAV files are supported")
+        sample_rate, channels = wav.getframerate(), wav.getnchannels()
+        audio = wav.readframes(wav.getnframes())
+
+    detected: List[float] = []
+    gate = VadGate(sample_rate, channels, on_onset=detected.append, **gate_options)
+    chunk_bytes = sample_rate * channels * 2 * chunk_ms // 1000
+    started = time.perf_counter()
+    for offset in range(0, len(audio), chunk_bytes):
+        gate.process(audio[offset:offset + chunk_bytes])
+    gate.flush()
+    report: Dict[str, Any] = {
+        **gate.stats(),
+        "audio_seconds": len(audio) / (sample_rate * channels * 2),
+        "processing_seconds": time.perf_counter() - started,
+        "detected_onsets": detected,
+    }
+
+    if onsets is not None:
+        leads: List[float] = []
+        missed = 0
+        for onset in onsets:
+            # The detection closest to the onset, up to 1 s early (pre-roll) or 0.5 s late (clipped)
+            candidates = [start for start in detected if onset - 1.0 <= start <= onset + 0.5]
+            if not candidates:
+                missed += 1
+                continue
+            leads.append(onset - min(candidates, key=lambda start: abs(start - onset)))
+        report.update(
+            true_onsets=onsets,
+            missed_onsets=missed,
+            clipped_onsets=sum(1 for lead in leads if lead < 0),
+            mean_onset_lead=sum(leads) / len(leads) if leads else None,
+        )
+    return report
+
+
+if __name__ == "__main__":
+    for wav_path in sys.argv[1:]:
+        sidecar = os.path.splitext(wav_path)[0] + ".json"
+        true_onsets = None
+        if os.path.exists(sidecar):
+            with open(sidecar) as f:
+                true_onsets = json.load(f).get("onsets")
+        print(json.dumps({"file": wav_path, **benchmark_vad(wav_path, true_onsets)}, indent=2))  # noqa: T201
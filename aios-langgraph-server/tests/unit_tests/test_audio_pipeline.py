@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from react_agent.web.stt.audio_pipeline import AudioIngestPipeline, bytes_for_duration
+
+
+class FakeUpstream:
+    def __init__(self) -> None:
+        self.sent: list = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.fail = False
+
+    async def send(self, chunk: bytes) -> None:
+        await self.gate.wait()
+        if self.fail:
+            raise ConnectionError("upstream closed")
+        self.sent.append(chunk)
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_bytes_for_duration() -> None:
+    assert bytes_for_duration(100, 16000) == 3200
+    assert bytes_for_duration(20, 48000, channels=2) == 3840
+
+
+@pytest.mark.asyncio
+async def test_small_frames_are_coalesced() -> None:
+    upstream = FakeUpstream()
+    pipeline = AudioIngestPipeline(upstream.send, target_bytes=10, max_delay_seconds=0.05)
+
+    for _ in range(5):
+        await pipeline.push(b"ab")
+    await _settle()
+    await pipeline.push(b"c")
+    await asyncio.sleep(0.1)
+
+    assert upstream.sent == [b"ab" * 5, b"c"]
+    stats = pipeline.stats()
+    assert stats["frames_received"] == 6
+    assert stats["chunks_sent"] == 2
+    await pipeline.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_buffered_audio() -> None:
+    upstream = FakeUpstream()
+    pipeline = AudioIngestPipeline(upstream.send, target_bytes=1000, max_delay_seconds=10)
+
+    await pipeline.push(b"tail")
+    await pipeline.close()
+
+    assert upstream.sent == [b"tail"]
+    with pytest.raises(RuntimeError):
+        await pipeline.push(b"late")
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_blocks_or_drops_oldest() -> None:
+    upstream = FakeUpstream()
+    upstream.gate.clear()
+    blocking = AudioIngestPipeline(upstream.send, target_bytes=4, max_delay_seconds=0, max_buffered_bytes=8)
+    for frame in (b"1111", b"2222", b"3333"):
+        await blocking.push(frame)
+    await _settle()
+    blocked = asyncio.create_task(blocking.push(b"4444"))
+    await _settle()
+    assert not blocked.done()
+    assert blocking.stats()["fill"] == 1.0
+
+    upstream.gate.set()
+    await blocked
+    await blocking.close()
+    assert upstream.sent == [b"1111", b"2222", b"3333", b"4444"]
+
+    stalled = FakeUpstream()
+    stalled.gate.clear()
+    dropping = AudioIngestPipeline(stalled.send, target_bytes=4, max_delay_seconds=0, max_buffered_bytes=8, overflow="drop_oldest")
+    for frame in (b"aaaa", b"bbbb", b"cccc", b"dddd"):
+        await dropping.push(frame)
+        await _settle()
+    assert dropping.stats()["dropped_bytes"] == 4
+    stalled.gate.set()
+    await dropping.close()
+    assert stalled.sent == [b"aaaa", b"cccc", b"dddd"]
+
+
+@pytest.mark.asyncio
+async def test_upstream_errors_surface_on_next_push() -> None:
+    upstream = FakeUpstream()
+    upstream.fail = True
+    pipeline = AudioIngestPipeline(upstream.send, target_bytes=1, max_delay_seconds=0)
+
+    await pipeline.push(b"x")
+    await _settle()
+    with pytest.raises(ConnectionError):
+        await pipeline.push(b"y")
+    await pipeline.close()
@@ -3,3 +3,23 @@ from react_agent.configuration import Configuration
 
 def test_configuration_empty() -> None:
     Configuration.from_runnable_config({})
+
+
+def _tool_dicts() -> list:
+    return [
+        {
+            "name": "read_file",
+            "description": "Read a file",
+            "schema": {"type": "object", "properties": {"path": {"type": "string"}}},
+        }
+    ]
+
+
+def test_configuration_converts_tools_once_without_mutating_config() -> None:
+    configurable = {"tools": _tool_dicts(), "websocket_connection_id": "abc"}
+    first = Configuration.from_runnable_config({"configurable": configurable})
+    second = Configuration.from_runnable_config({"configurable": {"tools": _tool_dicts()}})
+
+    assert configurable["tools"] == _tool_dicts()
+    assert [tool.name for tool in first.tools] == ["read_file"]
+    assert first.tools is second.tools
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from react_agent.web.connection import ConnectionManager, PendingCallLimitError
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent: list = []
+
+    async def send_json(self, data) -> None:
+        self.sent.append(data)
+
+
+@pytest.mark.asyncio
+async def test_timed_out_call_is_evicted() -> None:
+    manager = ConnectionManager()
+    connection_id = await manager.connect(FakeSocket(), tools={})
+    baseline = manager.stats()["pending_calls"]
+
+    future = await manager.call_tool(connection_id, "slow", "echo", {})
+    assert manager.stats()["pending_calls"] == baseline + 1
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(future, timeout=0.01)
+    await asyncio.sleep(0)
+
+    assert "slow" not in manager.active_connections[connection_id].pending_calls
+    assert manager.stats()["pending_calls"] == baseline
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_response_is_routed_to_its_connection() -> None:
+    manager = ConnectionManager()
+    first = await manager.connect(FakeSocket(), tools={})
+    second = await manager.connect(FakeSocket(), tools={})
+
+    future = await manager.call_tool(first, "shared-id", "echo", {})
+    manager.handle_response("shared-id", "wrong", connection_id=second)
+    assert not future.done()
+
+    manager.handle_response("shared-id", "right", connection_id=first)
+    assert await future == "right"
+    manager.disconnect(first)
+    manager.disconnect(second)
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_only_its_calls() -> None:
+    manager = ConnectionManager()
+    first = await manager.connect(FakeSocket(), tools={})
+    second = await manager.connect(FakeSocket(), tools={})
+    dropped = await manager.call_tool(first, "d-1", "echo", {})
+    kept = await manager.call_tool(second, "k-1", "echo", {})
+
+    manager.disconnect(first)
+
+    assert dropped.cancelled()
+    assert not kept.done()
+    manager.disconnect(second)
+
+
+@pytest.mark.asyncio
+async def test_unresolved_call_expires_and_is_counted_as_leaked() -> None:
+    manager = ConnectionManager()
+    connection_id = await manager.connect(FakeSocket(), tools={})
+    leaked_before = manager.stats()["leaked_futures"]
+    ttl, manager.pending_call_ttl = manager.pending_call_ttl, 0.01
+    try:
+        future = await manager.call_tool(connection_id, "orphan", "echo", {})
+        await asyncio.sleep(0.05)
+    finally:
+        manager.pending_call_ttl = ttl
+
+    assert future.cancelled()
+    assert manager.stats()["leaked_futures"] == leaked_before + 1
+    assert not manager.active_connections[connection_id].pending_calls
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_pending_calls_are_bounded_per_connection() -> None:
+    manager = ConnectionManager()
+    connection_id = await manager.connect(FakeSocket(), tools={})
+    limit, manager.max_pending_calls = manager.max_pending_calls, 2
+    try:
+        await manager.call_tool(connection_id, "b-1", "echo", {})
+        await manager.call_tool(connection_id, "b-2", "echo", {})
+        with pytest.raises(PendingCallLimitError):
+            await manager.call_tool(connection_id, "b-3", "echo", {})
+    finally:
+        manager.max_pending_calls = limit
+        manager.disconnect(connection_id)
@@ -0,0 +1,127 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from react_agent.context import (
+    SUMMARY_PREFIX,
+    SummarizePolicy,
+    TokenCounter,
+    TrimPolicy,
+    group_into_units,
+)
+
+
+def _history(turns: int) -> list:
+    messages = [HumanMessage(content="task " * 10, id="h0")]
+    for i in range(turns):
+        messages.append(
+            AIMessage(
+                content="",
+                id=f"a{i}",
+                tool_calls=[{"name": "read", "args": {"i": i}, "id": f"call{i}"}],
+            )
+        )
+        messages.append(ToolMessage(content="x" * 400, tool_call_id=f"call{i}", id=f"t{i}"))
+    return messages
+
+
+def test_tool_call_and_results_form_one_unit() -> None:
+    units = group_into_units(_history(2))
+
+    assert [[m.id for m in unit] for unit in units] == [["h0"], ["a0", "t0"], ["a1", "t1"]]
+
+
+def test_token_counter_caches_by_message_id() -> None:
+    calls = []
+
+    def count(messages):
+        calls.append(messages)
+        return 7
+
+    counter = TokenCounter(count_fn=count)
+    message = HumanMessage(content="hello", id="m1")
+    assert counter.count(message) == 7
+    assert counter.count(HumanMessage(content="hello", id="m1")) == 7
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_trim_policy_keeps_pinned_task_and_tool_pairs() -> None:
+    messages = _history(10)
+    counter = TokenCounter()
+
+    window = await TrimPolicy(low_watermark=0.5).fit(messages, 600, 0, counter, "", "")
+
+    ids = [m.id for m in window.messages]
+    assert ids[0] == "h0"
+    assert ids[-2:] == ["a9", "t9"]
+    for message in window.messages:
+        if isinstance(message, ToolMessage):
+            assert f"a{message.id[1:]}" in ids
+    assert window.dropped == len(messages) - len(ids)
+
+
+@pytest.mark.asyncio
+async def test_summarize_policy_summarizes_only_newly_dropped_messages() -> None:
+    seen = []
+
+    async def summarizer(previous, dropped):
+        seen.append((previous, [m.id for m in dropped]))
+        return f"summary through {dropped[-1].id}"
+
+    policy = SummarizePolicy(summarizer, low_watermark=0.5)
+    counter = TokenCounter()
+    messages = _history(10)
+
+    first = await policy.fit(messages, 600, 0, counter, "", "")
+    assert first.messages[0].content == SUMMARY_PREFIX + first.summary
+    assert first.summary_through_id == seen[0][1][-1]
+
+    # Reusing the stored summary: nothing new to summarize while under budget
+    second = await policy.fit(messages, 600, 0, counter, first.summary, first.summary_through_id)
+    assert second.summary is None
+    assert len(seen) == 1
+
+    more = messages + _history(14)[21:]
+    third = await policy.fit(more, 600, 0, counter, first.summary, first.summary_through_id)
+    assert seen[1][0] == first.summary
+    assert seen[1][1][0] not in seen[0][1]
+    assert third.summary_through_id == seen[1][1][-1]
+
+
+@pytest.mark.asyncio
+async def test_trim_policy_keeps_its_cut_until_the_window_overflows() -> None:
+    policy = TrimPolicy(low_watermark=0.5)
+    counter = TokenCounter()
+    history = _history(14)
+
+    first = await policy.fit(history[:21], 600, 0, counter, "", "")
+    assert first.trimmed_through_id is not None
+    cut = first.trimmed_through_id
+    starts = []
+    for end in range(23, len(history) + 1, 2):
+        window = await policy.fit(history[:end], 600, 0, counter, "", "", cut)
+        if window.trimmed_through_id is not None:
+            cut = window.trimmed_through_id
+        starts.append((window.messages[1].id, window.trimmed_through_id is not None))
+
+    # The window start only moves on the steps that produced a new cut
+    for (previous, _), (current, moved) in zip(starts, starts[1:]):
+        assert moved or current == previous
+    assert starts[0] == (first.messages[1].id, False)
+
+
+def test_token_counter_counts_tool_schemas_once_per_toolset() -> None:
+    calls = []
+
+    def count(messages):
+        calls.append(messages)
+        return len(messages[0].content) // 4
+
+    counter = TokenCounter(count_fn=count)
+    tools = [{"type": "function", "function": {"name": "read", "description": "Read a file " * 50, "parameters": {}}}]
+
+    tokens = counter.count_tools(tools)
+    assert tokens > 100
+    assert counter.count_tools(list(tools)) == tokens
+    assert counter.count_tools([]) == 0
+    assert len(calls) == 1
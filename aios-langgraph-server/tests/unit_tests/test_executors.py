@@ -0,0 +1,208 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from react_agent.executors import (
+    SpeculativeToolDispatcher,
+    ToolTimeoutError,
+    WebSocketToolExecutor,
+)
+from react_agent.web.connection import ConnectionManager
+from react_agent.web.result_stream import ToolResultStream
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent: list = []
+
+    async def send_json(self, data) -> None:
+        self.sent.append(data)
+
+
+@pytest.mark.asyncio
+async def test_execute_many_runs_concurrently_and_keeps_order() -> None:
+    manager = ConnectionManager()
+    socket = FakeSocket()
+    connection_id = await manager.connect(socket, tools={})
+    executor = WebSocketToolExecutor(connection_manager=manager)
+    calls = [{"id": f"call-{i}", "name": "echo", "args": {"i": i}} for i in range(3)]
+
+    task = asyncio.create_task(
+        executor.execute_many(connection_id, calls, timeout=0.2, max_concurrency=3)
+    )
+    for _ in range(5):
+        await asyncio.sleep(0)
+    # All three calls are on the wire before any response arrives
+    assert [m["tool_call_id"] for m in socket.sent] == ["call-0", "call-1", "call-2"]
+
+    manager.handle_response("call-2", "two")
+    manager.handle_response("call-0", "zero")
+    results = await task
+
+    assert results[0] == "zero"
+    assert isinstance(results[1], ToolTimeoutError)
+    assert results[2] == "two"
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_execute_many_respects_connection_cap() -> None:
+    manager = ConnectionManager()
+    socket = FakeSocket()
+    connection_id = await manager.connect(socket, tools={})
+    executor = WebSocketToolExecutor(connection_manager=manager)
+    calls = [{"id": f"cap-{i}", "name": "echo", "args": {}} for i in range(3)]
+
+    task = asyncio.create_task(
+        executor.execute_many(connection_id, calls, timeout=1.0, max_concurrency=1)
+    )
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert len(socket.sent) == 1
+
+    for i in range(3):
+        while len(socket.sent) <= i:
+            await asyncio.sleep(0)
+        # Never more than one call on the wire without a response
+        assert len(socket.sent) == i + 1
+        manager.handle_response(f"cap-{i}", i)
+    assert await task == [0, 1, 2]
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_speculative_dispatch_is_collected_by_executor() -> None:
+    manager = ConnectionManager()
+    socket = FakeSocket()
+    connection_id = await manager.connect(socket, tools={})
+    dispatcher = SpeculativeToolDispatcher(connection_manager=manager)
+    listener = dispatcher.stream_listener(connection_id)
+
+    partial = AIMessageChunk(
+        content="", tool_call_chunks=[{"name": "read", "args": '{"path": "/a', "id": "spec-1", "index": 0}]
+    )
+    listener(partial, partial)
+    await asyncio.sleep(0)
+    assert socket.sent == []
+
+    rest = AIMessageChunk(
+        content="", tool_call_chunks=[{"name": None, "args": '"}', "id": None, "index": 0}]
+    )
+    listener(rest, partial + rest)
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert socket.sent[0]["data"] == {"name": "read", "arguments": {"path": "/a"}}
+
+    manager.handle_response("spec-1", "contents")
+    executor = WebSocketToolExecutor(connection_manager=manager, speculative_dispatcher=dispatcher)
+    result = await executor.execute(connection_id, "spec-1", "read", {"path": "/a"}, timeout=1.0)
+
+    assert result == "contents"
+    assert len(socket.sent) == 1
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_speculative_dispatch_takes_a_call_slot() -> None:
+    manager = ConnectionManager()
+    socket = FakeSocket()
+    connection_id = await manager.connect(socket, tools={})
+    dispatcher = SpeculativeToolDispatcher(connection_manager=manager)
+
+    dispatcher.dispatch(connection_id, {"id": "slot-0", "name": "read", "args": {}}, max_concurrency=1)
+    dispatcher.dispatch(connection_id, {"id": "slot-1", "name": "read", "args": {}}, max_concurrency=1)
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert [m["tool_call_id"] for m in socket.sent] == ["slot-0"]
+
+    manager.handle_response("slot-0", "zero")
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert [m["tool_call_id"] for m in socket.sent] == ["slot-0", "slot-1"]
+    dispatcher.discard(connection_id, ["slot-0", "slot-1"])
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_discarding_a_resolved_speculative_call_closes_its_stream() -> None:
+    manager = ConnectionManager()
+    connection_id = await manager.connect(FakeSocket(), tools={})
+    dispatcher = SpeculativeToolDispatcher(connection_manager=manager)
+    dispatcher.dispatch(connection_id, {"id": "spec-3", "name": "read", "args": {}})
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    stream = ToolResultStream("spec-3")
+    manager.handle_response("spec-3", stream)
+    for _ in range(5):
+        await asyncio.sleep(0)
+    dispatcher.discard(connection_id, ["spec-3"])
+
+    assert stream.closed
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_speculative_calls_missing_from_final_response_are_cancelled() -> None:
+    manager = ConnectionManager()
+    connection_id = await manager.connect(FakeSocket(), tools={})
+    dispatcher = SpeculativeToolDispatcher(connection_manager=manager)
+    listener = dispatcher.stream_listener(connection_id)
+
+    chunk = AIMessageChunk(
+        content="", tool_call_chunks=[{"name": "read", "args": "{}", "id": "spec-2", "index": 0}]
+    )
+    listener(chunk, chunk)
+    assert dispatcher.has(connection_id, "spec-2")
+
+    listener.retain([])
+    assert not dispatcher.has(connection_id, "spec-2")
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_execute_many_timeout_includes_waiting_for_a_slot() -> None:
+    manager = ConnectionManager()
+    socket = FakeSocket()
+    connection_id = await manager.connect(socket, tools={})
+    executor = WebSocketToolExecutor(connection_manager=manager)
+    calls = [{"id": f"wait-{i}", "name": "echo", "args": {}} for i in range(2)]
+
+    task = asyncio.create_task(
+        executor.execute_many(connection_id, calls, timeout=0.1, max_concurrency=1)
+    )
+    await asyncio.sleep(0.08)
+    manager.handle_response("wait-0", "zero")
+    results = await asyncio.wait_for(task, timeout=0.5)
+
+    # The second call waited 80 ms for the slot, leaving it only 20 ms for the response
+    assert results[0] == "zero"
+    assert isinstance(results[1], ToolTimeoutError)
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_disconnect_drops_the_connections_speculative_calls() -> None:
+    manager = ConnectionManager()
+    connection_id = await manager.connect(FakeSocket(), tools={})
+    other_id = await manager.connect(FakeSocket(), tools={})
+    dispatcher = SpeculativeToolDispatcher(connection_manager=manager)
+    dispatcher.dispatch(connection_id, {"id": "gone-0", "name": "read", "args": {}}, max_concurrency=1)
+    dispatcher.dispatch(connection_id, {"id": "gone-1", "name": "read", "args": {}}, max_concurrency=1)
+    dispatcher.dispatch(other_id, {"id": "kept", "name": "read", "args": {}})
+    for _ in range(5):
+        await asyncio.sleep(0)
+    _, waiting = dispatcher._calls[(connection_id, "gone-1")]  # queued behind gone-0 for the call slot
+
+    manager.disconnect(connection_id)
+    dispatcher.drop_connection(connection_id)
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert not dispatcher.has(connection_id, "gone-0")
+    assert not dispatcher.has(connection_id, "gone-1")
+    assert waiting.cancelled()
+    assert dispatcher.has(other_id, "kept")
+    dispatcher.drop_connection(other_id)
+    manager.disconnect(other_id)
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from react_agent.graph import _invoke_llm_with_retry_and_fallback
+from react_agent.resilience import get_hedge_stats
+from react_agent.streaming import make_streaming_invoke
+
+
+async def _ok(messages, config):
+    return "primary"
+
+
+async def _fail(messages, config):
+    raise RuntimeError("primary down")
+
+
+async def _fallback_ok(messages, config):
+    return "fallback"
+
+
+@pytest.mark.asyncio
+async def test_fallback_is_not_loaded_when_primary_succeeds() -> None:
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return _fallback_ok
+
+    result = await _invoke_llm_with_retry_and_fallback(_ok, loader, "p/a", "p/b", [], {})
+
+    assert result == "primary"
+    assert loads == []
+
+
+@pytest.mark.asyncio
+async def test_fallback_is_loaded_after_primary_failure() -> None:
+    result = await _invoke_llm_with_retry_and_fallback(
+        _fail, lambda: _fallback_ok, "p/a", "p/b", [], {}
+    )
+
+    assert result == "fallback"
+
+
+@pytest.mark.asyncio
+async def test_primary_error_is_raised_without_fallback() -> None:
+    with pytest.raises(RuntimeError, match="primary down"):
+        await _invoke_llm_with_retry_and_fallback(_fail, None, "p/a", None, [], {})
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_takes_faster_fallback_and_cancels_primary() -> None:
+    cancelled = []
+
+    async def slow_primary(messages, config):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "primary"
+
+    wins_before = get_hedge_stats().snapshot()["wins"].get("p/b", 0)
+    result = await _invoke_llm_with_retry_and_fallback(
+        slow_primary, lambda: _fallback_ok, "p/a", "p/b", [], {}, hedge_delay=0.01
+    )
+    await asyncio.sleep(0)
+
+    assert result == "fallback"
+    assert cancelled == [True]
+    assert get_hedge_stats().snapshot()["wins"]["p/b"] == wins_before + 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_is_not_fired_for_fast_primary() -> None:
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return _fallback_ok
+
+    result = await _invoke_llm_with_retry_and_fallback(
+        _ok, loader, "p/a", "p/b", [], {}, hedge_delay=1.0
+    )
+
+    assert result == "primary"
+    assert loads == []
+
+
+class DelayedStreamingModel:
+    def __init__(self, name, first_delay, rest_delay=0.0) -> None:
+        self.name = name
+        self.first_delay = first_delay
+        self.rest_delay = rest_delay
+        self.cancelled = False
+
+    async def astream(self, messages, config):
+        try:
+            await asyncio.sleep(self.first_delay)
+            yield AIMessageChunk(content=f"{self.name} ", id=f"run-{self.name}")
+            await asyncio.sleep(self.rest_delay)
+            yield AIMessageChunk(content="done", id=f"run-{self.name}")
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@pytest.mark.asyncio
+async def test_streaming_primary_is_not_hedged_once_it_produces_output() -> None:
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return make_streaming_invoke(DelayedStreamingModel("fallback", 0), "p/b")
+
+    primary = make_streaming_invoke(DelayedStreamingModel("primary", 0, rest_delay=0.05), "p/a")
+    result = await _invoke_llm_with_retry_and_fallback(primary, loader, "p/a", "p/b", [], {}, hedge_delay=0.01)
+
+    assert result.content == "primary done"
+    assert loads == []
+
+
+@pytest.mark.asyncio
+async def test_hedge_commits_to_the_first_model_to_stream() -> None:
+    primary_model = DelayedStreamingModel("primary", 5)
+    fallback_model = DelayedStreamingModel("fallback", 0, rest_delay=0.05)
+    primary = make_streaming_invoke(primary_model, "p/a")
+
+    result = await _invoke_llm_with_retry_and_fallback(
+        primary, lambda: make_streaming_invoke(fallback_model, "p/b"), "p/a", "p/b", [], {}, hedge_delay=0.01
+    )
+    await asyncio.sleep(0)
+
+    assert result.content == "fallback done"
+    assert primary_model.cancelled
+    assert not fallback_model.cancelled
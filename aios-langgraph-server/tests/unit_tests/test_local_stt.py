@@ -0,0 +1,98 @@
+import pytest
+
+from react_agent.web.stt.config import STTSettings
+from react_agent.web.stt.providers.local import (
+    LocalEngineWorkerPool,
+    LocalServiceProvider,
+)
+from react_agent.web.stt.providers.registry import available_providers, create_provider
+
+PCM_OPTIONS = {"encoding": "linear16", "sample_rate": 16000, "channels": 1}
+
+
+class FakeRecognizer:
+    """Reports the bytes received so far, and a final transcript on finish."""
+
+    def __init__(self, sample_rate: int) -> None:
+        self.sample_rate = sample_rate
+        self.received = 0
+
+    def accept(self, pcm: bytes):
+        self.received += len(pcm)
+        return [("interim", str(self.received))]
+
+    def finish(self):
+        return [("final", f"{self.received} bytes at {self.sample_rate}")]
+
+
+class BrokenRecognizer:
+    def __init__(self, sample_rate: int) -> None:
+        raise OSError("model not found")
+
+
+class Messages:
+    def __init__(self) -> None:
+        self.sent: list = []
+
+    async def __call__(self, data) -> None:
+        self.sent.append(data)
+
+
+@pytest.fixture
+def engine_pool():
+    pool = LocalEngineWorkerPool(FakeRecognizer, workers=1)
+    yield pool
+    pool.stop()
+
+
+def test_unknown_provider_is_rejected():
+    assert {"deepgram", "local"} <= set(available_providers())
+    with pytest.raises(ValueError):
+        create_provider("nope", STTSettings(), Messages())
+
+
+def test_local_provider_without_engine_is_a_configuration_error():
+    with pytest.raises(ValueError):
+        create_provider("local", STTSettings(stt_local_engine="missing.module:engine"), Messages())
+
+
+@pytest.mark.asyncio
+async def test_local_provider_streams_transcripts(engine_pool):
+    messages = Messages()
+    provider = LocalServiceProvider(STTSettings(), messages, engine_pool=engine_pool)
+    await provider.connect(PCM_OPTIONS)
+    await provider.send_audio(b"\x00" * 320)
+    await provider.send_audio(b"\x00" * 320)
+    await provider.finish()
+
+    assert messages.sent == [
+        {"type": "interim_transcript", "transcript": "320"},
+        {"type": "interim_transcript", "transcript": "640"},
+        {"type": "final_transcript", "transcript": "640 bytes at 16000"},
+    ]
+    assert engine_pool.stats() == {"workers": 1, "sessions": 0}
+
+
+@pytest.mark.asyncio
+async def test_local_provider_requires_pcm(engine_pool):
+    provider = LocalServiceProvider(STTSettings(), Messages(), engine_pool=engine_pool)
+    with pytest.raises(ConnectionError):
+        await provider.connect({})
+    assert not engine_pool.running
+
+
+@pytest.mark.asyncio
+async def test_local_provider_fails_to_connect_when_the_engine_cannot_open():
+    pool = LocalEngineWorkerPool(BrokenRecognizer, workers=1)
+    messages = Messages()
+    provider = LocalServiceProvider(STTSettings(), messages, engine_pool=pool)
+    try:
+        with pytest.raises(ConnectionError, match="model not found"):
+            await provider.connect(PCM_OPTIONS)
+        await provider.send_audio(b"\x00" * 320)
+        await provider.finish()
+
+        assert pool.stats() == {"workers": 1, "sessions": 0}
+        assert messages.sent == []
+    finally:
+        pool.stop()
@@ -0,0 +1,24 @@
+import logging
+
+from react_agent.log_utils import clip_for_log
+
+
+def test_clip_for_log_caps_large_payloads() -> None:
+    payload = {"content": "x" * 100_000, "rows": list(range(10_000))}
+
+    text = str(clip_for_log(payload, limit=100))
+
+    assert len(text) <= 103
+    assert str(clip_for_log(b"\x00" * 42)) == "<42 bytes>"
+    assert str(clip_for_log("short")) == "short"
+    assert str(clip_for_log(payload, limit=0)) == "<dict>"
+
+
+def test_clip_for_log_is_not_formatted_when_disabled(caplog) -> None:
+    class Exploding:
+        def __repr__(self) -> str:
+            raise AssertionError("formatted")
+
+    logger = logging.getLogger("test_log_utils")
+    with caplog.at_level(logging.INFO, logger="test_log_utils"):
+        logger.debug("payload %s", clip_for_log(Exploding()))
@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from react_agent.model_registry import ModelRegistry
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeModel:
+    def __init__(self, name: str, **kwargs) -> None:
+        self.name = name
+        self.kwargs = kwargs
+        self.root_async_client = FakeClient()
+
+
+def test_registry_reuses_instances_per_name_and_kwargs() -> None:
+    registry = ModelRegistry(max_size=4)
+    first = registry.get_or_create("openai/gpt-4.1", {"temperature": 0}, FakeModel)
+    again = registry.get_or_create("openai/gpt-4.1", {"temperature": 0}, FakeModel)
+    other = registry.get_or_create("openai/gpt-4.1", {"temperature": 1}, FakeModel)
+
+    assert first is again
+    assert other is not first
+    assert registry.stats()["hits"] == 1
+    assert registry.stats()["misses"] == 2
+
+
+def test_registry_evicts_least_recently_used() -> None:
+    registry = ModelRegistry(max_size=2)
+    a = registry.get_or_create("p/a", {}, FakeModel)
+    registry.get_or_create("p/b", {}, FakeModel)
+    registry.get_or_create("p/a", {}, FakeModel)
+    registry.get_or_create("p/c", {}, FakeModel)
+
+    assert registry.get_or_create("p/a", {}, FakeModel) is a
+    assert registry.stats()["size"] == 2
+    assert [m.name for m in registry.evict("p/b")] == []
+
+
+@pytest.mark.asyncio
+async def test_registry_aclose_closes_clients() -> None:
+    registry = ModelRegistry()
+    model = registry.get_or_create("p/a", {}, FakeModel)
+    await registry.aclose()
+
+    assert model.root_async_client.closed
+    assert registry.stats()["size"] == 0
+
+
+class BindingModel(FakeModel):
+    def __init__(self, name: str, **kwargs) -> None:
+        super().__init__(name, **kwargs)
+        self.bind_calls = 0
+
+    def bind_tools(self, tools):
+        self.bind_calls += 1
+        return ("bound", self, tuple(tools))
+
+
+def _tool_dict(name: str, description: str = "") -> dict:
+    return {"name": name, "description": description, "schema": {"type": "object"}}
+
+
+def test_registry_memoizes_tool_binding_by_schema() -> None:
+    registry = ModelRegistry()
+    tools = [_tool_dict("read_file"), _tool_dict("list_dir")]
+    first = registry.get_or_bind_tools("p/a", {}, tools, BindingModel)
+    same_schemas = [_tool_dict("read_file"), _tool_dict("list_dir")]
+    again = registry.get_or_bind_tools("p/a", {}, same_schemas, BindingModel)
+    changed = registry.get_or_bind_tools("p/a", {}, [_tool_dict("read_file", "new")], BindingModel)
+
+    assert first is again
+    assert changed is not first
+    assert first[1].bind_calls == 2
+    stats = registry.stats()
+    assert (stats["bind_hits"], stats["bind_misses"]) == (1, 2)
+    assert stats["bind_hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_slow_factory_does_not_block_other_models() -> None:
+    registry = ModelRegistry()
+    cached = registry.get_or_create("p/cached", {}, FakeModel)
+    building, release = threading.Event(), threading.Event()
+    builds = []
+
+    def slow_factory(name: str, **kwargs) -> FakeModel:
+        builds.append(name)
+        building.set()
+        release.wait(5)
+        return FakeModel(name, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        first = pool.submit(registry.get_or_create, "p/slow", {}, slow_factory)
+        assert building.wait(5)
+        second = pool.submit(registry.get_or_create, "p/slow", {}, slow_factory)
+
+        # Lookups of other models go through while the build is in progress
+        assert pool.submit(registry.get_or_create, "p/cached", {}, FakeModel).result(1) is cached
+        release.set()
+        assert first.result(5) is second.result(5)
+
+    assert builds == ["p/slow"]
+    assert (registry.stats()["hits"], registry.stats()["misses"]) == (2, 2)
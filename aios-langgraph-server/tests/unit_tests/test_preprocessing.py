@@ -0,0 +1,74 @@
+import wave
+
+import pytest
+
+from react_agent.web.stt.preprocessing import (
+    AudioPreprocessor,
+    PcmPreprocessor,
+    benchmark_wav,
+    negotiate_preprocessor,
+)
+
+np = pytest.importorskip("numpy")
+
+
+def _sine(rate: int, seconds: float, frequency: float = 440.0, channels: int = 1) -> "np.ndarray":
+    t = np.arange(int(rate * seconds)) / rate
+    tone = (0.5 * np.sin(2 * np.pi * frequency * t) * 32767).astype("<i2")
+    return np.repeat(tone[:, None], channels, axis=1)
+
+
+def _dominant_frequency(pcm: bytes, rate: int) -> float:
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.float64)
+    spectrum = np.abs(np.fft.rfft(samples))
+    return float(np.fft.rfftfreq(len(samples), 1 / rate)[spectrum.argmax()])
+
+
+def test_negotiation_falls_back_to_passthrough() -> None:
+    assert type(negotiate_preprocessor(None)) is AudioPreprocessor
+    assert type(negotiate_preprocessor({"type": "config", "encoding": "webm"})) is AudioPreprocessor
+    assert type(negotiate_preprocessor({"encoding": "linear16", "sample_rate": "fast"})) is AudioPreprocessor
+
+    preprocessor = negotiate_preprocessor({"type": "config", "encoding": "float32", "sample_rate": 44100})
+    assert isinstance(preprocessor, PcmPreprocessor)
+    assert preprocessor.live_options == {"encoding": "linear16", "sample_rate": 16000, "channels": 1}
+
+
+def test_stereo_48k_is_downsampled_to_16k_mono() -> None:
+    audio = _sine(48000, 1.0, channels=2).tobytes()
+    preprocessor = negotiate_preprocessor({"encoding": "linear16", "sample_rate": 48000, "channels": 2})
+
+    output = preprocessor.process(audio)
+
+    assert abs(len(output) - 16000 * 2) <= 2
+    assert abs(_dominant_frequency(output, 16000) - 440) <= 2
+
+
+def test_frame_boundaries_do_not_change_the_output() -> None:
+    audio = _sine(44100, 0.5, frequency=1000).tobytes()
+    fmt = {"encoding": "linear16", "sample_rate": 44100}
+    whole = negotiate_preprocessor(fmt).process(audio)
+
+    chunked = negotiate_preprocessor(fmt)
+    # Odd sizes split samples across frames
+    parts = [chunked.process(audio[offset:offset + 883]) for offset in range(0, len(audio), 883)]
+    streamed = b"".join(parts)
+
+    assert abs(len(streamed) - len(whole)) <= 2
+    n = min(len(whole), len(streamed)) // 2
+    difference = np.frombuffer(whole, "<i2")[:n].astype(int) - np.frombuffer(streamed, "<i2")[:n]
+    assert np.abs(difference).max() <= 2
+
+
+def test_benchmark_reads_wav_fixtures(tmp_path) -> None:
+    path = tmp_path / "speech.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(48000)
+        wav.writeframes(_sine(48000, 0.5, channels=2).tobytes())
+
+    report = benchmark_wav(str(path))
+
+    assert report["audio_seconds"] == pytest.approx(0.5)
+    assert report["bandwidth_ratio"] == pytest.approx(1 / 6, rel=0.01)
@@ -0,0 +1,57 @@
+from langchain_core.messages import AIMessage
+
+from react_agent import prompt_cache
+from react_agent.prompt_cache import (
+    cache_bind_kwargs,
+    cached_token_usage,
+    stable_tool_order,
+    system_message,
+)
+
+
+class NamedTool:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+def test_system_message_marks_cache_breakpoint_for_anthropic_only() -> None:
+    anthropic = system_message("anthropic/claude-3-5-sonnet-20240620", "prompt")
+    openai = system_message("openai/gpt-4.1", "prompt")
+
+    assert anthropic["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert openai == {"role": "system", "content": "prompt"}
+    assert system_message("anthropic/x", "prompt", enabled=False)["content"] == "prompt"
+
+
+def test_prompt_cache_key_is_stable_per_prefix(monkeypatch) -> None:
+    monkeypatch.setattr(prompt_cache, "_openai_accepts_prompt_cache_key", lambda: True)
+    first = cache_bind_kwargs("openai/gpt-4.1", "prompt", "tools-a")
+    again = cache_bind_kwargs("openai/gpt-4.1", "prompt", "tools-a")
+    other = cache_bind_kwargs("openai/gpt-4.1", "prompt", "tools-b")
+
+    assert first == again
+    assert first != other
+    assert cache_bind_kwargs("google_genai/gemini", "prompt", "tools-a") == {}
+
+
+def test_prompt_cache_key_needs_sdk_support(monkeypatch) -> None:
+    # Older openai SDKs reject unknown create() kwargs
+    monkeypatch.setattr(prompt_cache, "_openai_accepts_prompt_cache_key", lambda: False)
+    assert cache_bind_kwargs("openai/gpt-4.1", "prompt", "tools-a") == {}
+
+
+def test_tool_order_and_cached_usage() -> None:
+    tools = [NamedTool("b"), NamedTool("a")]
+    assert [t.name for t in stable_tool_order(tools)] == ["a", "b"]
+
+    message = AIMessage(
+        content="",
+        usage_metadata={
+            "input_tokens": 1000,
+            "output_tokens": 10,
+            "total_tokens": 1010,
+            "input_token_details": {"cache_read": 800},
+        },
+    )
+    assert cached_token_usage(message) == (800, 1000)
+    assert cached_token_usage(AIMessage(content="")) == (0, 0)
@@ -0,0 +1,94 @@
+import pytest
+
+from react_agent.web.protocol import (
+    FLAG_COMPRESSED,
+    ProtocolError,
+    WireProtocol,
+    decode_frame,
+    encode_frame,
+    negotiate,
+    peek_tool_call_id,
+    send_message,
+)
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent: list = []
+
+    async def send_json(self, data) -> None:
+        self.sent.append(("json", data))
+
+    async def send_text(self, data) -> None:
+        self.sent.append(("text", data))
+
+    async def send_bytes(self, data) -> None:
+        self.sent.append(("bytes", data))
+
+
+def test_negotiation_defaults_to_json_text() -> None:
+    assert negotiate({}) == WireProtocol()
+    assert negotiate({"encoding": "bogus", "compression": "bogus"}) == WireProtocol()
+    assert negotiate({"compression": "zstd"}).framing == "binary"
+
+
+def test_binary_frame_carries_raw_attachments() -> None:
+    protocol = WireProtocol(framing="binary")
+    image = bytes(range(256)) * 4
+    message = {"tool_call_id": "c1", "response": {"image": image, "caption": "cat"}}
+
+    frame = encode_frame(protocol, message)
+
+    assert image in frame  # not base64-encoded
+    assert decode_frame(protocol, frame) == message
+
+
+def test_large_bodies_are_compressed_above_threshold() -> None:
+    pytest.importorskip("zstandard")
+    protocol = WireProtocol(framing="binary", compression="zstd", compression_threshold=1024)
+    small = encode_frame(protocol, {"text": "a" * 10})
+    large_message = {"text": "a" * 100_000}
+    large = encode_frame(protocol, large_message)
+
+    assert not small[0] & FLAG_COMPRESSED
+    assert large[0] & FLAG_COMPRESSED
+    assert len(large) < 1000
+    assert decode_frame(protocol, large) == large_message
+
+
+def test_msgpack_round_trip() -> None:
+    pytest.importorskip("msgpack")
+    protocol = negotiate({"encoding": "msgpack"})
+    message = {"tool_call_id": "c2", "response": [1, "two", {"blob": b"\x00\x01"}]}
+
+    assert decode_frame(protocol, encode_frame(protocol, message)) == message
+
+
+def test_text_frames_decode_base64_bytes_and_reject_garbage() -> None:
+    protocol = WireProtocol()
+    frame = encode_frame(protocol, {"data": b"\xff"})
+
+    assert decode_frame(protocol, frame) == {"data": b"\xff"}
+    with pytest.raises(ProtocolError):
+        decode_frame(protocol, "{not json")
+    with pytest.raises(ProtocolError):
+        decode_frame(WireProtocol(framing="binary"), b"\x00\x00\x00\x00\x10abc")
+
+
+@pytest.mark.asyncio
+async def test_send_message_uses_negotiated_framing() -> None:
+    socket = FakeSocket()
+
+    await send_message(socket, WireProtocol(), {"a": 1})
+    await send_message(socket, WireProtocol(framing="binary"), {"a": 1})
+
+    assert socket.sent[0] == ("json", {"a": 1})
+    assert socket.sent[1][0] == "bytes"
+
+
+def test_peek_tool_call_id_reads_only_the_frame_start() -> None:
+    frame = '{"tool_call_id": "call-\\"7", "response": "' + "x" * 100_000 + '"}'
+
+    assert peek_tool_call_id(frame) == 'call-"7'
+    assert peek_tool_call_id('{"response": "' + "x" * 1000 + '", "tool_call_id": "late"}') is None
+    assert peek_tool_call_id(b"\x00\x00") is None
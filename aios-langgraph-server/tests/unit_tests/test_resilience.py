@@ -0,0 +1,124 @@
+import pytest
+
+from react_agent.graph import _invoke_llm_with_retry_and_fallback
+from react_agent.resilience import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitBreakerSettings,
+    CircuitOpenError,
+    LatencyTracker,
+)
+
+
+def test_latency_tracker_percentile_needs_min_samples() -> None:
+    tracker = LatencyTracker(window_size=100, min_samples=10)
+    for i in range(9):
+        tracker.observe("p/a", float(i))
+    assert tracker.percentile("p/a", 0.95) is None
+
+    for i in range(9, 100):
+        tracker.observe("p/a", float(i))
+    assert tracker.percentile("p/a", 0.95) == 94.0
+    assert tracker.percentile("p/b", 0.95) is None
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_circuit_breaker_opens_half_opens_and_closes() -> None:
+    clock = FakeClock()
+    settings = CircuitBreakerSettings(window_size=4, min_calls=4, failure_rate=0.5, open_seconds=10)
+    breaker = CircuitBreaker(settings, clock=clock)
+
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_routes_straight_to_fallback() -> None:
+    clock = FakeClock()
+    registry = CircuitBreakerRegistry(clock=clock)
+    settings = CircuitBreakerSettings(window_size=2, min_calls=2, failure_rate=1.0, open_seconds=60)
+    primary_calls = []
+
+    async def failing_primary(messages, config):
+        primary_calls.append(1)
+        raise RuntimeError("provider down")
+
+    async def fallback(messages, config):
+        return "fallback"
+
+    for _ in range(2):
+        result = await _invoke_llm_with_retry_and_fallback(
+            failing_primary, lambda: fallback, "p/a", "p/b", [], {},
+            circuit_breakers=registry, circuit_breaker_settings=settings,
+        )
+        assert result == "fallback"
+    assert registry.snapshot()["p/a"] == CircuitBreaker.OPEN
+
+    result = await _invoke_llm_with_retry_and_fallback(
+        failing_primary, lambda: fallback, "p/a", "p/b", [], {},
+        circuit_breakers=registry, circuit_breaker_settings=settings,
+    )
+    assert result == "fallback"
+    assert len(primary_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_open_fallback_circuit_is_not_called() -> None:
+    registry = CircuitBreakerRegistry(clock=FakeClock())
+    settings = CircuitBreakerSettings(window_size=2, min_calls=2, failure_rate=1.0, open_seconds=60)
+    for model in ("p/a", "p/b"):
+        breaker = registry.get(model, settings)
+        breaker.record_failure()
+        breaker.record_failure()
+    calls = []
+
+    async def model(messages, config):
+        calls.append(1)
+        return "unexpected"
+
+    with pytest.raises(CircuitOpenError):
+        await _invoke_llm_with_retry_and_fallback(
+            model, lambda: model, "p/a", "p/b", [], {},
+            circuit_breakers=registry, circuit_breaker_settings=settings,
+        )
+    assert calls == []
+
+    # With only the fallback open, a failing primary surfaces its own error
+    registry = CircuitBreakerRegistry(clock=FakeClock())
+    breaker = registry.get("p/b", settings)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    async def failing_primary(messages, config):
+        raise RuntimeError("provider down")
+
+    with pytest.raises(RuntimeError, match="provider down"):
+        await _invoke_llm_with_retry_and_fallback(
+            failing_primary, lambda: model, "p/a", "p/b", [], {},
+            circuit_breakers=registry, circuit_breaker_settings=settings,
+        )
+    assert calls == []
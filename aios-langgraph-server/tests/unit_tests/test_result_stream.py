@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from react_agent.blob_store import BlobStore
+from react_agent.executors import (
+    ToolExecutionError,
+    ToolTimeoutError,
+    WebSocketToolExecutor,
+)
+from react_agent.tool_results import ResultAssembler, SpilledResult, shape_tool_result
+from react_agent.web.connection import ConnectionManager
+from react_agent.web.result_stream import ToolResultStream
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent: list = []
+
+    async def send_json(self, data) -> None:
+        self.sent.append(data)
+
+
+async def _start_call(tool_call_id: str, timeout: float):
+    manager = ConnectionManager()
+    socket = FakeSocket()
+    connection_id = await manager.connect(socket, tools={})
+    executor = WebSocketToolExecutor(connection_manager=manager)
+    task = asyncio.create_task(executor.execute(connection_id, tool_call_id, "tail_log", {}, timeout=timeout))
+    while not socket.sent:
+        await asyncio.sleep(0)
+    return manager, connection_id, task
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_assembled_into_the_result() -> None:
+    manager, connection_id, task = await _start_call("s-1", timeout=1.0)
+
+    for frame in (
+        {"type": "tool_result_start", "tool_call_id": "s-1"},
+        {"type": "tool_result_chunk", "tool_call_id": "s-1", "data": "hello "},
+        {"type": "tool_result_chunk", "tool_call_id": "s-1", "data": "world"},
+        {"type": "tool_result_end", "tool_call_id": "s-1"},
+    ):
+        await manager.handle_stream_frame(frame, connection_id=connection_id)
+
+    assert await task == "hello world"
+    assert not manager.active_connections[connection_id].result_streams
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_progress_frames_extend_the_timeout() -> None:
+    manager, connection_id, task = await _start_call("s-2", timeout=0.1)
+
+    for _ in range(4):
+        await manager.handle_stream_frame({"type": "tool_progress", "tool_call_id": "s-2"}, connection_id=connection_id)
+        await asyncio.sleep(0.05)
+    await manager.handle_stream_frame({"type": "tool_result_chunk", "tool_call_id": "s-2", "data": "done"}, connection_id=connection_id)
+    await manager.handle_stream_frame({"type": "tool_result_end", "tool_call_id": "s-2"}, connection_id=connection_id)
+
+    assert await task == "done"
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_silent_stream_times_out_and_stream_error_fails_the_call() -> None:
+    manager, connection_id, task = await _start_call("s-3", timeout=0.05)
+    await manager.handle_stream_frame({"type": "tool_result_start", "tool_call_id": "s-3"}, connection_id=connection_id)
+    with pytest.raises(ToolTimeoutError):
+        await task
+    assert not manager.active_connections[connection_id].result_streams
+    manager.disconnect(connection_id)
+
+    manager, connection_id, task = await _start_call("s-4", timeout=1.0)
+    await manager.handle_stream_frame({"type": "tool_result_end", "tool_call_id": "s-4", "error": "disk full"}, connection_id=connection_id)
+    with pytest.raises(ToolExecutionError, match="disk full"):
+        await task
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_feed_waits_while_buffer_is_full() -> None:
+    stream = ToolResultStream("s-5", max_buffered_bytes=10)
+    await stream.feed("tool_result_chunk", "x" * 8)
+    blocked = asyncio.create_task(stream.feed("tool_result_chunk", "y" * 8))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    chunks = stream.chunks()
+    assert await chunks.__anext__() == "x" * 8
+    assert await blocked
+    assert await chunks.__anext__() == "y" * 8
+
+
+@pytest.mark.asyncio
+async def test_large_streams_spill_to_blob_store(tmp_path) -> None:
+    store = BlobStore(tmp_path)
+    assembler = ResultAssembler(store=store, memory_limit=100)
+    for i in range(50):
+        assembler.add(f"line {i:03d}\n")
+
+    result = assembler.result()
+    assert isinstance(result, SpilledResult)
+    content, artifact = await shape_tool_result("tail_log", result, 36, "tail", store=store)
+    assert content.startswith("line 046")
+    assert artifact["blob"]["size"] == result.ref.size == 450
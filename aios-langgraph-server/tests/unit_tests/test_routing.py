@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from react_agent.executors import (
+    ClientUnavailableError,
+    ToolTimeoutError,
+    WebSocketToolExecutor,
+)
+from react_agent.web.connection import ConnectionManager
+from react_agent.web.result_stream import START
+from react_agent.web.routing import (
+    InMemoryRoutingBackend,
+    InMemoryRoutingHub,
+    MessageDispatcher,
+    RedisRoutingBackend,
+)
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent: list = []
+
+    async def send_json(self, data) -> None:
+        self.sent.append(data)
+
+
+def _memory_backends():
+    hub = InMemoryRoutingHub()
+    return InMemoryRoutingBackend(hub), InMemoryRoutingBackend(hub)
+
+
+def _redis_backends():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    return (
+        RedisRoutingBackend(client=fakeredis.FakeAsyncRedis(server=server)),
+        RedisRoutingBackend(client=fakeredis.FakeAsyncRedis(server=server)),
+    )
+
+
+async def _wait_for(predicate, timeout: float = 1.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make_backends", [_memory_backends, _redis_backends], ids=["memory", "redis"])
+async def test_tool_call_is_routed_to_owning_node(make_backends) -> None:
+    graph_backend, socket_backend = make_backends()
+    graph_node, socket_node = ConnectionManager(), ConnectionManager()
+    await graph_node.start_routing(graph_backend)
+    await socket_node.start_routing(socket_backend)
+    socket = FakeSocket()
+    connection_id = await socket_node.connect(socket, tools={})
+    try:
+        executor = WebSocketToolExecutor(connection_manager=graph_node)
+        task = asyncio.create_task(executor.execute(connection_id, "routed-1", "echo", {"x": 1}, timeout=2.0))
+
+        await _wait_for(lambda: socket.sent)
+        assert socket.sent[0]["data"] == {"name": "echo", "arguments": {"x": 1}}
+        socket_node.handle_response("routed-1", {"ok": True}, connection_id=connection_id)
+
+        assert await task == {"ok": True}
+        await _wait_for(lambda: not graph_node.remote_connections[connection_id].pending_calls)
+    finally:
+        socket_node.disconnect(connection_id)
+        await graph_node.stop_routing()
+        await socket_node.stop_routing()
+
+
+@pytest.mark.asyncio
+async def test_unknown_connection_is_unavailable() -> None:
+    graph_backend, socket_backend = _memory_backends()
+    graph_node, socket_node = ConnectionManager(), ConnectionManager()
+    await graph_node.start_routing(graph_backend)
+    await socket_node.start_routing(socket_backend)
+    connection_id = await socket_node.connect(FakeSocket(), tools={})
+    socket_node.disconnect(connection_id)
+    await asyncio.sleep(0)
+    try:
+        executor = WebSocketToolExecutor(connection_manager=graph_node)
+        with pytest.raises(ClientUnavailableError):
+            await executor.execute(connection_id, "gone-1", "echo", {}, timeout=1.0)
+    finally:
+        await graph_node.stop_routing()
+        await socket_node.stop_routing()
+
+
+@pytest.mark.asyncio
+async def test_origin_timeout_cancels_call_on_owning_node() -> None:
+    graph_backend, socket_backend = _memory_backends()
+    graph_node, socket_node = ConnectionManager(), ConnectionManager()
+    await graph_node.start_routing(graph_backend)
+    await socket_node.start_routing(socket_backend)
+    socket = FakeSocket()
+    connection_id = await socket_node.connect(socket, tools={})
+    try:
+        executor = WebSocketToolExecutor(connection_manager=graph_node)
+        with pytest.raises(ToolTimeoutError):
+            await executor.execute(connection_id, "slow-1", "echo", {}, timeout=0.05)
+
+        assert socket.sent
+        await _wait_for(lambda: not socket_node.active_connections[connection_id].pending_calls)
+        assert not socket_node._routed_calls
+        # The client answering late is ignored on the owning node, not forwarded
+        socket_node.handle_response("slow-1", {"ok": True}, connection_id=connection_id)
+        await asyncio.sleep(0.01)
+        assert graph_node.stats()["late_responses"] == 0
+    finally:
+        socket_node.disconnect(connection_id)
+        await graph_node.stop_routing()
+        await socket_node.stop_routing()
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_stops_relaying_on_owning_node() -> None:
+    graph_backend, socket_backend = _memory_backends()
+    graph_node, socket_node = ConnectionManager(), ConnectionManager()
+    await graph_node.start_routing(graph_backend)
+    await socket_node.start_routing(socket_backend)
+    connection_id = await socket_node.connect(FakeSocket(), tools={})
+    try:
+        future = await graph_node.call_tool(connection_id, "stream-1", "cat", {})
+        await _wait_for(lambda: socket_node.expects("stream-1", connection_id))
+        await socket_node.handle_stream_frame({"type": START, "tool_call_id": "stream-1"}, connection_id=connection_id)
+        stream = await asyncio.wait_for(future, timeout=1.0)
+
+        stream.close()
+        await _wait_for(lambda: not socket_node.expects("stream-1", connection_id))
+        assert not socket_node._routed_calls
+    finally:
+        socket_node.disconnect(connection_id)
+        await graph_node.stop_routing()
+        await socket_node.stop_routing()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_keeps_stream_frames_in_order_without_blocking_others() -> None:
+    handled: list = []
+    release = asyncio.Event()
+
+    async def handler(message) -> None:
+        if message.get("slow"):
+            await release.wait()
+        handled.append(message["n"])
+
+    dispatcher = MessageDispatcher(handler)
+    frame = {"type": "tool_stream_frame", "connection_id": "c", "frame": {"tool_call_id": "t"}}
+    dispatcher.dispatch({**frame, "n": 1, "slow": True})
+    dispatcher.dispatch({**frame, "n": 2})
+    dispatcher.dispatch({"type": "tool_response", "n": 3})
+    await _wait_for(lambda: handled == [3])
+
+    release.set()
+    await _wait_for(lambda: handled == [3, 1, 2])
+    await dispatcher.close()
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from react_agent.web.protocol import WireProtocol, negotiate
+from react_agent.web.send_queue import SendQueue, SendQueueFullError
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent: list = []
+        self.active = 0
+        self.max_active = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send_json(self, data) -> None:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await self.gate.wait()
+        self.sent.append(data)
+        self.active -= 1
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_senders_share_one_writer() -> None:
+    socket = FakeSocket()
+    queue = SendQueue(socket)
+
+    await asyncio.gather(*(queue.send({"n": i}) for i in range(10)))
+
+    assert socket.sent == [{"n": i} for i in range(10)]
+    assert socket.max_active == 1
+    stats = queue.stats()
+    assert stats["messages_sent"] == stats["frames_sent"] == 10
+    assert stats["depth"] == 0
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_messages_queued_during_a_write_are_batched() -> None:
+    socket = FakeSocket()
+    socket.gate.clear()
+    queue = SendQueue(socket, negotiate({"batch": "1"}))
+
+    first = asyncio.create_task(queue.send({"n": 0}))
+    await _settle()
+    rest = [asyncio.create_task(queue.send({"n": i})) for i in range(1, 4)]
+    await _settle()
+    assert queue.depth == 3
+    socket.gate.set()
+    await asyncio.gather(first, *rest)
+
+    assert socket.sent == [{"n": 0}, {"type": "batch", "messages": [{"n": 1}, {"n": 2}, {"n": 3}]}]
+    assert queue.stats()["frames_sent"] == 2
+    queue.close()
+
+
+@pytest.mark.asyncio
+async def test_overflow_policies() -> None:
+    socket = FakeSocket()
+    socket.gate.clear()
+    rejecting = SendQueue(socket, max_depth=1, overflow="reject")
+    in_flight = asyncio.create_task(rejecting.send("a"))
+    await _settle()
+    queued = asyncio.create_task(rejecting.send("b"))
+    await _settle()
+    with pytest.raises(SendQueueFullError):
+        await rejecting.send("c")
+
+    dropping = SendQueue(FakeSocket(), max_depth=1, overflow="drop_oldest")
+    dropping.socket.gate.clear()
+    asyncio.create_task(dropping.send("x"))
+    await _settle()
+    oldest = asyncio.create_task(dropping.send("y"))
+    await _settle()
+    newest = asyncio.create_task(dropping.send("z"))
+    await _settle()
+    with pytest.raises(SendQueueFullError):
+        await oldest
+    assert dropping.stats()["dropped"] == 1
+
+    socket.gate.set()
+    dropping.socket.gate.set()
+    await asyncio.gather(in_flight, queued, newest)
+    assert socket.sent == ["a", "b"]
+    rejecting.close()
+    dropping.close()
+
+
+@pytest.mark.asyncio
+async def test_blocked_senders_fail_when_the_queue_closes() -> None:
+    socket = FakeSocket()
+    socket.gate.clear()
+    queue = SendQueue(socket, WireProtocol(), max_depth=1)
+    tasks = [asyncio.create_task(queue.send(i)) for i in range(3)]
+    await _settle()
+
+    queue.close(ConnectionError("gone"))
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    with pytest.raises(ConnectionError):
+        await queue.send("late")
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from react_agent.web.stt.session_pool import SessionPool
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSessions:
+    def __init__(self) -> None:
+        self.opened = 0
+        self.closed: list = []
+        self.fail = False
+
+    async def open(self) -> dict:
+        if self.fail:
+            raise ConnectionError("handshake failed")
+        self.opened += 1
+        return {"id": self.opened, "alive": True}
+
+    async def close(self, session: dict) -> None:
+        self.closed.append(session["id"])
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_acquire_hands_out_warm_sessions_and_refills() -> None:
+    sessions = FakeSessions()
+    pool = SessionPool(sessions.open, sessions.close, size=2)
+    await pool.start()
+    await _settle()
+
+    assert pool.acquire()["id"] == 1
+    await _settle()
+    assert pool.stats()["idle"] == 2
+    assert sessions.opened == 3
+
+    await pool.stop()
+    assert sorted(sessions.closed) == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_stale_and_dead_sessions_are_recycled() -> None:
+    sessions = FakeSessions()
+    clock = FakeClock()
+    pool = SessionPool(
+        sessions.open, sessions.close, size=2, max_idle_seconds=30,
+        is_usable=lambda session: session["alive"], clock=clock,
+    )
+    await pool.start()
+    await _settle()
+
+    clock.now = 31
+    session = pool.acquire()
+    assert session is None
+    await _settle()
+    assert sorted(sessions.closed) == [1, 2]
+
+    pool._idle[0][1]["alive"] = False
+    assert pool.acquire()["id"] == 4
+    assert pool.stats()["recycled"] == 3
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_open_failures_leave_callers_to_connect_themselves() -> None:
+    sessions = FakeSessions()
+    sessions.fail = True
+    pool = SessionPool(sessions.open, sessions.close, size=1)
+    await pool.start()
+    await _settle()
+
+    assert pool.acquire() is None
+    await _settle()
+    assert pool.stats()["open_failures"] == 2
+    await pool.stop()
@@ -0,0 +1,70 @@
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from react_agent import streaming
+from react_agent.streaming import make_streaming_invoke
+
+
+class FakeStreamingModel:
+    def __init__(self, chunks) -> None:
+        self.chunks = chunks
+
+    async def astream(self, messages, config):
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_streaming_invoke_assembles_text_and_tool_calls() -> None:
+    chunks = [
+        AIMessageChunk(content="Let me ", id="run-1"),
+        AIMessageChunk(content="check.", id="run-1"),
+        AIMessageChunk(
+            content="",
+            id="run-1",
+            tool_call_chunks=[{"name": "list_dir", "args": '{"pa', "id": "call-1", "index": 0}],
+        ),
+        AIMessageChunk(
+            content="",
+            id="run-1",
+            tool_call_chunks=[{"name": None, "args": 'th": "/tmp"}', "id": None, "index": 0}],
+        ),
+    ]
+    seen = []
+    invoke = make_streaming_invoke(
+        FakeStreamingModel(chunks), "p/a", on_chunk=lambda chunk, aggregate: seen.append(chunk)
+    )
+
+    message = await invoke([], {})
+
+    assert message.content == "Let me check."
+    assert message.tool_calls == [
+        {"name": "list_dir", "args": {"path": "/tmp"}, "id": "call-1", "type": "tool_call"}
+    ]
+    assert len(seen) == 4
+
+
+@pytest.mark.asyncio
+async def test_streaming_invoke_rejects_empty_stream() -> None:
+    with pytest.raises(ValueError):
+        await make_streaming_invoke(FakeStreamingModel([]), "p/a")([], {})
+
+
+class FailingStreamingModel:
+    async def astream(self, messages, config):
+        yield AIMessageChunk(content="partial", id="run-2")
+        raise RuntimeError("connection reset")
+
+
+@pytest.mark.asyncio
+async def test_streaming_invoke_discards_partial_output_on_failure(monkeypatch) -> None:
+    events = []
+    monkeypatch.setattr(streaming, "_get_stream_writer", lambda: events.append)
+
+    with pytest.raises(RuntimeError):
+        await make_streaming_invoke(FailingStreamingModel(), "p/a")([], {})
+
+    assert events == [
+        {"type": "token", "model": "p/a", "message_id": "run-2", "content": "partial"},
+        {"type": "token_discard", "model": "p/a", "message_id": "run-2"},
+    ]
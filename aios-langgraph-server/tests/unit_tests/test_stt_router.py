@@ -0,0 +1,95 @@
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from react_agent.web.stt.config import stt_settings
+from react_agent.web.stt.providers.registry import register_provider
+from react_agent.web.stt.router import stt_router
+
+PCM_CONFIG = {"type": "config", "encoding": "linear16", "sample_rate": 16000, "channels": 1}
+
+
+class FakeProvider:
+    """Records its connect options and audio; with `needs_pcm`, it refuses the defaults like the local provider."""
+
+    instances: list = []
+    needs_pcm = True
+
+    def __init__(self, config, send_to_client_callback) -> None:
+        self.options = None
+        self.audio = b""
+        self.finished = False
+        FakeProvider.instances.append(self)
+
+    async def connect(self, options) -> None:
+        if self.needs_pcm and options.get("encoding") != "linear16":
+            raise ConnectionError("send a config message first")
+        self.options = options
+
+    async def send_audio(self, audio_chunk: bytes) -> None:
+        self.audio += audio_chunk
+
+    async def keep_alive(self) -> None:
+        pass
+
+    async def finish(self) -> None:
+        self.finished = True
+
+
+@pytest.fixture
+def client(monkeypatch):
+    FakeProvider.instances = []
+    register_provider("fake", FakeProvider)
+    monkeypatch.setattr(stt_settings, "stt_provider", "fake")
+    monkeypatch.setattr(stt_settings, "stt_config_wait_ms", 10)
+    monkeypatch.setattr(stt_settings, "stt_vad_enabled", False)
+    app = FastAPI()
+    app.include_router(stt_router, prefix="/stt")
+    return TestClient(app)
+
+
+def _connected() -> list:
+    # Providers whose connect succeeded, in order
+    return [provider for provider in FakeProvider.instances if provider.options is not None]
+
+
+@pytest.mark.parametrize("needs_pcm", [True, False], ids=["deferred", "reconnected"])
+def test_config_after_the_wait_window_is_applied(client, monkeypatch, needs_pcm) -> None:
+    monkeypatch.setattr(FakeProvider, "needs_pcm", needs_pcm)
+    with client.websocket_connect("/stt/stt-stream") as websocket:
+        time.sleep(0.1)
+        websocket.send_text(json.dumps(PCM_CONFIG))
+        ack = websocket.receive_json()
+        websocket.send_bytes(b"\x00\x01" * 800)
+
+    assert ack["type"] == "config_ack"
+    assert ack["upstream"]["encoding"] == "linear16"
+    provider = _connected()[-1]
+    assert provider.options["encoding"] == "linear16"
+    assert len(provider.audio) == 1600
+    assert all(provider.finished for provider in FakeProvider.instances)
+
+
+def test_config_in_query_parameters_connects_immediately(client) -> None:
+    with client.websocket_connect("/stt/stt-stream?encoding=linear16&sample_rate=16000&channels=1") as websocket:
+        ack = websocket.receive_json()
+        websocket.send_bytes(b"\x00\x01" * 800)
+
+    assert ack["type"] == "config_ack"
+    [provider] = _connected()
+    assert provider.options["sample_rate"] == 16000
+    assert len(provider.audio) == 1600
+
+
+def test_config_after_audio_is_reported(client) -> None:
+    with client.websocket_connect("/stt/stt-stream?provider=fake&encoding=linear16") as websocket:
+        websocket.receive_json()
+        websocket.send_bytes(b"\x00\x01" * 800)
+        websocket.send_text(json.dumps(PCM_CONFIG))
+        error = websocket.receive_json()
+
+    assert error["type"] == "error"
+    assert len(_connected()) == 1
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from react_agent.configuration import convert_tool_dicts_to_structured_tools
+from react_agent.executors import WebSocketToolExecutor
+from react_agent.tool_cache import ToolResultCache, cache_ttls_for_tools
+from react_agent.web.connection import ConnectionManager
+from react_agent.web.routing import InMemoryRoutingBackend, InMemoryRoutingHub
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent: list = []
+
+    async def send_json(self, data) -> None:
+        self.sent.append(data)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _answer(manager: ConnectionManager, socket: FakeSocket, connection_id: str, result) -> None:
+    answered = 0
+    while True:
+        await asyncio.sleep(0)
+        for message in socket.sent[answered:]:
+            manager.handle_response(message["tool_call_id"], result, connection_id=connection_id)
+            answered += 1
+
+
+def test_tool_dict_cache_ttl_reaches_tool_metadata() -> None:
+    tools = convert_tool_dicts_to_structured_tools([
+        {"name": "list_directory", "description": "ls", "schema": {}, "cache": {"ttl": 30}},
+        {"name": "write_file", "description": "write", "schema": {}},
+        {"name": "bad_ttl", "description": "bad", "schema": {}, "cache": {"ttl": "soon"}},
+    ])
+
+    assert cache_ttls_for_tools(tools) == {"list_directory": 30.0}
+
+
+def test_entries_expire_and_lru_evicts() -> None:
+    clock = FakeClock()
+    cache = ToolResultCache(max_entries=2, clock=clock)
+    cache.put("c", "ls", {"path": "/", "all": True}, ["a"], ttl=10)
+
+    assert cache.get("c", "ls", {"all": True, "path": "/"}) == (True, ["a"])
+    clock.now = 11
+    assert cache.get("c", "ls", {"path": "/", "all": True}) == (False, None)
+
+    cache.put("c", "ls", {"path": "/a"}, None, ttl=10)
+    cache.put("c", "ls", {"path": "/b"}, 2, ttl=10)
+    cache.get("c", "ls", {"path": "/a"})
+    cache.put("c", "ls", {"path": "/c"}, 3, ttl=10)
+
+    assert cache.get("c", "ls", {"path": "/a"}) == (True, None)
+    assert cache.get("c", "ls", {"path": "/b"}) == (False, None)
+    assert cache.stats()["size"] == 2
+
+
+def test_invalidate_narrows_by_tool_and_args() -> None:
+    cache = ToolResultCache()
+    cache.put("c", "ls", {"path": "/a"}, 1, ttl=10)
+    cache.put("c", "ls", {"path": "/b"}, 2, ttl=10)
+    cache.put("c", "stat", {"path": "/a"}, 3, ttl=10)
+    cache.put("other", "ls", {"path": "/a"}, 4, ttl=10)
+
+    assert cache.invalidate("c", "ls", {"path": "/a"}) == 1
+    assert cache.invalidate("c", "ls") == 1
+    assert cache.invalidate("c") == 1
+    assert cache.get("other", "ls", {"path": "/a"}) == (True, 4)
+
+
+@pytest.mark.asyncio
+async def test_cached_results_skip_the_round_trip() -> None:
+    manager = ConnectionManager()
+    socket = FakeSocket()
+    connection_id = await manager.connect(socket, tools={})
+    executor = WebSocketToolExecutor(connection_manager=manager, result_cache=ToolResultCache())
+    responder = asyncio.create_task(_answer(manager, socket, connection_id, ["file.txt"]))
+
+    first = await executor.execute(connection_id, "c-1", "ls", {"path": "/"}, timeout=1.0, cache_ttl=30)
+    second = await executor.execute(connection_id, "c-2", "ls", {"path": "/"}, timeout=1.0, cache_ttl=30)
+    batch = await executor.execute_many(
+        connection_id,
+        [{"id": "c-3", "name": "ls", "args": {"path": "/"}}, {"id": "c-4", "name": "rm", "args": {"path": "/"}}],
+        timeout=1.0,
+        cache_ttls={"ls": 30},
+    )
+    uncached = await executor.execute(connection_id, "c-5", "ls", {"path": "/"}, timeout=1.0)
+
+    assert first == second == uncached == ["file.txt"]
+    assert batch == [["file.txt"], ["file.txt"]]
+    assert [message["tool_call_id"] for message in socket.sent] == ["c-1", "c-4", "c-5"]
+    responder.cancel()
+    manager.disconnect(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_results_of_routed_connections_are_not_cached() -> None:
+    hub = InMemoryRoutingHub()
+    graph_node, socket_node = ConnectionManager(), ConnectionManager()
+    await graph_node.start_routing(InMemoryRoutingBackend(hub))
+    await socket_node.start_routing(InMemoryRoutingBackend(hub))
+    socket = FakeSocket()
+    connection_id = await socket_node.connect(socket, tools={})
+    cache = ToolResultCache()
+    executor = WebSocketToolExecutor(connection_manager=graph_node, result_cache=cache)
+    responder = asyncio.create_task(_answer(socket_node, socket, connection_id, ["file.txt"]))
+    try:
+        for tool_call_id in ("r-1", "r-2"):
+            assert await executor.execute(connection_id, tool_call_id, "ls", {"path": "/"}, timeout=1.0, cache_ttl=30) == ["file.txt"]
+
+        # Only the owning node sees the client's invalidations, so the other node must not keep results
+        assert [message["tool_call_id"] for message in socket.sent] == ["r-1", "r-2"]
+        assert cache.stats()["size"] == 0
+    finally:
+        responder.cancel()
+        socket_node.disconnect(connection_id)
+        await graph_node.stop_routing()
+        await socket_node.stop_routing()
@@ -0,0 +1,138 @@
+import asyncio
+import os
+
+import pytest
+
+from react_agent.blob_store import BlobStore
+from react_agent.tool_results import ResultAssembler, shape_tool_result, truncate_text
+
+
+def test_blob_store_deduplicates_and_reads_ranges(tmp_path) -> None:
+    store = BlobStore(tmp_path)
+
+    first = store.put("hello world")
+    second = store.put(b"hello world")
+
+    assert first == second
+    assert store.read(first.digest) == b"hello world"
+    assert store.read(first.digest, offset=6, length=3) == b"wor"
+    assert len(list(tmp_path.rglob("*"))) == 2  # one shard directory, one blob
+
+
+def test_truncate_modes() -> None:
+    text = "abcdefghij"
+
+    assert truncate_text(text, 4, "head") == "abcd"
+    assert truncate_text(text, 4, "tail") == "ghij"
+    assert truncate_text(text, 4, "head_tail") == "ab\n...\nij"
+    assert truncate_text(text, 20, "head") == text
+    with pytest.raises(ValueError):
+        truncate_text(text, 4, "middle")
+
+
+@pytest.mark.asyncio
+async def test_small_result_is_kept_as_is(tmp_path) -> None:
+    content, artifact = await shape_tool_result("read", {"a": 1}, 100, store=BlobStore(tmp_path))
+
+    assert content == "{'a': 1}"
+    assert artifact is None
+    assert not any(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_large_result_is_spilled_and_referenced(tmp_path) -> None:
+    store = BlobStore(tmp_path)
+    payload = "x" * 500 + "y" * 500
+
+    content, artifact = await shape_tool_result("read", payload, 100, "head", store=store)
+
+    assert content.startswith("x" * 100 + "\n\n[Tool result shortened")
+    assert artifact["blob"]["uri"] not in content
+    assert store.read(artifact["blob"]["sha256"]).decode() == payload
+
+
+@pytest.mark.asyncio
+async def test_summarize_falls_back_to_truncation_on_error(tmp_path) -> None:
+    async def failing_summarizer(tool_name, text, max_chars):
+        raise RuntimeError("model down")
+
+    content, artifact = await shape_tool_result(
+        "read", "z" * 1000, 100, "summarize", store=BlobStore(tmp_path), summarizer=failing_summarizer
+    )
+
+    assert content.startswith("z" * 50 + "\n...\n" + "z" * 50)
+    assert "excerpt" in content
+    assert artifact is not None
+
+
+@pytest.mark.asyncio
+async def test_spilled_text_is_limited_in_characters(tmp_path) -> None:
+    store = BlobStore(tmp_path)
+    assembler = ResultAssembler(store=store, memory_limit=10)
+    assembler.add("é" * 80)
+    spilled = assembler.result()
+
+    content, artifact = await shape_tool_result("read", spilled, 100, "head", store=store)
+    assert content == "é" * 80
+    assert artifact is None
+
+    assembler = ResultAssembler(store=store, memory_limit=10)
+    assembler.add("é" * 1000)
+    content, artifact = await shape_tool_result("read", assembler.result(), 100, "head", store=store)
+    assert content.startswith("é" * 100 + "\n\n[Tool result shortened")
+
+
+@pytest.mark.asyncio
+async def test_binary_result_is_described_not_decoded(tmp_path) -> None:
+    store = BlobStore(tmp_path)
+    png = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 8
+
+    content, artifact = await shape_tool_result("screenshot", png, 100, store=store)
+
+    assert content == f"[Binary tool result: PNG image, {len(png)} bytes. The content is not shown.]"
+    assert store.read(artifact["blob"]["sha256"]) == png
+
+
+def test_blob_store_prunes_least_recently_used_over_cap(tmp_path) -> None:
+    store = BlobStore(tmp_path, max_bytes=250)
+    old = store.put(b"a" * 100)
+    kept = store.put(b"b" * 100)
+    os.utime(store.path(old.digest), (1, 1))
+    os.utime(store.path(kept.digest), (2, 2))
+
+    newest = store.put(b"c" * 100)
+
+    assert not store.exists(old.digest)
+    assert store.exists(kept.digest)
+    assert store.exists(newest.digest)
+
+
+def test_blob_store_prunes_expired_blobs(tmp_path) -> None:
+    store = BlobStore(tmp_path, max_age_seconds=60)
+    ref = store.put("old")
+    os.utime(store.path(ref.digest), (1, 1))
+
+    assert store.prune() == 1
+    assert not store.exists(ref.digest)
+
+
+@pytest.mark.asyncio
+async def test_async_assembly_writes_blobs_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    store = BlobStore(tmp_path)
+    offloaded = []
+    to_thread = asyncio.to_thread
+
+    async def tracking_to_thread(func, *args):
+        offloaded.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", tracking_to_thread)
+    assembler = ResultAssembler(store=store, memory_limit=10)
+    await assembler.add_async("small")
+    assert offloaded == []
+    await assembler.add_async("x" * 20)
+    await assembler.add_async("y" * 20)
+    spilled = await assembler.result_async()
+
+    assert offloaded == ["_append", "_append", "result"]
+    assert store.read(spilled.ref.digest) == b"small" + b"x" * 20 + b"y" * 20
@@ -0,0 +1,36 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from react_agent.utils import (
+    normalize_message_for_openai,
+    normalize_messages_for_openai,
+)
+
+
+def _conflicting_message() -> AIMessage:
+    return AIMessage(
+        content="",
+        id="a1",
+        tool_calls=[{"name": "read", "args": {"path": "/a"}, "id": "call-1"}],
+        additional_kwargs={"function_call": {"name": "read"}, "refusal": None},
+    )
+
+
+def test_normalize_removes_function_call_with_shallow_copy() -> None:
+    message = _conflicting_message()
+    normalized = normalize_message_for_openai(message)
+
+    assert "function_call" not in normalized.additional_kwargs
+    assert "function_call" in message.additional_kwargs
+    assert normalized.tool_calls is message.tool_calls
+
+
+def test_normalize_messages_reuses_results_per_message() -> None:
+    human = HumanMessage(content="hi")
+    conflicting = _conflicting_message()
+
+    first = normalize_messages_for_openai([human, conflicting])
+    second = normalize_messages_for_openai([human, conflicting])
+
+    assert first[0] is human
+    assert first[1] is not conflicting
+    assert second[1] is first[1]
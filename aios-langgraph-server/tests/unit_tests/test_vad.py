@@ -0,0 +1,83 @@
+import wave
+
+import pytest
+
+from react_agent.web.stt.vad import VadGate, benchmark_vad
+
+np = pytest.importorskip("numpy")
+
+RATE = 16000
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _fixture(segments) -> bytes:
+    """Concatenate (seconds, speech) segments: quiet noise, or a loud tone for speech."""
+    rng = np.random.default_rng(0)
+    parts = []
+    for seconds, speech in segments:
+        n = int(RATE * seconds)
+        noise = rng.normal(0, 30, n)
+        if speech:
+            noise += 8000 * np.sin(2 * np.pi * 220 * np.arange(n) / RATE)
+        parts.append(noise)
+    return np.concatenate(parts).astype("<i2").tobytes()
+
+
+def _feed(gate: VadGate, audio: bytes, chunk: int = 640) -> bytes:
+    return b"".join(gate.process(audio[i:i + chunk]) for i in range(0, len(audio), chunk))
+
+
+def test_silence_is_dropped_and_speech_kept_with_preroll_and_hangover() -> None:
+    gate = VadGate(RATE, hangover_ms=200, preroll_ms=100)
+    audio = _fixture([(1.0, False), (0.5, True), (1.0, False)])
+
+    forwarded = _feed(gate, audio)
+
+    # 100 ms pre-roll + 500 ms speech + 200 ms hangover
+    assert len(forwarded) == pytest.approx(0.8 * RATE * 2, abs=2 * 640)
+    assert gate.onsets == 1
+    assert gate.stats()["saved_ratio"] > 0.6
+    assert not gate.in_speech
+
+
+def test_thin_mode_forwards_every_nth_silent_frame() -> None:
+    gate = VadGate(RATE, silence_mode="thin", thin_every=10, preroll_ms=0)
+
+    forwarded = _feed(gate, _fixture([(2.0, False)]))
+
+    assert len(forwarded) == 10 * 640
+
+
+def test_keepalive_is_due_after_gated_silence() -> None:
+    clock = FakeClock()
+    gate = VadGate(RATE, keepalive_seconds=5, clock=clock)
+    gate.process(_fixture([(0.1, False)]))
+
+    clock.now = 4
+    assert not gate.keepalive_due()
+    clock.now = 6
+    assert gate.keepalive_due()
+    assert not gate.keepalive_due()
+
+
+def test_benchmark_reports_onsets_without_clipping(tmp_path) -> None:
+    path = tmp_path / "speech.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(_fixture([(1.0, False), (0.6, True), (2.0, False), (0.4, True), (1.0, False)]))
+
+    report = benchmark_vad(str(path), onsets=[1.0, 3.6])
+
+    assert report["onsets"] == 2
+    assert report["missed_onsets"] == report["clipped_onsets"] == 0
+    assert report["mean_onset_lead"] == pytest.approx(0.3, abs=0.05)
+    assert report["bytes_saved"] > 0